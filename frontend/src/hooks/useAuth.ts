@@ -81,6 +81,16 @@ export const useAuth = () => {
 
   // 로그아웃
   const logout = useCallback(() => {
+    const token = localStorage.getItem('auth_token');
+    if (token) {
+      // 서버 측 토큰 폐기 (실패해도 로컬 로그아웃은 진행)
+      fetch('http://localhost:8080/api/auth/logout', {
+        method: 'POST',
+        headers: {
+          'Authorization': `Bearer ${token}`,
+        },
+      }).catch((error) => console.error('Logout error:', error));
+    }
     localStorage.removeItem('auth_token');
     setAuthState({
       isAuthenticated: false,
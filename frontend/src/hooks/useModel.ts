@@ -64,18 +64,33 @@ export const useModel = () => {
     }
   };
 
-  // 상태 폴링 (모델 전환 중)
-  const startStatusPolling = () => {
-    const polling = setInterval(async () => {
-      await fetchModelStatus();
-      
-      if (modelStatus?.status === 'running' || modelStatus?.status === 'error') {
-        clearInterval(polling);
-      }
-    }, 3000); // 3초마다 확인
+  // 상태 변경 대기 (모델 전환 중) - 서버가 상태가 바뀔 때만 응답하는 롱폴링
+  const startStatusPolling = async () => {
+    const deadline = Date.now() + 300000; // 5분 후 자동 중단
+    let etag: string | null = null;
 
-    // 5분 후 자동 중단
-    setTimeout(() => clearInterval(polling), 300000);
+    while (Date.now() < deadline) {
+      try {
+        const response = await fetch(`${API_BASE_URL}/api/models/status/watch`, {
+          headers: etag ? { 'If-None-Match': etag } : {},
+        });
+        if (response.status === 304) {
+          continue; // 대기 시간 동안 변경 없음
+        }
+        if (!response.ok) {
+          break;
+        }
+        etag = response.headers.get('ETag');
+        const data: ModelStatus = await response.json();
+        setModelStatus(data);
+        if (data.status === 'running' || data.status === 'error') {
+          break;
+        }
+      } catch (error) {
+        console.error('모델 상태 대기 실패:', error);
+        break;
+      }
+    }
   };
 
   useEffect(() => {
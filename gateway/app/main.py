@@ -7,8 +7,21 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from .config import settings
 from .database import init_db
+from .redis_client import close_redis
 from .middleware import LoggingMiddleware, RateLimitMiddleware
-from .routers import chat, conversations, health, models, auth
+from .metrics import metrics_sampler
+from .routers import chat, conversations, health, metrics, models, auth, usage
+from .services.backend_pool import backend_pool
+from .services.gpu_telemetry import gpu_telemetry
+from .services.model_fleet import model_fleet
+from .services.model_manager import model_manager
+from .services.model_status import model_status_publisher
+from .services.request_log_writer import request_log_writer
+from .services.token_cache import token_cache
+from .services.turn_writer import turn_writer
+from .services.usage_meter import usage_meter
+from .services.upstream import upstream_client
+from .services.weight_prewarm import weight_prewarmer
 
 # 로거 설정
 logger = structlog.get_logger()
@@ -21,10 +34,34 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 vLLM Gateway 시작...")
     await init_db()
     logger.info("✅ 데이터베이스 초기화 완료")
+    await upstream_client.start()
+    logger.info("✅ 업스트림 커넥션 풀 생성 완료")
+    await backend_pool.start()
+    gpu_telemetry.start()
+    await metrics_sampler.start()
+    await token_cache.start()
+    await turn_writer.start()
+    await request_log_writer.start()
+    await usage_meter.start()
+    await model_status_publisher.start()
+    await model_manager.start()
 
     yield
 
     # 종료 시
+    await model_manager.stop()
+    await model_status_publisher.stop()
+    await model_fleet.stop()
+    await weight_prewarmer.stop()
+    await token_cache.stop()
+    await turn_writer.stop()
+    await request_log_writer.stop()
+    await usage_meter.stop()
+    await metrics_sampler.stop()
+    await backend_pool.stop()
+    gpu_telemetry.stop()
+    await upstream_client.close()
+    await close_redis()
     logger.info("👋 vLLM Gateway 종료")
 
 
@@ -59,9 +96,11 @@ app.add_middleware(RateLimitMiddleware)
 
 # 라우터 등록
 app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(chat.router, prefix="/api", tags=["Chat"])
 app.include_router(conversations.router, prefix="/api", tags=["Conversations"])
+app.include_router(usage.router, prefix="/api", tags=["Usage"])
 app.include_router(models.router, prefix="/api", tags=["Models"])
 
 
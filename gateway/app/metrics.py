@@ -0,0 +1,227 @@
+import asyncio
+import os
+from typing import Optional
+
+import structlog
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .config import settings
+from .services.backend_pool import backend_pool
+from .services.gpu_telemetry import gpu_telemetry
+from .services.upstream import upstream_client
+
+logger = structlog.get_logger()
+
+# uvicorn 멀티 워커에서는 PROMETHEUS_MULTIPROC_DIR을 지정해 워커별 mmap 파일을 합산
+MULTIPROCESS_MODE = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TTFT_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10, 20, 60)
+ITL_BUCKETS = (0.005, 0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1, 2.5)
+TPS_BUCKETS = (1, 5, 10, 20, 30, 40, 50, 75, 100, 150, 200, 400)
+SWITCH_BUCKETS = (5, 10, 20, 30, 60, 90, 120, 180, 240, 300, 600)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+REQUEST_LATENCY = Histogram(
+    "gateway_request_duration_seconds",
+    "게이트웨이 요청 처리 시간 (스트리밍은 본문 전송 완료까지)",
+    ["route", "method", "status", "profile"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_TTFT = Histogram(
+    "gateway_upstream_ttft_seconds",
+    "업스트림 첫 토큰까지 걸린 시간",
+    ["profile"],
+    buckets=TTFT_BUCKETS,
+)
+UPSTREAM_INTER_TOKEN = Histogram(
+    "gateway_upstream_inter_token_seconds",
+    "업스트림 스트림 청크 간 간격",
+    ["profile"],
+    buckets=ITL_BUCKETS,
+)
+OUTPUT_TOKENS_PER_SECOND = Histogram(
+    "gateway_output_tokens_per_second",
+    "요청별 생성 토큰 처리량",
+    ["profile", "stream"],
+    buckets=TPS_BUCKETS,
+)
+OUTPUT_TOKENS = Counter(
+    "gateway_output_tokens",
+    "생성 토큰 수 누계",
+    ["profile"],
+)
+INFLIGHT_STREAMS = Gauge(
+    "gateway_inflight_streams",
+    "진행 중인 업스트림 스트림 수",
+    ["profile"],
+    multiprocess_mode="livesum",
+)
+UPSTREAM_POOL_CONNECTIONS = Gauge(
+    "gateway_upstream_pool_connections",
+    "업스트림 커넥션 풀 상태별 연결 수",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+BACKEND_OUTSTANDING = Gauge(
+    "gateway_backend_outstanding_requests",
+    "vLLM 백엔드별 처리 중인 요청 수",
+    ["backend"],
+    multiprocess_mode="livesum",
+)
+GPU_MEMORY_USED = Gauge(
+    "gateway_gpu_memory_used_bytes",
+    "GPU별 사용 중인 메모리",
+    ["gpu"],
+    multiprocess_mode="livemax",
+)
+GPU_UTILIZATION = Gauge(
+    "gateway_gpu_utilization_ratio",
+    "GPU별 사용률 (0-1)",
+    ["gpu"],
+    multiprocess_mode="livemax",
+)
+MODEL_SWITCH_DURATION = Histogram(
+    "gateway_model_switch_duration_seconds",
+    "모델 전환 소요 시간",
+    ["profile", "result"],
+    buckets=SWITCH_BUCKETS,
+)
+
+MODEL_WAKE_DURATION = Histogram(
+    "gateway_model_wake_duration_seconds",
+    "유휴 언로드 후 첫 요청으로 vLLM을 다시 띄우는 데 걸린 시간",
+    ["profile", "result"],
+    buckets=SWITCH_BUCKETS,
+)
+MODEL_IDLE_UNLOADED_SECONDS = Counter(
+    "gateway_model_idle_unloaded_seconds",
+    "유휴 언로드로 GPU를 비워 둔 시간 누계",
+    ["profile"],
+)
+MODEL_SWITCH_PHASE_DURATION = Histogram(
+    "gateway_model_switch_phase_duration_seconds",
+    "모델 전환 단계별 소요 시간 (성공한 전환만)",
+    ["profile", "phase"],
+    buckets=SWITCH_BUCKETS,
+)
+TURN_WRITE_FLUSH_DURATION = Histogram(
+    "gateway_turn_write_flush_duration_seconds",
+    "채팅 턴 배치 저장 시간",
+    ["target", "result"],  # target: db | spill | replay
+    buckets=LATENCY_BUCKETS,
+)
+TURN_WRITE_BATCH_SIZE = Histogram(
+    "gateway_turn_write_batch_size",
+    "채팅 턴 배치당 메시지 수",
+    ["target"],
+    buckets=BATCH_SIZE_BUCKETS,
+)
+TURN_WRITE_QUEUE_DEPTH = Gauge(
+    "gateway_turn_write_queue_depth",
+    "저장 대기 중인 채팅 메시지 수",
+    multiprocess_mode="livesum",
+)
+TURN_WRITE_DROPPED = Counter(
+    "gateway_turn_write_dropped",
+    "저장하지 못하고 버린 채팅 메시지 수",
+    ["reason"],  # queue_full | not_owned | spill_failed
+)
+CONTEXT_TRIMMED_MESSAGES = Counter(
+    "gateway_context_trimmed_messages",
+    "컨텍스트 길이 초과로 정리한 메시지 수",
+    ["profile", "action"],  # action: dropped | truncated
+)
+USAGE_FLUSH_DURATION = Histogram(
+    "gateway_usage_flush_duration_seconds",
+    "토큰 사용량 usage_daily 반영 시간",
+    ["result"],
+    buckets=LATENCY_BUCKETS,
+)
+USAGE_QUOTA_REJECTED = Counter(
+    "gateway_usage_quota_rejected",
+    "하루 토큰 한도 초과로 거절한 요청 수",
+    ["profile"],
+)
+REQUEST_LOG_FLUSH_DURATION = Histogram(
+    "gateway_request_log_flush_duration_seconds",
+    "요청 로그 배치 저장 시간",
+    ["result"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_LOG_QUEUE_DEPTH = Gauge(
+    "gateway_request_log_queue_depth",
+    "저장 대기 중인 요청 로그 수",
+    multiprocess_mode="livesum",
+)
+REQUEST_LOG_DROPPED = Counter(
+    "gateway_request_log_dropped",
+    "저장하지 못하고 버린 요청 로그 수",
+    ["reason"],  # queue_full | flush_failed
+)
+
+
+def profile_label(profile: Optional[str]) -> str:
+    return profile or "unknown"
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Prometheus 텍스트 포맷으로 메트릭 직렬화"""
+    if MULTIPROCESS_MODE:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsSampler:
+    """커넥션 풀/백엔드 부하처럼 요청 경로에서 관측하기 어려운 값을 주기적으로 기록"""
+
+    def __init__(self, interval: float = settings.METRICS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self):
+        pool = upstream_client.pool_stats()
+        for state in ("in_use", "idle", "waiting"):
+            UPSTREAM_POOL_CONNECTIONS.labels(state=state).set(pool[state])
+        for backend in backend_pool.backends:
+            BACKEND_OUTSTANDING.labels(backend=backend.url).set(backend.outstanding)
+        for sample in gpu_telemetry.latest() or []:
+            GPU_MEMORY_USED.labels(gpu=str(sample.index)).set(sample.memory_used_mb * 1024 * 1024)
+            GPU_UTILIZATION.labels(gpu=str(sample.index)).set(sample.utilization_pct / 100)
+
+    async def _loop(self):
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error("메트릭 샘플링 실패", error=str(e))
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if MULTIPROCESS_MODE:
+            multiprocess.mark_process_dead(os.getpid())
+
+
+# 전역 메트릭 샘플러 인스턴스
+metrics_sampler = MetricsSampler()
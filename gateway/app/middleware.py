@@ -1,51 +1,109 @@
 import time
 import structlog
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import REQUEST_LATENCY, profile_label
+from .routers.auth import decode_token
+from .services.model_manager import model_manager
+from .services.rate_limiter import rate_limiter
 
 logger = structlog.get_logger()
 
-# 레이트 리미터 설정
-limiter = Limiter(key_func=get_remote_address)
 
+class LoggingMiddleware:
+    """요청 로깅 미들웨어 (순수 ASGI - send/receive를 버퍼링 없이 그대로 전달)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """요청 로깅 미들웨어"""
-    
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
         # 요청 로깅
         logger.info(
             "Request started",
-            method=request.method,
-            path=request.url.path,
-            client_ip=request.client.host if request.client else "unknown"
+            method=method,
+            path=path,
+            client_ip=client[0] if client else "unknown"
         )
-        
-        response = await call_next(request)
-        
-        # 응답 로깅
-        process_time = time.time() - start_time
-        logger.info(
-            "Request completed",
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
-            process_time=f"{process_time:.3f}s"
-        )
-        
-        return response
-
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """레이트 리미팅 미들웨어"""
-    
-    async def dispatch(self, request: Request, call_next):
-        # 기본적인 레이트 리미팅 로직
-        # 실제로는 slowapi를 사용하여 더 정교하게 구현
-        response = await call_next(request)
-        return response
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 응답 로깅 (스트리밍 응답은 본문 전송이 끝난 시점 기준)
+            process_time = time.perf_counter() - start_time
+            # 경로 파라미터로 라벨 카디널리티가 늘지 않도록 매칭된 라우트 템플릿 사용
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                route=getattr(route, "path", "unmatched"),
+                method=method,
+                status=str(status_code),
+                profile=profile_label(model_manager.current_profile),
+            ).observe(process_time)
+            logger.info(
+                "Request completed",
+                method=method,
+                path=path,
+                status_code=status_code,
+                process_time=f"{process_time:.3f}s"
+            )
+
+
+class RateLimitMiddleware:
+    """레이트 리밋 미들웨어 - 사용자별 요청/생성 토큰 버킷 검사 (순수 ASGI)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["path"] not in settings.RATE_LIMIT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # 인증 실패 요청은 라우터의 verify_token이 401로 처리
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        username = await decode_token(token) if scheme.lower() == "bearer" and token else None
+        if username is None:
+            await self.app(scope, receive, send)
+            return
+
+        decision = await rate_limiter.check(username)
+        if not decision.allowed:
+            logger.warning(
+                "Rate limit exceeded",
+                user=username,
+                path=scope["path"],
+                retry_after=decision.retry_after_header,
+            )
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "요청 한도를 초과했습니다. 잠시 후 다시 시도하세요."},
+                headers={"Retry-After": decision.retry_after_header},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,7 @@
+# SQLAlchemy 모델 패키지 (테이블 스키마는 scripts/init.sql이 관리)
+from .conversation import Conversation
+from .message import Message
+from .request_log import RequestLog
+from .usage import UsageDaily
+
+__all__ = ["Conversation", "Message", "RequestLog", "UsageDaily"]
@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text, func
+
+from ..database import Base
+
+
+class Conversation(Base):
+    """대화 (scripts/init.sql의 conversations 테이블)"""
+    __tablename__ = "conversations"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)  # sqlite는 INTEGER PK만 자동 증가
+    user_id = Column(BigInteger, nullable=False)
+    title = Column(String(500))
+    model = Column(String(100))
+    system_prompt = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # 사용자별 최근 대화 목록 키셋 페이지네이션용
+        Index("idx_conversations_user_updated", "user_id", updated_at.desc(), id.desc()),
+    )
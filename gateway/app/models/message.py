@@ -0,0 +1,20 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text, func
+
+from ..database import Base
+
+
+class Message(Base):
+    """대화 메시지 (scripts/init.sql의 messages 테이블)"""
+    __tablename__ = "messages"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)  # sqlite는 INTEGER PK만 자동 증가
+    conversation_id = Column(BigInteger, nullable=False)
+    role = Column(String(20), nullable=False)
+    content = Column(Text, nullable=False)
+    token_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # 대화별 메시지를 id 역순으로 페이지 단위 조회
+        Index("idx_messages_conversation_id_id", "conversation_id", id.desc()),
+    )
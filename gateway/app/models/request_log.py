@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text, func
+
+from ..database import Base
+
+
+class RequestLog(Base):
+    """채팅 요청 기록 (scripts/init.sql의 request_logs 테이블, created_at 기준 일 단위 파티션)"""
+    __tablename__ = "request_logs"
+
+    # 파티션 테이블의 기본 키는 파티션 키를 포함해야 함
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    user_id = Column(BigInteger)
+    conversation_id = Column(BigInteger)
+    model = Column(String(100))
+    input_tokens = Column(Integer, default=0)
+    output_tokens = Column(Integer, default=0)
+    total_tokens = Column(Integer, default=0)
+    latency_ms = Column(Integer)
+    status_code = Column(Integer)
+    error_message = Column(Text)
+
+    __table_args__ = (
+        # 모델별 시간 구간 롤업용
+        Index("idx_request_logs_model_created_at", "model", "created_at"),
+    )
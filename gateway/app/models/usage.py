@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, Date, DateTime, Index, Integer, String, func
+
+from ..database import Base
+
+
+class UsageDaily(Base):
+    """사용자 × 모델 × 일(UTC) 토큰 사용량 (scripts/init.sql의 usage_daily 테이블, usage_meter가 주기적으로 가산)"""
+    __tablename__ = "usage_daily"
+
+    day = Column(Date, primary_key=True)
+    user_id = Column(BigInteger, primary_key=True)
+    model = Column(String(100), primary_key=True)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    requests = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # 사용자별 최근 사용량 조회
+        Index("idx_usage_daily_user_day", "user_id", "day"),
+    )
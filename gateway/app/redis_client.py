@@ -0,0 +1,52 @@
+import time
+
+import structlog
+import redis.asyncio as redis
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+# Redis 클라이언트 (프로세스당 1개, 내부 커넥션 풀 공유)
+_redis: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    """공용 Redis 클라이언트 (최초 호출 시 생성)"""
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _redis
+
+
+async def close_redis():
+    """Redis 커넥션 풀 종료"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+        logger.info("Redis 연결 종료")
+
+
+class RedisBreaker:
+    """Redis 장애 시 일정 시간 호출을 건너뛰는 간단한 서킷 브레이커
+
+    Redis가 죽어 있을 때 요청마다 소켓 타임아웃을 기다리지 않도록 한다.
+    """
+
+    def __init__(self, cooldown: float = settings.REDIS_RETRY_COOLDOWN):
+        self.cooldown = cooldown
+        self._open_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._open_until
+
+    def record_failure(self, error: Exception):
+        if self.available:
+            logger.warning("Redis 호출 실패, 일시적으로 우회", error=str(error), cooldown=self.cooldown)
+        self._open_until = time.monotonic() + self.cooldown
@@ -16,6 +16,7 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from ..config import settings
+from ..services.token_cache import token_cache, token_digest
 
 # Simple logging (no external logger)
 import logging
@@ -95,25 +96,38 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Verify JWT token"""
+def _decode_claims(token: str) -> Optional[dict]:
+    """Verify JWT signature/expiry and return its claims, or None if invalid"""
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return username
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except InvalidTokenError:
+        return None
+
+async def decode_token(token: str) -> Optional[str]:
+    """Decode JWT token and return the username, or None if invalid or revoked
+
+    Verified claims are cached until the token's own exp, so repeated calls
+    with the same token skip signature verification.
+    """
+    digest = token_digest(token)
+    claims = token_cache.get(digest)
+    if claims is None:
+        claims = _decode_claims(token)
+        if claims is None or await token_cache.is_revoked(digest):
+            return None
+        token_cache.put(digest, claims)
+    return claims.get("sub")
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Verify JWT token"""
+    username = await decode_token(credentials.credentials)
+    if username is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return username
 
 def get_user(username: str):
     """Get user by username"""
@@ -173,6 +187,19 @@ async def login(login_request: LoginRequest):
     logger.info(f"Login successful for user: {login_request.username}")
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Logout endpoint - revoke the current token on every gateway process"""
+    claims = _decode_claims(credentials.credentials)
+    if claims is None or claims.get("exp") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    await token_cache.revoke(token_digest(credentials.credentials), float(claims["exp"]))
+    logger.info(f"Token revoked for user: {claims.get('sub')}")
+
 @router.get("/me", response_model=User)
 async def read_users_me(current_user: str = Depends(verify_token)):
     """Get current user info"""
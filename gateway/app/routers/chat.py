@@ -1,63 +1,699 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 import structlog
 import httpx
 from ..config import settings
-from ..routers.auth import verify_token
-from typing import List, Dict, Any
+from ..metrics import OUTPUT_TOKENS, OUTPUT_TOKENS_PER_SECOND, profile_label
+from ..routers.auth import get_user, verify_token
+from ..schemas.model import ModelProfile
+from ..services.admission import AdmissionRejected, admission_controller, request_cost
+from ..services.backend_pool import BackendPool, NoHealthyBackendError, affinity_key_for, backend_pool
+from ..services.coalescer import coalescer
+from ..services.context_cache import ConversationContext, context_cache
+from ..services.context_window import ContextOverflow, context_window
+from ..services.model_fleet import model_fleet
+from ..services.model_manager import model_manager
+from ..services.rate_limiter import rate_limiter
+from ..services.response_cache import is_deterministic, request_fingerprint, response_cache
+from ..services.request_log_writer import request_log_writer
+from ..services.streaming import (
+    StreamTimer,
+    collect_sse_completion,
+    iter_sse_payloads,
+    open_upstream_stream,
+    relay_stream,
+    sse_error_event,
+    sse_progress_event,
+)
+from ..services.turn_writer import turn_writer
+from ..services.usage_meter import usage_meter
+from ..services.upstream import upstream_client
+from typing import List, Dict, Any, Optional
 
 router = APIRouter()
 logger = structlog.get_logger()
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # nginx 프록시 버퍼링 방지
+    "Access-Control-Allow-Origin": "*",
+}
+
+
+def _cache_directives(http_request: Request) -> tuple[bool, bool]:
+    """요청 헤더 기반 캐시 사용 여부 (조회 가능, 저장 가능)
+
+    - X-Cache-Bypass 또는 Cache-Control: no-store → 조회/저장 모두 안 함
+    - Cache-Control: no-cache → 조회하지 않고 새 응답으로 갱신
+    """
+    cache_control = http_request.headers.get("cache-control", "").lower()
+    if http_request.headers.get("x-cache-bypass") or "no-store" in cache_control:
+        return False, False
+    if "no-cache" in cache_control:
+        return False, True
+    return True, True
+
+
+def _route(request: Dict[str, Any]) -> tuple[Dict[str, Any], BackendPool, Optional[str]]:
+    """model 필드로 서빙 인스턴스 결정 → (전달할 요청, 백엔드 풀, 프로파일)
+
+    멀티 모델 인스턴스에 없는 모델은 기본 vLLM 인스턴스로 보낸다.
+    """
+    instance = model_fleet.resolve(request.get("model"))
+    if instance is None:
+        return request, backend_pool, model_manager.current_profile
+    # 프로파일 ID로 요청해도 vLLM에는 실제 모델 ID로 전달
+    return {**request, "model": instance.model_id}, instance.pool, instance.profile_id
+
+
+def _as_id(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _user_id(user: str) -> Optional[int]:
+    """토큰 사용자명의 users 테이블 ID (등록되지 않은 사용자는 None)"""
+    account = get_user(user)
+    return _as_id(account["user_id"]) if account else None
+
+
+def _request_ids(request: Dict[str, Any], user: str) -> tuple[Optional[int], Optional[int]]:
+    """요청의 (사용자 ID, 대화 ID) - 등록되지 않은 사용자나 숫자가 아닌 conversation_id는 None"""
+    return _user_id(user), _as_id(request.get("conversation_id"))
+
+
+def _injects_stream_usage(request: Dict[str, Any]) -> bool:
+    """게이트웨이가 stream_options.include_usage를 붙이는 요청 (스트리밍이고 클라이언트가 지정하지 않음)"""
+    return settings.USAGE_STREAM_INCLUDE_USAGE and bool(request.get("stream")) and "stream_options" not in request
+
+
+def _is_usage_event(event: bytes) -> bool:
+    payloads = list(iter_sse_payloads(event))
+    return len(payloads) == 1 and not payloads[0].get("choices") and bool(payloads[0].get("usage"))
+
+
+async def _drop_usage_events(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """게이트웨이가 요청한 usage 전용 이벤트를 빼고 전달 (stream_options를 보내지 않은 클라이언트용)
+
+    청크 경계가 이벤트 경계와 다를 수 있으므로 완성된 이벤트 단위로 잘라 전달한다.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        end = buffer.rfind(b"\n\n")
+        if end < 0:
+            continue
+        complete, buffer = buffer[:end + 2], buffer[end + 2:]
+        if b'"usage"' in complete:
+            complete = b"".join(
+                event + b"\n\n" for event in complete[:-2].split(b"\n\n") if not _is_usage_event(event)
+            )
+        if complete:
+            yield complete
+    if buffer:
+        yield buffer
+
+
+async def _check_quota(user_id: Optional[int], profile: Optional[str]):
+    """하루 토큰 한도 검사 (어드미션 대기열에 들어가기 전, 초과 시 UTC 자정까지 429)"""
+    decision = await usage_meter.check(user_id, profile_label(profile))
+    if not decision.allowed:
+        scope = "모델별 " if decision.scope == "model" else ""
+        raise HTTPException(
+            status_code=429,
+            detail=f"오늘 {scope}토큰 사용 한도를 초과했습니다 ({decision.used}/{decision.limit})",
+            headers={"Retry-After": str(max(1, int(decision.retry_after)))},
+        )
+
+
+class _TurnRecord:
+    """conversation_id가 있는 요청의 턴 저장 대상 (서버 컨텍스트로 복원한 요청이면 그 컨텍스트 포함)"""
+
+    def __init__(self, user_id: int, conversation_id: int):
+        self.user_id = user_id
+        self.conversation_id = conversation_id
+        self.context: Optional[ConversationContext] = None
+        self.profile: Optional[ModelProfile] = None
+        self.prompt_tokens = 0  # 이번 턴 사용자 메시지의 토큰 수 (컨텍스트 윈도우에서 센 값)
+
+    async def count(self, content: str) -> Optional[int]:
+        """어시스턴트 응답의 토큰 수 (프로파일 토크나이저, 메모에 남아 다음 턴 계산에 재사용)"""
+        if self.profile is None or not context_window.enabled:
+            return None
+        counts, exact = await context_window.count_messages(
+            self.profile.model_id, [{"role": "assistant", "content": content}]
+        )
+        return counts[0] if exact else None
+
+    async def complete(self, request: Dict[str, Any], content: str, token_count: int):
+        """응답 완료 후 턴 저장 요청 (DB 쓰기는 turn_writer가 백그라운드에서) + 컨텍스트 캐시 갱신"""
+        prompt = _prompt_turn(request)
+        turn_writer.submit(
+            self.user_id,
+            self.conversation_id,
+            [{**message, "token_count": self.prompt_tokens} for message in prompt]
+            + [{"role": "assistant", "content": content, "token_count": token_count}],
+        )
+        if self.context is not None:
+            await context_cache.store(
+                self.conversation_id,
+                self.context.extended(prompt + [{"role": "assistant", "content": content}]),
+            )
+        else:
+            # 클라이언트가 전체 이력을 보낸 턴 - 캐시된 컨텍스트에는 이번 턴이 없으므로 제거
+            await context_cache.invalidate(self.conversation_id)
+
+
+def _turn_target(request: Dict[str, Any], user: str) -> Optional[_TurnRecord]:
+    """conversation_id가 있는 요청의 턴 저장 대상"""
+    user_id, conversation_id = _request_ids(request, user)
+    if user_id is None or conversation_id is None:
+        return None
+    return _TurnRecord(user_id, conversation_id)
+
+
+async def _with_server_context(request: Dict[str, Any], turn: Optional[_TurnRecord]) -> Dict[str, Any]:
+    """messages 대신 새 message 하나만 보낸 요청의 전체 프롬프트를 서버 컨텍스트로 복원"""
+    message = request["message"]
+    if turn is None:
+        raise HTTPException(status_code=400, detail="message 필드는 conversation_id와 함께 보내야 합니다")
+    if request.get("messages"):
+        raise HTTPException(status_code=400, detail="messages와 message는 함께 보낼 수 없습니다")
+    if not isinstance(message, dict) or message.get("role") != "user" or "content" not in message:
+        raise HTTPException(status_code=400, detail="message는 role이 user인 메시지여야 합니다")
+
+    context = await context_cache.get(turn.user_id, turn.conversation_id)
+    if context is None:
+        raise HTTPException(status_code=404, detail="대화를 찾을 수 없습니다")
+    turn.context = context
+    request = {key: value for key, value in request.items() if key != "message"}
+    request["messages"] = context.prompt(message)
+    return request
+
+
+async def _fit_context(
+    request: Dict[str, Any],
+    profile_id: Optional[str],
+    turn: Optional[_TurnRecord],
+) -> Dict[str, Any]:
+    """프롬프트를 프로파일 max_model_len에 맞춤 (넘치면 정책대로 오래된 턴 정리, 맞출 수 없으면 400)"""
+    profile = model_manager.profiles.get(profile_id or "")
+    if not context_window.enabled or profile is None or not request.get("messages"):
+        return request
+    try:
+        fit = await context_window.fit(request, profile, profile_id)
+    except ContextOverflow as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    if turn is not None:
+        turn.profile = profile
+        if fit.exact:
+            turn.prompt_tokens = fit.token_counts[-1]
+    if fit.dropped or fit.truncated:
+        request = {**request, "messages": fit.messages}
+    return request
+
+
+def _prompt_turn(request: Dict[str, Any]) -> list[dict]:
+    """이번 턴의 사용자 메시지 (이전 이력은 이미 저장되어 있음)"""
+    messages = request.get("messages") or []
+    if not messages or messages[-1].get("role") != "user":
+        return []
+    content = messages[-1].get("content")
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False)  # 멀티모달 content 배열
+    return [{"role": "user", "content": content}]
+
+
+async def _record_turn(turn: Optional[_TurnRecord], request: Dict[str, Any], result: Dict[str, Any]):
+    """비스트리밍 응답 완료 후 턴 기록"""
+    if turn is None:
+        return
+    try:
+        content = result["choices"][0]["message"]["content"] or ""
+    except (KeyError, IndexError, TypeError):
+        return
+    token_count = (result.get("usage") or {}).get("completion_tokens") or await turn.count(content) or 0
+    await turn.complete(request, content, token_count)
+
+
+async def _record_stream_turn(
+    chunks: AsyncIterator[bytes],
+    turn: _TurnRecord,
+    request: Dict[str, Any],
+) -> AsyncIterator[bytes]:
+    """청크를 그대로 전달하면서 모아 두었다가 스트림이 정상 종료되면 턴 기록
+
+    클라이언트가 중간에 끊거나 finish_reason 없이 끝난 스트림은 저장하지 않는다.
+    """
+    received = []
+    async for chunk in chunks:
+        received.append(chunk)
+        yield chunk
+    content, finish_reason, events = collect_sse_completion(received)
+    if finish_reason is not None:
+        token_count = await turn.count(content)
+        await turn.complete(request, content, token_count if token_count is not None else events)
+
+
+async def _open_stream(
+    request: Dict[str, Any],
+    pool: BackendPool,
+    profile: Optional[str],
+    affinity_key: Optional[str],
+    user: str,
+    priority: str,
+) -> AsyncIterator[bytes]:
+    """업스트림 스트림을 열고 SSE 청크 중계 제너레이터 반환
+
+    오류 응답은 StreamingResponse를 시작하기 전에 HTTPException으로 올린다.
+    어드미션 슬롯과 백엔드 점유는 스트림이 끝날 때까지 유지된다.
+    """
+    ticket = await admission_controller.admit(pool, user, priority, request_cost(request))
+    try:
+        # 모델 전환(라우팅 교체) 중이면 잠시 대기
+        await pool.wait_routable()
+        lease = pool.acquire(affinity_key)
+    except BaseException:
+        ticket.release()
+        raise
+
+    # 라우팅 대기 시간은 제외하고 업스트림 호출 시점부터 측정
+    timer = StreamTimer(profile)
+    try:
+        response = await open_upstream_stream(
+            upstream_client.client,
+            f"{lease.url}/chat/completions",
+            request,
+        )
+    except asyncio.TimeoutError:
+        lease.release()
+        ticket.release()
+        logger.error("vLLM 스트림 응답 헤더 대기 시간 초과")
+        raise HTTPException(status_code=504, detail="vLLM 서버 응답 시간 초과")
+    except httpx.RequestError as e:
+        lease.release(success=False, error=str(e))
+        ticket.release()
+        raise
+    except BaseException:
+        lease.release()
+        ticket.release()
+        raise
+
+    if response.status_code != 200:
+        error_body = await response.aread()
+        await response.aclose()
+        lease.release()
+        ticket.release()
+        logger.error(f"vLLM 스트림 오류 응답: {response.status_code}")
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=error_body.decode("utf-8", errors="ignore")[:500],
+        )
+
+    async def on_close(success: bool):
+        lease.release(success=success)
+        ticket.release()
+        usage = timer.usage or {}
+        completion_tokens = usage.get("completion_tokens") or timer.approx_output_tokens
+        await rate_limiter.consume_tokens(user, completion_tokens)
+        await usage_meter.record(_user_id(user), profile_label(profile), usage.get("prompt_tokens") or 0, completion_tokens)
+
+    return relay_stream(response, timer, on_close=on_close)
+
+
+async def _stream_chunks(
+    request: Dict[str, Any],
+    pool: BackendPool,
+    profile: Optional[str],
+    affinity_key: Optional[str],
+    coalesce_key: Optional[str],
+    user: str,
+    priority: str,
+) -> AsyncIterator[bytes]:
+    """업스트림 SSE 청크 제너레이터 (coalesce_key가 있으면 같은 키로 진행 중인 스트림에 합류)"""
+    flight, is_leader = coalescer.join_stream(coalesce_key) if coalesce_key else (None, True)
+
+    if flight is None:
+        chunks = await _open_stream(request, pool, profile, affinity_key, user, priority)
+    elif is_leader:
+        try:
+            flight.attach(await _open_stream(request, pool, profile, affinity_key, user, priority))
+        except BaseException as e:
+            flight.fail(e)
+            raise
+        chunks = flight.subscribe()
+    else:
+        logger.info("진행 중인 동일 스트림에 합류")
+        await flight.wait_opened()
+        chunks = _meter_follower(flight.subscribe(), user, profile)
+    return chunks
+
+
+async def _meter_follower(chunks: AsyncIterator[bytes], user: str, profile: Optional[str]) -> AsyncIterator[bytes]:
+    """합류한 팔로워가 받은 응답을 그 사용자의 토큰 사용량에 집계 (레이트 리미터 차감은 리더만)
+
+    끝까지 받았으면 리더 스트림의 usage를, 중간에 끊었으면 받은 이벤트 수를 쓴다.
+    """
+    events = 0
+    tail: deque[bytes] = deque(maxlen=4)
+    try:
+        async for chunk in chunks:
+            events += chunk.count(b"data:") - chunk.count(b"[DONE]")
+            tail.append(chunk)
+            yield chunk
+    finally:
+        usage = {}
+        for payload in iter_sse_payloads(b"".join(tail)):
+            usage = payload.get("usage") or usage
+        completion_tokens = usage.get("completion_tokens") or max(events - 1, 0)
+        await usage_meter.record(_user_id(user), profile_label(profile), usage.get("prompt_tokens") or 0, completion_tokens)
+
+
+async def _stream_chat(
+    request: Dict[str, Any],
+    pool: BackendPool,
+    profile: Optional[str],
+    affinity_key: Optional[str],
+    coalesce_key: Optional[str],
+    user: str,
+    priority: str,
+    turn: Optional[_TurnRecord] = None,
+) -> StreamingResponse:
+    """스트리밍 요청 처리 - 업스트림 SSE를 청크 단위로 즉시 전달"""
+    chunks = await _stream_chunks(request, pool, profile, affinity_key, coalesce_key, user, priority)
+    if turn is not None:
+        chunks = _record_stream_turn(chunks, turn, request)
+    logger.info("스트리밍 응답 처리 시작")
+    return StreamingResponse(chunks, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _stream_error_message(error: BaseException) -> str:
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    if isinstance(error, AdmissionRejected):
+        return error.detail
+    if isinstance(error, httpx.RequestError):
+        return "vLLM 서버 연결 실패"
+    return str(error)
+
+
+def _wake_then_stream(
+    request: Dict[str, Any],
+    profile: Optional[str],
+    affinity_key: Optional[str],
+    coalesce_key: Optional[str],
+    user: str,
+    priority: str,
+    turn: Optional[_TurnRecord] = None,
+) -> StreamingResponse:
+    """유휴 언로드된 기본 인스턴스를 깨우는 동안 진행 이벤트를 보내고, 준비되면 업스트림 스트림 중계
+
+    응답이 이미 시작되었으므로 이후 오류는 HTTP 상태 대신 SSE 오류 이벤트로 알린다.
+    """
+    async def generate() -> AsyncIterator[bytes]:
+        try:
+            async for progress in model_manager.wake_progress():
+                yield sse_progress_event({"type": "model_wake", **progress})
+            chunks = await _stream_chunks(request, backend_pool, profile, affinity_key, coalesce_key, user, priority)
+            if turn is not None:
+                chunks = _record_stream_turn(chunks, turn, request)
+        except Exception as e:
+            logger.error(f"재기동 후 스트림 시작 실패: {e}")
+            yield sse_error_event(_stream_error_message(e))
+            yield b"data: [DONE]\n\n"
+            return
+        async for chunk in chunks:
+            yield chunk
+
+    logger.info("유휴 언로드 상태 - 재기동 후 스트리밍 응답")
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _wait_awake():
+    """유휴 언로드된 기본 인스턴스가 다시 준비될 때까지 대기 (제한 시간 내 실패 시 503)"""
+    try:
+        await model_manager.ensure_awake()
+    except TimeoutError:
+        progress = model_manager.wake_status()
+        remaining = (progress["expected_s"] or 0) - progress["elapsed_s"]
+        raise HTTPException(
+            status_code=503,
+            detail="모델 재기동 대기 시간 초과",
+            headers={"Retry-After": str(max(5, int(remaining + 0.5)))},
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+async def _complete_chat(
+    request: Dict[str, Any],
+    pool: BackendPool,
+    affinity_key: Optional[str],
+) -> httpx.Response:
+    """비스트리밍 요청을 vLLM으로 전달하고 본문까지 읽은 응답 반환"""
+    # vLLM API로 요청 전달 (프로세스 공용 커넥션 풀 사용)
+    client = upstream_client.client
+    await pool.wait_routable()
+    with pool.acquire(affinity_key) as lease:
+        response = await client.post(
+            f"{lease.url}/chat/completions",
+            json=request,
+            headers={"Content-Type": "application/json"},
+        )
+
+    logger.info(f"vLLM 응답 상태: {response.status_code}, content-type: {response.headers.get('content-type', 'None')}")
+
+    # 일반 JSON 응답
+    response_text = await response.aread()
+    logger.info(f"응답 텍스트 길이: {len(response_text)}")
+    if not response_text:
+        raise HTTPException(status_code=502, detail="vLLM 서버에서 빈 응답을 받았습니다")
+    return response
+
+
+class _RequestLogContext:
+    """요청 로그 한 건의 공통 필드 (요청 시작 시점에 계산, 모델은 라우팅 후 실제 서빙 프로파일로 채움)"""
+
+    def __init__(self, request: Dict[str, Any], user: str):
+        self.started_at = time.perf_counter()
+        self.model: Optional[str] = None  # 라우팅 전에 실패하면 None
+        # 비스트리밍 응답은 업스트림 오류 본문도 그대로 돌려주므로 실제 업스트림 상태를 따로 기록
+        self.upstream_status = 200
+        self.upstream_error: Optional[str] = None
+        self.user_id, self.conversation_id = _request_ids(request, user)
+
+    def record(self, status_code: int, usage: Optional[dict] = None, output_tokens: int = 0, error: Optional[str] = None):
+        usage = usage or {}
+        request_log_writer.record(
+            model=self.model,
+            status_code=status_code,
+            latency_ms=(time.perf_counter() - self.started_at) * 1000,
+            user_id=self.user_id,
+            conversation_id=self.conversation_id,
+            input_tokens=usage.get("prompt_tokens") or 0,
+            output_tokens=usage.get("completion_tokens") or output_tokens,
+            error_message=error,
+        )
+
+
+def _response_usage(response: Any) -> Optional[dict]:
+    """비스트리밍 응답(dict 또는 JSON 본문 Response)의 usage"""
+    if isinstance(response, Response):
+        try:
+            response = json.loads(response.body)
+        except ValueError:
+            return None
+    return response.get("usage") if isinstance(response, dict) else None
+
+
+def _upstream_error(result: Any) -> str:
+    """vLLM 오류 본문({"message": ...} 또는 {"error": {...}})의 메시지"""
+    if isinstance(result, dict):
+        error = result.get("error")
+        if isinstance(error, dict):
+            error = error.get("message", error)
+        return str(error or result.get("message") or result)[:1000]
+    return str(result)[:1000]
+
+
+async def _log_stream(chunks: AsyncIterator[bytes], log: _RequestLogContext) -> AsyncIterator[bytes]:
+    """스트림을 그대로 전달하고, 끝나면 토큰 수와 결과를 요청 로그에 기록
+
+    청크마다 data: 이벤트 수만 세고, usage/오류는 종료 후 마지막 몇 청크에서만 찾는다.
+    클라이언트가 먼저 끊은 스트림은 499로 기록한다.
+    """
+    events = 0
+    tail: deque[bytes] = deque(maxlen=8)
+    status_code = 499
+    try:
+        async for chunk in chunks:
+            events += chunk.count(b"data:") - chunk.count(b"[DONE]") - chunk.count(b"event: gateway.progress")
+            tail.append(chunk)
+            yield chunk
+        status_code = 200
+    finally:
+        usage, error = None, None
+        for payload in iter_sse_payloads(b"".join(tail)):
+            if payload.get("usage"):
+                usage = payload["usage"]
+            if payload.get("error"):
+                error = str((payload["error"] or {}).get("message", payload["error"]))
+        if error is not None and status_code == 200:
+            status_code = 502
+        log.record(status_code, usage, output_tokens=max(events - 1, 0), error=error)
+
 
 @router.post("/chat")
 async def chat_completion(
     request: Dict[str, Any],
+    http_request: Request,
     user = Depends(verify_token)
 ):
-    """채팅 완성 API - vLLM으로 프록시"""
+    """채팅 완성 API - vLLM으로 프록시 (요청마다 request_logs에 기록)"""
+    log = _RequestLogContext(request, user)
+    try:
+        response = await _chat_completion(request, http_request, user, log)
+    except HTTPException as e:
+        log.record(e.status_code, error=str(e.detail))
+        raise
+    if isinstance(response, StreamingResponse):
+        chunks = _log_stream(response.body_iterator, log)
+        if _injects_stream_usage(request):
+            chunks = _drop_usage_events(chunks)
+        response.body_iterator = chunks
+    else:
+        log.record(log.upstream_status, _response_usage(response), error=log.upstream_error)
+    return response
+
+
+async def _chat_completion(
+    request: Dict[str, Any],
+    http_request: Request,
+    user: str,
+    log: _RequestLogContext,
+):
     try:
         logger.info(f"채팅 요청 받음: stream={request.get('stream', False)}")
-        
-        # vLLM API로 요청 전달
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.VLLM_BASE_URL}/chat/completions",
-                json=request,
-                headers={"Content-Type": "application/json"},
-                timeout=60.0
+
+        # 라우팅 키 계산 후 게이트웨이 전용 필드는 vLLM으로 보내지 않음
+        affinity_key = affinity_key_for(request)
+        turn = _turn_target(request, user)
+        request = {key: value for key, value in request.items() if key != "conversation_id"}
+        if request.get("message") is not None:
+            request = await _with_server_context(request, turn)
+        if _injects_stream_usage(request):
+            request["stream_options"] = {"include_usage": True}
+        request, pool, profile = _route(request)
+        log.model = profile
+        request = await _fit_context(request, profile, turn)
+        user_id = turn.user_id if turn is not None else _user_id(user)
+        await _check_quota(user_id, profile)
+
+        deterministic = is_deterministic(request)
+        fingerprint = request_fingerprint(request, profile) if deterministic else None
+        coalesce_key = fingerprint if coalescer.enabled else None
+        priority = http_request.headers.get("x-request-priority", "interactive").lower()
+
+        # 스트리밍 요청은 업스트림 스트림을 그대로 전달
+        if request.get("stream", False):
+            if pool is backend_pool and model_manager.asleep:
+                return _wake_then_stream(request, profile, affinity_key, coalesce_key, user, priority, turn)
+            if pool is backend_pool:
+                model_manager.record_activity()
+            return await _stream_chat(request, pool, profile, affinity_key, coalesce_key, user, priority, turn)
+
+        # 결정적 요청은 응답 캐시 조회 (옵트인)
+        cache_read, cache_write = False, False
+        if response_cache.enabled and deterministic:
+            cache_read, cache_write = _cache_directives(http_request)
+            if not cache_read:
+                response_cache.record_bypass()
+
+        if cache_read:
+            cached = await response_cache.get(profile, fingerprint)
+            if cached is not None:
+                if turn is not None:
+                    await _record_turn(turn, request, json.loads(cached))
+                return Response(cached, media_type="application/json", headers={"X-Cache": "HIT"})
+
+        async def fetch() -> httpx.Response:
+            if pool is backend_pool:
+                await _wait_awake()
+            ticket = await admission_controller.admit(pool, user, priority, request_cost(request))
+            started_at = time.perf_counter()
+            try:
+                upstream_response = await _complete_chat(request, pool, affinity_key)
+            finally:
+                ticket.release()
+            elapsed = time.perf_counter() - started_at
+            if upstream_response.status_code == 200:
+                if cache_write:
+                    await response_cache.set(profile, fingerprint, upstream_response.content)
+                # 업스트림 호출 1회분의 생성 토큰만 차감 (병합된 팔로워/캐시 적중은 제외)
+                try:
+                    usage = upstream_response.json().get("usage") or {}
+                except ValueError:
+                    usage = {}
+                completion_tokens = usage.get("completion_tokens", 0)
+                await rate_limiter.consume_tokens(user, completion_tokens)
+                OUTPUT_TOKENS.labels(profile=profile_label(profile)).inc(completion_tokens)
+                if completion_tokens:
+                    OUTPUT_TOKENS_PER_SECOND.labels(profile=profile_label(profile), stream="false").observe(
+                        completion_tokens / elapsed
+                    )
+            return upstream_response
+
+        logger.info("일반 JSON 응답 처리 시작")
+        if coalesce_key:
+            response = await coalescer.run(coalesce_key, fetch)
+        else:
+            response = await fetch()
+
+        try:
+            result = response.json()
+        except Exception as json_error:
+            logger.error(f"JSON 파싱 오류: {json_error}")
+            logger.error(f"응답 텍스트: {response.content.decode('utf-8', errors='ignore')[:500]}")
+            raise HTTPException(status_code=502, detail=f"vLLM 응답 파싱 실패: {str(json_error)}")
+
+        if response.status_code != 200:
+            log.upstream_status = response.status_code
+            log.upstream_error = _upstream_error(result)
+
+        if response.status_code == 200:
+            # 합류한 팔로워도 같은 응답을 받았으므로 각자의 사용량에 집계 (캐시 적중은 제외)
+            usage = (result.get("usage") if isinstance(result, dict) else None) or {}
+            await usage_meter.record(
+                user_id, profile_label(profile), usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
             )
-            
-            logger.info(f"vLLM 응답 상태: {response.status_code}, content-type: {response.headers.get('content-type', 'None')}")
-            
-            # 스트리밍 요청인지 확인
-            if request.get("stream", False):
-                logger.info("스트리밍 응답 처리 시작")
-                # SSE 스트리밍 응답
-                return StreamingResponse(
-                    response.aiter_text(),
-                    media_type="text/plain",
-                    headers={
-                        "Cache-Control": "no-cache",
-                        "Connection": "keep-alive",
-                        "Access-Control-Allow-Origin": "*",
-                    }
-                )
-            else:
-                logger.info("일반 JSON 응답 처리 시작")
-                # 일반 JSON 응답
-                response_text = await response.aread()
-                logger.info(f"응답 텍스트 길이: {len(response_text)}")
-                if response_text:
-                    try:
-                        return response.json()
-                    except Exception as json_error:
-                        logger.error(f"JSON 파싱 오류: {json_error}")
-                        logger.error(f"응답 텍스트: {response_text.decode('utf-8', errors='ignore')[:500]}")
-                        raise HTTPException(status_code=502, detail=f"vLLM 응답 파싱 실패: {str(json_error)}")
-                else:
-                    raise HTTPException(status_code=502, detail="vLLM 서버에서 빈 응답을 받았습니다")
-                
+            await _record_turn(turn, request, result)
+
+        if cache_write and response.status_code == 200:
+            return Response(response.content, media_type="application/json", headers={"X-Cache": "MISS"})
+
+        return result
+
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        logger.warning(f"어드미션 거절: {e.detail}", user=user, priority=priority)
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(max(1, int(e.retry_after + 0.5)))},
+        )
+    except NoHealthyBackendError as e:
+        logger.error(f"vLLM 백엔드 선택 실패: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except httpx.RequestError as e:
         logger.error(f"vLLM 연결 오류: {e}")
         raise HTTPException(status_code=502, detail="vLLM 서버 연결 실패")
@@ -1,70 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 import structlog
-from ..routers.auth import verify_token
-from typing import List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..routers.auth import get_user, verify_token
+from ..schemas.conversation import (
+    ConversationCreate,
+    ConversationDetail,
+    ConversationPage,
+    ConversationSummary,
+    MessageAppendRequest,
+    MessageOut,
+    MessagePage,
+)
+from ..services.conversation_repository import MAX_PAGE_SIZE, ConversationRepository, InvalidCursor
 
 router = APIRouter()
 logger = structlog.get_logger()
 
 
-@router.get("/conversations")
+def _user_id(username: str) -> int:
+    """토큰의 사용자명을 users 테이블 ID로 변환"""
+    user = get_user(username)
+    if user is None:
+        raise HTTPException(status_code=403, detail="등록되지 않은 사용자")
+    return int(user["user_id"])
+
+
+def _invalid_cursor(e: InvalidCursor) -> HTTPException:
+    return HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/conversations", response_model=ConversationPage)
 async def get_conversations(
-    user = Depends(verify_token)
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user = Depends(verify_token),
+    db: AsyncSession = Depends(get_db),
 ):
-    """사용자의 대화 목록 조회"""
-    # 현재는 더미 데이터 반환
-    return {
-        "conversations": [
-            {
-                "id": "conv1",
-                "title": "Python 코딩 질문",
-                "created_at": "2025-01-15T10:00:00Z",
-                "message_count": 5
-            },
-            {
-                "id": "conv2", 
-                "title": "FastAPI 개발",
-                "created_at": "2025-01-14T15:30:00Z",
-                "message_count": 12
-            }
-        ]
-    }
-
-
-@router.get("/conversations/{conversation_id}")
+    """사용자의 대화 목록 조회 (최근 갱신 순, 커서 페이지네이션)"""
+    try:
+        conversations, next_cursor = await ConversationRepository(db).list_conversations(
+            _user_id(user), limit, cursor
+        )
+    except InvalidCursor as e:
+        raise _invalid_cursor(e)
+    return ConversationPage(conversations=conversations, next_cursor=next_cursor)
+
+
+@router.get("/conversations/{conversation_id}", response_model=ConversationDetail)
 async def get_conversation(
-    conversation_id: str,
-    user = Depends(verify_token)
+    conversation_id: int,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    user = Depends(verify_token),
+    db: AsyncSession = Depends(get_db),
 ):
-    """특정 대화 상세 조회"""
-    # 현재는 더미 데이터 반환
-    return {
-        "id": conversation_id,
-        "title": "대화 제목",
-        "created_at": "2025-01-15T10:00:00Z",
-        "messages": [
-            {
-                "role": "user",
-                "content": "안녕하세요!",
-                "timestamp": "2025-01-15T10:00:00Z"
-            },
-            {
-                "role": "assistant", 
-                "content": "안녕하세요! 무엇을 도와드릴까요?",
-                "timestamp": "2025-01-15T10:00:05Z"
-            }
-        ]
-    }
-
-
-@router.post("/conversations")
+    """특정 대화 상세 조회 (최근 메시지 한 페이지, 이전 메시지는 /messages로)"""
+    repository = ConversationRepository(db)
+    conversation = await repository.get_conversation(_user_id(user), conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="대화를 찾을 수 없습니다")
+    messages, next_cursor = await repository.list_messages(conversation_id, limit)
+    return ConversationDetail(**conversation, messages=messages, next_cursor=next_cursor)
+
+
+@router.get("/conversations/{conversation_id}/messages", response_model=MessagePage)
+async def get_messages(
+    conversation_id: int,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user = Depends(verify_token),
+    db: AsyncSession = Depends(get_db),
+):
+    """대화 메시지 페이지 조회 (cursor 이전의 메시지, 시간순)"""
+    repository = ConversationRepository(db)
+    if await repository.get_conversation(_user_id(user), conversation_id) is None:
+        raise HTTPException(status_code=404, detail="대화를 찾을 수 없습니다")
+    try:
+        messages, next_cursor = await repository.list_messages(conversation_id, limit, cursor)
+    except InvalidCursor as e:
+        raise _invalid_cursor(e)
+    return MessagePage(messages=messages, next_cursor=next_cursor)
+
+
+@router.post("/conversations", response_model=ConversationSummary, status_code=201)
 async def create_conversation(
-    request: Dict[str, Any],
-    user = Depends(verify_token)
+    request: ConversationCreate,
+    user = Depends(verify_token),
+    db: AsyncSession = Depends(get_db),
 ):
     """새 대화 생성"""
-    return {
-        "id": "new_conv_123",
-        "title": request.get("title", "새 대화"),
-        "created_at": "2025-01-15T12:00:00Z"
-    }
+    conversation = await ConversationRepository(db).create_conversation(
+        _user_id(user), request.title, request.model, request.system_prompt
+    )
+    logger.info("대화 생성", user=user, conversation_id=conversation["id"])
+    return conversation
+
+
+@router.post("/conversations/{conversation_id}/messages", response_model=list[MessageOut], status_code=201)
+async def append_messages(
+    conversation_id: int,
+    request: MessageAppendRequest,
+    user = Depends(verify_token),
+    db: AsyncSession = Depends(get_db),
+):
+    """대화에 메시지 일괄 추가"""
+    messages = await ConversationRepository(db).append_messages(
+        _user_id(user), conversation_id, [message.model_dump() for message in request.messages]
+    )
+    if messages is None:
+        raise HTTPException(status_code=404, detail="대화를 찾을 수 없습니다")
+    return messages
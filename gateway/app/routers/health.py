@@ -1,6 +1,19 @@
 from fastapi import APIRouter
 import structlog
 from ..config import settings
+from ..services.admission import admission_controller
+from ..services.backend_pool import backend_pool
+from ..services.coalescer import coalescer
+from ..services.context_cache import context_cache
+from ..services.context_window import context_window
+from ..services.model_fleet import model_fleet
+from ..services.rate_limiter import rate_limiter
+from ..services.request_log_writer import request_log_writer
+from ..services.response_cache import response_cache
+from ..services.token_cache import token_cache
+from ..services.turn_writer import turn_writer
+from ..services.usage_meter import usage_meter
+from ..services.upstream import upstream_client
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -22,5 +35,26 @@ async def readiness_check():
     # 여기서 vLLM 연결, 데이터베이스 연결 등을 확인할 수 있음
     return {
         "status": "ready",
-        "vllm_base_url": settings.VLLM_BASE_URL
+        "vllm_base_url": settings.VLLM_BASE_URL,
+        "healthy_backends": len(backend_pool.healthy_backends()),
+    }
+
+
+@router.get("/health/stats")
+async def gateway_stats():
+    """게이트웨이 내부 상태 통계"""
+    return {
+        "upstream_pool": upstream_client.pool_stats(),
+        "backends": backend_pool.stats(),
+        "model_instances": model_fleet.stats(),
+        "admission": admission_controller.stats(),
+        "response_cache": response_cache.stats(),
+        "coalescer": coalescer.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "auth_token_cache": token_cache.stats(),
+        "turn_writer": turn_writer.stats(),
+        "context_cache": context_cache.stats(),
+        "context_window": context_window.stats(),
+        "request_log_writer": request_log_writer.stats(),
+        "usage_meter": usage_meter.stats(),
     }
@@ -1,26 +1,70 @@
+import asyncio
 import logging
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..schemas.model import ModelStatusResponse, ModelSwitchRequest, ModelSwitchResponse
+from ..config import settings
+from ..database import get_db
+from ..schemas.model import ModelStatusResponse, ModelSwitchRequest, ModelSwitchResponse, PlacementRequest
+from ..services.capacity import estimate_capacity
+from ..services.gpu_telemetry import gpu_telemetry
+from ..services.model_fleet import model_fleet
 from ..services.model_manager import model_manager
+from ..services.model_status import StatusSnapshot, model_status_publisher
+from ..services.request_log_repository import RequestLogRepository
+from ..services.request_log_writer import request_log_writer
+from ..services.switch_history import switch_history
+from ..services.weight_prewarm import weight_prewarmer
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _snapshot_response(snapshot: StatusSnapshot) -> Response:
+    return Response(
+        content=snapshot.body,
+        media_type="application/json",
+        headers={"ETag": snapshot.etag, "Cache-Control": "no-cache"},
+    )
+
+
 @router.get("/models/status", response_model=ModelStatusResponse)
-async def get_model_status():
-    """현재 모델 상태 조회"""
+async def get_model_status(if_none_match: Optional[str] = Header(default=None)):
+    """현재 모델 상태 조회 (백그라운드 스냅샷, ETag 일치 시 304)"""
     try:
-        logger.info("=== 모델 상태 API 호출됨 ===")
-        result = await model_manager.get_status()
-        logger.info(f"모델 상태 결과: {result.status}")
-        return result
+        snapshot = await model_status_publisher.current()
     except Exception as e:
         logger.error(f"모델 상태 조회 실패: {e}")
         raise HTTPException(status_code=500, detail="모델 상태 조회 실패")
 
+    if if_none_match == snapshot.etag:
+        return Response(status_code=304, headers={"ETag": snapshot.etag})
+    return _snapshot_response(snapshot)
+
+
+@router.get("/models/status/watch", response_model=ModelStatusResponse)
+async def watch_model_status(
+    etag: Optional[str] = Query(default=None, description="클라이언트가 가진 스냅샷 ETag"),
+    timeout: float = Query(default=settings.MODEL_STATUS_WATCH_TIMEOUT, gt=0),
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """모델 상태 롱폴링 - 상태가 바뀌면 즉시 응답, timeout 동안 변경이 없으면 304"""
+    known_etag = etag or if_none_match
+    timeout = min(timeout, settings.MODEL_STATUS_WATCH_TIMEOUT)
+    try:
+        snapshot = await model_status_publisher.wait_for_change(known_etag, timeout)
+    except Exception as e:
+        logger.error(f"모델 상태 대기 실패: {e}")
+        raise HTTPException(status_code=500, detail="모델 상태 조회 실패")
+
+    if snapshot is None:
+        return Response(status_code=304, headers={"ETag": known_etag})
+    return _snapshot_response(snapshot)
+
 
 @router.get("/models/profiles")
 async def get_model_profiles():
@@ -47,6 +91,15 @@ async def switch_model(request: ModelSwitchRequest, background_tasks: Background
                 detail=f"프로파일 '{profile_id}'를 찾을 수 없습니다."
             )
 
+        strategy_error = model_manager.switch_strategy_error()
+        if strategy_error:
+            raise HTTPException(status_code=400, detail=strategy_error)
+
+        if model_manager.status == "switching":
+            raise HTTPException(status_code=409, detail="이미 모델 전환이 진행 중입니다.")
+        if model_manager.status == "waking":
+            raise HTTPException(status_code=409, detail="유휴 언로드된 모델을 재기동하는 중입니다.")
+
         if model_manager.current_profile == profile_id and model_manager.status == "running":
             return ModelSwitchResponse(
                 success=True,
@@ -71,6 +124,106 @@ async def switch_model(request: ModelSwitchRequest, background_tasks: Background
         raise HTTPException(status_code=500, detail="모델 전환 요청 실패")
 
 
+@router.get("/models/switch/history")
+async def get_switch_history(
+    profile_id: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=200),
+):
+    """모델 전환 기록 - 프로파일별 전체/단계별 소요 시간 p50·p95와 최근 전환"""
+    return await switch_history.summary(profile_id, limit)
+
+
+@router.get("/models/request-stats")
+async def get_request_stats(
+    hours: float = Query(default=24, gt=0, le=24 * 90),
+    bucket: Literal["minute", "hour", "day"] = "hour",
+    model: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    """request_logs 기준 모델별 시간대 요청 수, 지연 분포, 토큰 처리량"""
+    until = datetime.now(timezone.utc)
+    since = until - timedelta(hours=hours)
+    return {
+        "since": since,
+        "until": until,
+        "bucket": bucket,
+        "rollup": await RequestLogRepository(db).rollup(since, until, bucket, model),
+        "writer": request_log_writer.stats(),
+    }
+
+
+@router.post("/models/prefetch", status_code=202)
+async def prefetch_model(request: ModelSwitchRequest):
+    """전환 없이 프로파일 가중치만 페이지 캐시에 프리웜 (다음에 쓸 모델을 미리 준비)"""
+    profile = model_manager.profiles.get(request.profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"프로파일 '{request.profile_id}'를 찾을 수 없습니다."
+        )
+
+    job = weight_prewarmer.start(request.profile_id, profile.model_id)
+    model_status_publisher.request_refresh()
+    return job.snapshot()
+
+
+@router.get("/models/prefetch")
+async def get_prefetch_status():
+    """프로파일별 가중치 프리웜 진행 상황"""
+    return {"jobs": weight_prewarmer.stats()}
+
+
+@router.get("/models/instances")
+async def get_model_instances():
+    """동시 서빙 중인 멀티 모델 인스턴스 목록"""
+    return model_fleet.stats()
+
+
+@router.post("/models/placement/plan")
+async def plan_model_placement(request: PlacementRequest):
+    """멀티 모델 GPU 배치 계획 (드라이런, 인스턴스는 띄우지 않음)"""
+    try:
+        plan = await model_fleet.plan(request.profiles)
+        return plan.to_dict()
+    except Exception as e:
+        logger.error(f"배치 계획 실패: {e}")
+        raise HTTPException(status_code=500, detail="배치 계획 실패")
+
+
+@router.post("/models/instances")
+async def apply_model_placement(request: PlacementRequest, background_tasks: BackgroundTasks):
+    """배치 계획대로 멀티 모델 인스턴스 구성 (백그라운드에서 실행)"""
+    try:
+        plan = await model_fleet.plan(request.profiles)
+    except Exception as e:
+        logger.error(f"배치 계획 실패: {e}")
+        raise HTTPException(status_code=500, detail="배치 계획 실패")
+
+    if not plan.placements:
+        raise HTTPException(status_code=409, detail={"message": "배치 가능한 프로파일이 없습니다.", **plan.to_dict()})
+
+    background_tasks.add_task(model_fleet.apply, request.profiles)
+    return {"message": "멀티 모델 인스턴스 구성을 시작합니다.", **plan.to_dict()}
+
+
+@router.get("/models/gpu-telemetry")
+async def get_gpu_telemetry(window: float = Query(default=60.0, gt=0, le=3600)):
+    """GPU별 최근 메모리/사용률 샘플과 구간 통계"""
+    return gpu_telemetry.summary(window)
+
+
+def _estimate_capacities(profiles: dict, gpu_memory_mb: list[int]) -> dict[str, dict]:
+    capacities = {}
+    for profile_id, profile in profiles.items():
+        try:
+            capacities[profile_id] = estimate_capacity(
+                profile_id, profile, gpu_memory_mb, settings.ADMISSION_CAPACITY_CONTEXT_TOKENS
+            ).to_dict()
+        except ValueError as e:
+            capacities[profile_id] = {"error": str(e)}
+    return capacities
+
+
 @router.get("/models/hardware-recommendations")
 async def get_hardware_recommendations():
     """현재 하드웨어에 맞는 모델 추천"""
@@ -86,6 +239,10 @@ async def get_hardware_recommendations():
             "incompatible_profiles": []
         }
 
+        # KV 캐시 용량 추정 (가중치/토큰당 KV 메모리, 동시 시퀀스 수) - config.json/가중치 파일을 읽으므로 스레드에서
+        gpu_memory_mb = [gpu["memory_total_mb"] for gpu in hardware_info.get("gpus", [])]
+        capacities = await asyncio.to_thread(_estimate_capacities, dict(model_manager.profiles), gpu_memory_mb)
+
         for profile_id, profile in model_manager.profiles.items():
             compatibility = model_manager._check_hardware_compatibility(profile, hardware_info)
 
@@ -93,7 +250,8 @@ async def get_hardware_recommendations():
                 "profile_id": profile_id,
                 "name": profile.name,
                 "description": profile.description,
-                "compatibility": compatibility
+                "compatibility": compatibility,
+                "capacity": capacities[profile_id]
             }
 
             if compatibility["compatible"]:
@@ -120,6 +278,7 @@ async def reload_profiles():
     """프로파일 설정 재로드"""
     try:
         model_manager.load_profiles()
+        model_status_publisher.request_refresh()
         return {
             "success": True,
             "message": "프로파일이 성공적으로 재로드되었습니다.",
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..routers.auth import get_user, verify_token
+from ..services.usage_meter import usage_meter
+
+router = APIRouter()
+
+
+@router.get("/usage")
+async def get_usage(
+    days: int = Query(7, ge=1, le=90),
+    user = Depends(verify_token),
+    db: AsyncSession = Depends(get_db),
+):
+    """내 토큰 사용량 - 오늘(UTC) 실시간 합계와 한도, usage_daily의 최근 일별 × 모델별 기록"""
+    account = get_user(user)
+    if account is None:
+        raise HTTPException(status_code=403, detail="등록되지 않은 사용자")
+    user_id = int(account["user_id"])
+    return {
+        "today": await usage_meter.today(user_id),
+        "quota": usage_meter.quota_limits(),
+        "history": await usage_meter.history(db, user_id, days),
+    }
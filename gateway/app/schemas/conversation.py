@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ConversationCreate(BaseModel):
+    """대화 생성 요청 스키마"""
+    title: str = "새 대화"
+    model: Optional[str] = None
+    system_prompt: Optional[str] = None
+
+
+class MessageCreate(BaseModel):
+    """메시지 추가 요청 항목"""
+    role: Literal["system", "user", "assistant"]
+    content: str
+    token_count: int = 0
+
+
+class MessageAppendRequest(BaseModel):
+    """메시지 일괄 추가 요청 스키마"""
+    messages: list[MessageCreate] = Field(min_length=1, max_length=100)
+
+
+class ConversationSummary(BaseModel):
+    """대화 목록 항목"""
+    id: int
+    title: Optional[str]
+    model: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    message_count: int = 0
+
+
+class ConversationPage(BaseModel):
+    """대화 목록 한 페이지 (next_cursor로 다음 페이지 조회)"""
+    conversations: list[ConversationSummary]
+    next_cursor: Optional[str] = None
+
+
+class MessageOut(BaseModel):
+    """메시지 응답 항목"""
+    id: int
+    role: str
+    content: str
+    token_count: int = 0
+    created_at: datetime
+
+
+class MessagePage(BaseModel):
+    """메시지 한 페이지 (시간순, next_cursor로 더 이전 메시지 조회)"""
+    messages: list[MessageOut]
+    next_cursor: Optional[str] = None
+
+
+class ConversationDetail(ConversationSummary):
+    """대화 상세 - 최근 메시지 한 페이지 포함"""
+    system_prompt: Optional[str] = None
+    messages: list[MessageOut]
+    next_cursor: Optional[str] = None
@@ -14,6 +14,7 @@ class ModelProfile(BaseModel):
     dtype: str = "float16"
     swap_space: int = 4
     hardware_requirements: Optional[dict[str, Any]] = None
+    architecture: Optional[dict[str, Any]] = None  # 로컬 config.json이 없을 때 쓰는 모델 구조 (HF config 키)
 
 
 class HardwareInfo(BaseModel):
@@ -29,6 +30,11 @@ class ModelSwitchRequest(BaseModel):
     profile_id: str
 
 
+class PlacementRequest(BaseModel):
+    """멀티 모델 배치 요청 스키마 (동시에 서빙할 프로파일 목록)"""
+    profiles: list[str]
+
+
 class ModelSwitchResponse(BaseModel):
     """모델 전환 응답 스키마"""
     success: bool
@@ -44,3 +50,6 @@ class ModelStatusResponse(BaseModel):
     available_profiles: dict[str, ModelProfile]
     message: Optional[str] = None
     hardware_info: Optional[dict[str, Any]] = None
+    active_slot: Optional[str] = None  # blue/green 전환 시 현재 서비스 중인 슬롯
+    switch_timeline: Optional[list[dict[str, Any]]] = None  # 최근 모델 전환 단계별 기록
+    prewarm: Optional[list[dict[str, Any]]] = None  # 프로파일별 가중치 프리웜 진행 상황
@@ -0,0 +1,396 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+from ..config import settings
+from .backend_pool import BackendPool, backend_pool
+from .capacity import estimate_capacity
+from .gpu_telemetry import gpu_telemetry
+from .model_fleet import model_fleet
+from .model_manager import model_manager
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """대기열 한도/예상 대기 시간 초과로 요청을 조기 거절"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """vLLM 동시 실행 슬롯 하나 (해제 시 다음 대기자에게 넘김)"""
+
+    def __init__(self, controller: "AdmissionController", lane: "_Lane", waited: float):
+        self.controller = controller
+        self.lane = lane
+        self.waited = waited
+        self.granted_at = time.monotonic()
+        self._released = False
+
+    def release(self):
+        """슬롯 반납 (여러 번 호출해도 한 번만 반영)"""
+        if self._released:
+            return
+        self._released = True
+        self.controller._release(self.lane, time.monotonic() - self.granted_at)
+
+
+class _Waiter:
+    def __init__(self, user: str, cost: float):
+        self.user = user
+        self.cost = cost
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class _UserQueue:
+    def __init__(self):
+        self.waiters: deque[_Waiter] = deque()
+        self.deficit = 0.0
+        self.turn_started = False
+
+
+class _PriorityClass:
+    """우선순위 클래스 하나 - 사용자별 큐를 Deficit Round Robin으로 순회"""
+
+    def __init__(self, name: str, weight: int):
+        self.name = name
+        self.weight = weight
+        self.served = 0
+        self.queues: OrderedDict[str, _UserQueue] = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(len(queue.waiters) for queue in self.queues.values())
+
+    def push(self, waiter: _Waiter):
+        queue = self.queues.get(waiter.user)
+        if queue is None:
+            queue = self.queues[waiter.user] = _UserQueue()
+        queue.waiters.append(waiter)
+
+    def pop(self, quantum: float) -> Optional[_Waiter]:
+        """DRR: 차례가 온 사용자 큐에 quantum을 더하고 deficit 안에서 서비스"""
+        while self.queues:
+            user, queue = next(iter(self.queues.items()))
+            while queue.waiters and queue.waiters[0].future.done():
+                queue.waiters.popleft()  # 취소된 대기자
+            if not queue.waiters:
+                del self.queues[user]
+                continue
+
+            head = queue.waiters[0]
+            if queue.deficit >= head.cost:
+                queue.deficit -= head.cost
+                queue.waiters.popleft()
+                return head
+            if not queue.turn_started:
+                queue.deficit += quantum
+                queue.turn_started = True
+                continue
+            # 이번 차례 종료 - 다음 사용자로
+            queue.turn_started = False
+            self.queues.move_to_end(user)
+        return None
+
+
+class _Lane:
+    """라우팅 대상(백엔드 풀) 하나의 동시 실행 수와 우선순위별 대기열"""
+
+    def __init__(self, pool: BackendPool):
+        self.pool = pool
+        self.in_flight = 0
+        self.classes = {
+            "interactive": _PriorityClass("interactive", settings.ADMISSION_INTERACTIVE_WEIGHT),
+            "batch": _PriorityClass("batch", 1),
+        }
+
+    def queued(self) -> int:
+        return sum(len(cls) for cls in self.classes.values())
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0 and not any(cls.queues for cls in self.classes.values())
+
+
+class AdmissionController:
+    """vLLM 앞단 어드미션 컨트롤 - 동시 실행 상한, 사용자별 공정 대기열, 조기 부하 차단
+
+    동시 실행 수와 대기열은 라우팅 대상 풀마다 따로 두어, 한 모델(풀)로 몰린 요청이
+    다른 인스턴스의 슬롯을 쓰지 않게 한다. 풀의 상한은 정상 백엔드별 상한의 합이고,
+    풀 안에서는 라우팅 전략(최소 미처리 요청 등)이 백엔드에 고르게 나눈다.
+    """
+
+    def __init__(
+        self,
+        per_backend_limit: int = settings.ADMISSION_MAX_CONCURRENCY_PER_BACKEND,
+        deadline: float = settings.ADMISSION_QUEUE_DEADLINE,
+        quantum: float = settings.ADMISSION_DRR_QUANTUM,
+        max_queue_per_user: int = settings.ADMISSION_MAX_QUEUE_PER_USER,
+    ):
+        self.enabled = settings.ADMISSION_ENABLED
+        self.per_backend_limit = per_backend_limit
+        self.backend_limits: dict[str, int] = {}
+        self.deadline = deadline
+        self.quantum = quantum
+        self.max_queue_per_user = max_queue_per_user
+        self.lanes: dict[BackendPool, _Lane] = {}
+        self.service_time_ewma = settings.ADMISSION_INITIAL_SERVICE_TIME
+        self.recent_waits: deque[float] = deque(maxlen=1000)
+        self.counters = {"admitted": 0, "enqueued": 0, "shed_429": 0, "shed_503": 0, "timeouts": 0}
+        self.capacity_estimates: dict[str, dict] = {}
+        self._sync_task: Optional[asyncio.Task] = None
+        self._sync_requested = False
+        model_manager.add_status_listener(self.request_limit_sync)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(lane.in_flight for lane in self.lanes.values())
+
+    def capacity(self, pool: BackendPool) -> int:
+        """풀의 정상 백엔드별 동시 실행 상한의 합"""
+        healthy = pool.healthy_backends()
+        if not healthy:
+            return self.per_backend_limit
+        return sum(self.backend_limits.get(b.url, self.per_backend_limit) for b in healthy)
+
+    def _lane(self, pool: BackendPool) -> _Lane:
+        lane = self.lanes.get(pool)
+        if lane is None:
+            lane = self.lanes[pool] = _Lane(pool)
+        return lane
+
+    def set_backend_limit(self, url: str, limit: int):
+        """백엔드별 동시 실행 상한 지정 (용량 추정 결과 반영용)"""
+        self.backend_limits[url.rstrip("/")] = max(1, limit)
+        self._dispatch()
+
+    def request_limit_sync(self):
+        """상태 변경 이벤트 - 용량 기반 상한 재계산을 백그라운드로 예약 (진행 중이면 끝난 뒤 한 번 더)"""
+        if not settings.ADMISSION_AUTO_LIMIT:
+            return
+        self._sync_requested = True
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def _sync_loop(self):
+        while self._sync_requested:
+            self._sync_requested = False
+            try:
+                await self.sync_backend_limits()
+            except Exception as e:
+                logger.error(f"백엔드별 동시 실행 상한 갱신 실패: {e}")
+
+    async def sync_backend_limits(self):
+        """KV 캐시 용량 추정으로 백엔드별 동시 실행 상한 갱신 (모델 전환/멀티 모델 구성 변경 시 호출)
+
+        이 호스트가 띄운 인스턴스(기본 슬롯, 멀티 모델 인스턴스)만 대상으로 한다. 기본 슬롯은 현재
+        프로파일을 앞쪽 GPU에, 멀티 모델 인스턴스는 배치 계획의 GPU와 메모리 비율로 올라가 있다고 보고
+        ADMISSION_CAPACITY_CONTEXT_TOKENS 길이 시퀀스 기준으로 계산한다. 원격 레플리카와 추정할 수 없는
+        백엔드는 ADMISSION_MAX_CONCURRENCY_PER_BACKEND를 쓴다. NVML 조회와 config.json/가중치 파일
+        확인은 스레드에서 한다.
+        """
+        if not settings.ADMISSION_AUTO_LIMIT:
+            return
+        try:
+            samples = gpu_telemetry.latest() or await asyncio.to_thread(gpu_telemetry.sample_once)
+        except Exception as e:
+            logger.debug(f"GPU 정보 없음, 용량 기반 상한 생략: {e}")
+            return
+        gpu_memory_mb = [sample.memory_total_mb for sample in samples]
+
+        targets = []
+        profile_id = model_manager.current_profile
+        if profile_id in model_manager.profiles:
+            profile = model_manager.profiles[profile_id]
+            gpu_indices = list(range(profile.tensor_parallel_size))
+            local_urls = {url.rstrip("/") for url in (model_manager.vllm_base_url, settings.VLLM_GREEN_URL)}
+            for backend in backend_pool.backends:
+                if backend.url in local_urls:
+                    targets.append((backend.url, profile_id, profile, gpu_indices, None))
+        for instance in model_fleet.instances.values():
+            decision = instance.decision
+            targets.append((
+                instance.pool.backends[0].url,
+                instance.profile_id,
+                model_manager.profiles.get(instance.profile_id),
+                decision.gpu_indices,
+                decision.gpu_memory_utilization,
+            ))
+
+        limits, estimates = await asyncio.to_thread(_estimate_limits, targets, gpu_memory_mb)
+        if limits != self.backend_limits:
+            logger.info(f"백엔드별 동시 실행 상한 갱신 (용량 추정): {limits}")
+        self.backend_limits = limits
+        self.capacity_estimates = estimates
+        self._dispatch()
+
+    def queued(self) -> int:
+        return sum(lane.queued() for lane in self.lanes.values())
+
+    def estimate_wait(self, lane: _Lane, ahead: int) -> float:
+        """풀의 앞선 대기자 수 기준 예상 대기 시간 (초)"""
+        return self.service_time_ewma * (ahead + 1) / max(self.capacity(lane.pool), 1)
+
+    async def admit(
+        self, pool: BackendPool, user: str, priority: str = "interactive", cost: float = 1.0
+    ) -> AdmissionTicket:
+        """라우팅된 풀의 슬롯을 얻을 때까지 대기 (예상 대기 시간이 데드라인을 넘으면 즉시 거절)"""
+        lane = self._lane(pool)
+        if priority not in lane.classes:
+            priority = "interactive"
+        if not self.enabled or (lane.in_flight < self.capacity(pool) and lane.queued() == 0):
+            lane.in_flight += 1
+            self._record_admit(0.0)
+            return AdmissionTicket(self, lane, 0.0)
+
+        priority_class = lane.classes[priority]
+        user_queue = priority_class.queues.get(user)
+        if user_queue is not None and len(user_queue.waiters) >= self.max_queue_per_user:
+            self.counters["shed_429"] += 1
+            self._forget_if_idle(lane)
+            raise AdmissionRejected(
+                429, "사용자 대기열이 가득 찼습니다", self.estimate_wait(lane, len(user_queue.waiters))
+            )
+
+        estimated = self.estimate_wait(lane, lane.queued())
+        if estimated > self.deadline:
+            self.counters["shed_503"] += 1
+            self._forget_if_idle(lane)
+            raise AdmissionRejected(503, "서버가 혼잡합니다", estimated)
+
+        waiter = _Waiter(user, cost)
+        if not priority_class.queues:
+            # 쉬고 있던 클래스가 누적 처리량 차이만큼 몰아서 앞지르지 않도록 맞춤
+            self._align_served(lane, priority_class)
+        priority_class.push(waiter)
+        self.counters["enqueued"] += 1
+        try:
+            await asyncio.wait_for(waiter.future, timeout=self.deadline)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            self._forget_if_idle(lane)
+            raise AdmissionRejected(503, "대기 시간이 초과되었습니다", self.estimate_wait(lane, lane.queued()))
+        except asyncio.CancelledError:
+            # 슬롯을 받은 직후 취소되면 슬롯을 돌려준다
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(lane, None)
+            raise
+
+        waited = time.monotonic() - waiter.enqueued_at
+        self._record_admit(waited)
+        return AdmissionTicket(self, lane, waited)
+
+    def _record_admit(self, waited: float):
+        self.counters["admitted"] += 1
+        self.recent_waits.append(waited)
+
+    def _align_served(self, lane: _Lane, priority_class: _PriorityClass):
+        active = [cls for cls in lane.classes.values() if cls.queues and cls is not priority_class]
+        if active:
+            progress = min(cls.served / cls.weight for cls in active)
+            priority_class.served = max(priority_class.served, int(progress * priority_class.weight))
+
+    def _next_waiter(self, lane: _Lane) -> Optional[_Waiter]:
+        # 클래스 간 가중 라운드 로빈: served/weight가 가장 작은 클래스부터
+        candidates = sorted(
+            (cls for cls in lane.classes.values() if cls.queues),
+            key=lambda cls: cls.served / cls.weight,
+        )
+        for cls in candidates:
+            waiter = cls.pop(self.quantum)
+            if waiter is not None:
+                cls.served += 1
+                return waiter
+        return None
+
+    def _dispatch(self, lane: Optional[_Lane] = None):
+        """빈 슬롯만큼 대기자 깨우기 (lane이 없으면 모든 풀 - 상한 변경 시)"""
+        for current in [lane] if lane is not None else list(self.lanes.values()):
+            capacity = self.capacity(current.pool)
+            while current.in_flight < capacity:
+                waiter = self._next_waiter(current)
+                if waiter is None:
+                    break
+                current.in_flight += 1
+                waiter.future.set_result(True)
+            self._forget_if_idle(current)
+
+    def _forget_if_idle(self, lane: _Lane):
+        # 멀티 모델 인스턴스 교체로 사라진 풀의 항목이 남지 않도록 쉬는 풀은 지운다
+        if lane.idle and self.lanes.get(lane.pool) is lane:
+            del self.lanes[lane.pool]
+
+    def _release(self, lane: _Lane, service_time: Optional[float]):
+        lane.in_flight -= 1
+        if service_time is not None:
+            self.service_time_ewma = 0.8 * self.service_time_ewma + 0.2 * service_time
+        self._dispatch(lane)
+
+    def stats(self) -> dict:
+        waits = sorted(self.recent_waits)
+
+        def percentile(q: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 1)
+
+        pools = [backend_pool] + [instance.pool for instance in model_fleet.instances.values()]
+        return {
+            "enabled": self.enabled,
+            "capacity": sum(self.capacity(pool) for pool in pools),
+            "backend_limits": self.backend_limits,
+            "in_flight": self.in_flight,
+            "queue_depth": {
+                name: sum(len(lane.classes[name]) for lane in self.lanes.values()) for name in ("interactive", "batch")
+            },
+            "pools": [
+                {
+                    "backends": [backend.url for backend in lane.pool.backends],
+                    "capacity": self.capacity(lane.pool),
+                    "in_flight": lane.in_flight,
+                    "queued": lane.queued(),
+                }
+                for lane in self.lanes.values()
+            ],
+            "service_time_ewma_s": round(self.service_time_ewma, 3),
+            "queue_wait_p50_ms": percentile(0.5),
+            "queue_wait_p95_ms": percentile(0.95),
+            **self.counters,
+        }
+
+
+def _estimate_limits(targets: list[tuple], gpu_memory_mb: list[int]) -> tuple[dict[str, int], dict[str, dict]]:
+    """(URL, 프로파일 ID, 프로파일, GPU 인덱스, 메모리 비율) 목록의 백엔드별 상한과 추정 내역 (파일 I/O 포함)"""
+    limits, estimates = {}, {}
+    for url, profile_id, profile, gpu_indices, utilization in targets:
+        if profile is None:
+            continue
+        try:
+            estimate = estimate_capacity(
+                profile_id,
+                profile,
+                [gpu_memory_mb[index] for index in gpu_indices if index < len(gpu_memory_mb)],
+                settings.ADMISSION_CAPACITY_CONTEXT_TOKENS,
+                gpu_memory_utilization=utilization,
+            )
+        except ValueError as e:
+            logger.debug(f"용량 추정 불가 ({profile_id}): {e}")
+            continue
+        limits[url] = max(1, estimate.max_concurrent_sequences)
+        estimates[url] = estimate.to_dict()
+    return limits, estimates
+
+
+def request_cost(request: dict) -> float:
+    """DRR 비용 - 요청이 생성할 수 있는 최대 토큰 수"""
+    return float(request.get("max_tokens") or settings.ADMISSION_DEFAULT_MAX_TOKENS)
+
+
+# 전역 어드미션 컨트롤러 인스턴스
+admission_controller = AdmissionController()
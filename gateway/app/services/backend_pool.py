@@ -0,0 +1,359 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import math
+import random
+import time
+from typing import Optional
+
+import httpx
+
+from ..config import settings
+from .upstream import upstream_client
+
+logger = logging.getLogger(__name__)
+
+
+class NoHealthyBackendError(RuntimeError):
+    """라우팅 가능한 vLLM 백엔드가 없음"""
+
+
+class Backend:
+    """vLLM 레플리카 하나의 상태"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.healthy = True  # 첫 헬스 체크 전까지는 정상으로 간주
+        self.outstanding = 0
+        self.total_requests = 0
+        self.total_failures = 0
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.last_checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.models: list[dict] = []
+
+    def record_success(self, healthy_threshold: int):
+        self.consecutive_failures = 0
+        self.consecutive_successes += 1
+        self.last_error = None
+        if not self.healthy and self.consecutive_successes >= healthy_threshold:
+            self.healthy = True
+            logger.info(f"vLLM 백엔드 재투입: {self.url}")
+
+    def record_failure(self, error: str, unhealthy_threshold: int):
+        self.consecutive_successes = 0
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        self.last_error = error
+        if self.healthy and self.consecutive_failures >= unhealthy_threshold:
+            self.healthy = False
+            logger.warning(f"vLLM 백엔드 제외: {self.url} ({error})")
+
+    def snapshot(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_checked_at": self.last_checked_at,
+            "last_error": self.last_error,
+            "models": [model.get("id") for model in self.models],
+        }
+
+
+class BackendLease:
+    """백엔드 하나에 대한 요청 점유권 (해제 시 outstanding 감소)"""
+
+    def __init__(self, pool: "BackendPool", backend: Backend):
+        self.pool = pool
+        self.backend = backend
+        self._released = False
+
+    @property
+    def url(self) -> str:
+        return self.backend.url
+
+    def release(self, success: bool = True, error: Optional[str] = None):
+        """점유 해제 (여러 번 호출해도 한 번만 반영)"""
+        if self._released:
+            return
+        self._released = True
+        self.backend.outstanding -= 1
+        if not success:
+            self.pool.report_failure(self.backend, error or "request failed")
+
+    def __enter__(self) -> "BackendLease":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 연결 계열 오류만 백엔드 장애로 집계
+        failed = exc_type is not None and issubclass(exc_type, httpx.RequestError)
+        self.release(success=not failed, error=str(exc) if failed else None)
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def affinity_key_for(request: dict) -> Optional[str]:
+    """프리픽스 어피니티 키 - conversation_id 또는 앞쪽 메시지들의 해시
+
+    같은 대화의 후속 턴은 시스템 프롬프트와 앞쪽 메시지가 동일하므로 같은 키를 얻는다.
+    """
+    conversation_id = request.get("conversation_id")
+    if conversation_id:
+        return f"conv:{conversation_id}"
+
+    messages = request.get("messages") or []
+    leading = messages[: settings.AFFINITY_PREFIX_MESSAGES]
+    if not leading:
+        return None
+    encoded = json.dumps(leading, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return f"prefix:{hashlib.sha256(encoded.encode()).hexdigest()}"
+
+
+class HashRing:
+    """가상 노드 기반 일관 해시 링"""
+
+    def __init__(self, backends: list[Backend], vnodes: int):
+        self._points: list[tuple[int, int]] = sorted(
+            (_hash64(f"{backend.url}#{replica}"), index)
+            for index, backend in enumerate(backends)
+            for replica in range(vnodes)
+        )
+        self._hashes = [point for point, _ in self._points]
+        self._backends = backends
+
+    def walk(self, key: str):
+        """키 위치에서 시계 방향으로 서로 다른 백엔드를 순서대로 반환"""
+        if not self._points:
+            return
+        start = bisect.bisect(self._hashes, _hash64(key))
+        seen: set[int] = set()
+        for offset in range(len(self._points)):
+            _, index = self._points[(start + offset) % len(self._points)]
+            if index in seen:
+                continue
+            seen.add(index)
+            yield self._backends[index]
+            if len(seen) == len(self._backends):
+                return
+
+
+class BackendPool:
+    """vLLM 멀티 레플리카 풀 - 헬스 체크와 최소 미처리 요청 기반 라우팅"""
+
+    STRATEGIES = ("least_outstanding", "p2c", "prefix_affinity")
+
+    def __init__(
+        self,
+        urls: list[str],
+        strategy: str = settings.BACKEND_ROUTING_STRATEGY,
+        health_check_interval: float = settings.BACKEND_HEALTH_CHECK_INTERVAL,
+        unhealthy_threshold: int = settings.BACKEND_UNHEALTHY_THRESHOLD,
+        healthy_threshold: int = settings.BACKEND_HEALTHY_THRESHOLD,
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"지원하지 않는 라우팅 전략: {strategy}")
+        self.backends = [Backend(url) for url in urls]
+        self.draining: list[Backend] = []  # 라우팅에서 빠졌지만 진행 중인 요청이 남은 백엔드
+        self._routable = asyncio.Event()
+        self._routable.set()
+        self.strategy = strategy
+        self.health_check_interval = health_check_interval
+        self.unhealthy_threshold = unhealthy_threshold
+        self.healthy_threshold = healthy_threshold
+        self._health_task: Optional[asyncio.Task] = None
+        self.ring = HashRing(self.backends, settings.AFFINITY_VNODES)
+        self.affinity_load_factor = settings.AFFINITY_LOAD_FACTOR
+        self.affinity_hits = 0
+        self.affinity_misses = 0
+        self.affinity_unkeyed = 0
+
+    def healthy_backends(self) -> list[Backend]:
+        return [backend for backend in self.backends if backend.healthy]
+
+    def pause_routing(self):
+        """라우팅 일시 중지 - 이후 도착한 요청은 wait_routable에서 대기"""
+        self._routable.clear()
+
+    def resume_routing(self):
+        self._routable.set()
+
+    async def wait_routable(self, timeout: float = settings.BLUE_GREEN_CUTOVER_HOLD):
+        """라우팅 전환 중이면 끝날 때까지 대기 (timeout 초과 시 NoHealthyBackendError)"""
+        if self._routable.is_set():
+            return
+        try:
+            await asyncio.wait_for(self._routable.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise NoHealthyBackendError("모델 전환 중입니다. 잠시 후 다시 시도하세요")
+
+    def replace_backends(self, backends: list[Backend]) -> list[Backend]:
+        """라우팅 대상을 한 번에 교체하고 빠진 백엔드 목록 반환 (진행 중인 요청은 유지)"""
+        urls = {backend.url for backend in backends}
+        removed = [backend for backend in self.backends if backend.url not in urls]
+        self.backends = list(backends)
+        self.ring = HashRing(self.backends, settings.AFFINITY_VNODES)
+        self.draining.extend(removed)
+        logger.info(
+            f"vLLM 라우팅 전환: {[b.url for b in self.backends]} "
+            f"(드레인 대상: {[b.url for b in removed]})"
+        )
+        return removed
+
+    async def drain(self, backends: list[Backend], timeout: float) -> bool:
+        """빠진 백엔드의 진행 중인 요청이 모두 끝날 때까지 대기 (timeout 내 완료 여부 반환)"""
+        deadline = time.monotonic() + timeout
+        try:
+            while any(backend.outstanding > 0 for backend in backends):
+                if time.monotonic() >= deadline:
+                    logger.warning(
+                        f"드레인 시간 초과: 남은 요청 {sum(b.outstanding for b in backends)}개"
+                    )
+                    return False
+                await asyncio.sleep(0.2)
+            return True
+        finally:
+            self.draining = [backend for backend in self.draining if backend not in backends]
+
+    def _choose(self, candidates: list[Backend]) -> Backend:
+        if self.strategy == "p2c" and len(candidates) > 2:
+            first, second = random.sample(candidates, 2)
+            return first if first.outstanding <= second.outstanding else second
+
+        least = min(backend.outstanding for backend in candidates)
+        return random.choice([b for b in candidates if b.outstanding == least])
+
+    def _choose_by_affinity(self, key: str, candidates: list[Backend]) -> Backend:
+        """부하 상한이 있는 일관 해시 (bounded-load consistent hashing)
+
+        각 백엔드의 허용량은 ceil((1 + ε) × 평균 부하)이며, 홈 레플리카가 가득 차면
+        링을 따라 다음 레플리카로 넘긴다(spill). 홈에 배정되면 hit, 넘기면 miss로 집계한다.
+        """
+        total = sum(backend.outstanding for backend in candidates) + 1
+        capacity = math.ceil(self.affinity_load_factor * total / len(candidates))
+
+        home = None
+        for backend in self.ring.walk(key):
+            if not backend.healthy:
+                continue
+            if home is None:
+                home = backend
+            if backend.outstanding < capacity:
+                if backend is home:
+                    self.affinity_hits += 1
+                else:
+                    self.affinity_misses += 1
+                return backend
+
+        # 부하 상한상 항상 여유 있는 백엔드가 존재하지만 방어적으로 처리
+        self.affinity_misses += 1
+        return self._choose(candidates)
+
+    def acquire(self, affinity_key: Optional[str] = None) -> BackendLease:
+        """요청을 보낼 백엔드를 고르고 outstanding을 증가"""
+        candidates = self.healthy_backends()
+        if not candidates:
+            raise NoHealthyBackendError("사용 가능한 vLLM 백엔드가 없습니다")
+
+        if self.strategy == "prefix_affinity" and affinity_key:
+            backend = self._choose_by_affinity(affinity_key, candidates)
+        else:
+            if self.strategy == "prefix_affinity":
+                self.affinity_unkeyed += 1
+            backend = self._choose(candidates)
+        backend.outstanding += 1
+        backend.total_requests += 1
+        return BackendLease(self, backend)
+
+    def report_failure(self, backend: Backend, error: str):
+        """요청 경로에서 관측된 장애 반영 (패시브 헬스 체크)"""
+        backend.record_failure(error, self.unhealthy_threshold)
+
+    async def check_backend(self, backend: Backend) -> bool:
+        """백엔드 하나에 /v1/models 액티브 헬스 체크"""
+        backend.last_checked_at = time.time()
+        try:
+            response = await upstream_client.client.get(
+                f"{backend.url}/models",
+                timeout=settings.BACKEND_HEALTH_CHECK_TIMEOUT,
+            )
+            if response.status_code != 200:
+                backend.record_failure(f"HTTP {response.status_code}", self.unhealthy_threshold)
+                return False
+            backend.models = response.json().get("data", [])
+        except Exception as e:
+            backend.record_failure(str(e) or type(e).__name__, self.unhealthy_threshold)
+            return False
+
+        backend.record_success(self.healthy_threshold)
+        return True
+
+    async def refresh(self) -> bool:
+        """모든 백엔드를 동시에 점검하고 하나라도 정상인지 반환"""
+        await asyncio.gather(*(self.check_backend(backend) for backend in self.backends))
+        return any(backend.healthy for backend in self.backends)
+
+    def available_models(self) -> list[dict]:
+        """정상 백엔드가 서빙 중인 모델 목록 (중복 제거)"""
+        models: dict[str, dict] = {}
+        for backend in self.healthy_backends():
+            for model in backend.models:
+                models.setdefault(model.get("id", ""), model)
+        return [model for model_id, model in models.items() if model_id]
+
+    async def _health_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"백엔드 헬스 체크 루프 오류: {e}")
+            await asyncio.sleep(self.health_check_interval)
+
+    async def start(self):
+        """헬스 체크 루프 시작 (main.lifespan에서 호출)"""
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+            logger.info(f"vLLM 백엔드 풀 시작: {len(self.backends)}개, 전략={self.strategy}")
+
+    async def stop(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def stats(self) -> dict:
+        """백엔드별 부하 분포와 어피니티 적중률"""
+        routed = self.affinity_hits + self.affinity_misses
+        return {
+            "strategy": self.strategy,
+            "healthy": len(self.healthy_backends()),
+            "total": len(self.backends),
+            "routing_paused": not self._routable.is_set(),
+            "backends": [backend.snapshot() for backend in self.backends],
+            "draining": [backend.snapshot() for backend in self.draining],
+            "affinity": {
+                "hits": self.affinity_hits,
+                "misses": self.affinity_misses,
+                "unkeyed": self.affinity_unkeyed,
+                "hit_ratio": round(self.affinity_hits / routed, 4) if routed else None,
+            },
+        }
+
+
+def _configured_backend_urls() -> list[str]:
+    urls = [url.strip() for url in settings.VLLM_BACKEND_URLS.split(",") if url.strip()]
+    return urls or [settings.VLLM_BASE_URL]
+
+
+# 전역 백엔드 풀 인스턴스
+backend_pool = BackendPool(_configured_backend_urls())
@@ -0,0 +1,266 @@
+"""
+프로파일별 KV 캐시 용량 추정
+
+모델 구조(레이어 수, KV 헤드 수, head_dim 등)와 프로파일 설정(dtype, tensor_parallel_size,
+gpu_memory_utilization, max_model_len, swap_space)으로 GPU별 가중치 메모리, 토큰당 KV 바이트,
+주어진 컨텍스트 길이에서 동시에 유지할 수 있는 시퀀스 수를 계산한다.
+모델 구조는 로컬 HF 캐시의 config.json을 우선 사용하고, 없으면 프로파일의 architecture 항목을 쓴다.
+
+    python -m app.services.capacity --profiles-path ../model_profiles.yml \\
+        --gpus 24576,24576 --context 2048 deepseek-coder-7b
+"""
+
+import json
+import logging
+import math
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from ..schemas.model import ModelProfile
+from .weight_prewarm import resolve_snapshot, resolve_weight_files
+
+logger = logging.getLogger(__name__)
+
+DTYPE_BYTES = {
+    "float16": 2, "half": 2, "bfloat16": 2, "auto": 2,
+    "float32": 4, "float": 4,
+}
+KV_BLOCK_TOKENS = 16  # vLLM PagedAttention 블록 크기
+VLLM_MAX_NUM_SEQS = 256  # vLLM 기본 max_num_seqs (스케줄러가 동시에 돌리는 시퀀스 상한)
+RUNTIME_OVERHEAD_MB = 1536  # GPU당 활성화 메모리/CUDA 그래프/컨텍스트 몫 (vLLM 프로파일링 결과 근사)
+
+
+@dataclass(frozen=True)
+class ModelArchitecture:
+    """용량 계산에 필요한 모델 구조"""
+    num_layers: int
+    hidden_size: int
+    num_attention_heads: int
+    num_kv_heads: int
+    head_dim: int
+    vocab_size: int = 32000
+    intermediate_size: int = 0
+    tie_word_embeddings: bool = False
+    num_parameters: Optional[int] = None
+    torch_dtype: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "ModelArchitecture":
+        """HF config.json (또는 같은 키를 쓰는 프로파일 architecture 항목)에서 생성"""
+        text_config = config.get("text_config") or config  # 멀티모달 모델은 언어 모델 설정이 중첩됨
+        num_layers = text_config.get("num_hidden_layers") or text_config.get("n_layer") or text_config["num_layers"]
+        hidden_size = text_config.get("hidden_size") or text_config.get("n_embd") or text_config["d_model"]
+        heads = text_config.get("num_attention_heads") or text_config["n_head"]
+        kv_heads = (
+            text_config.get("num_key_value_heads")
+            or text_config.get("multi_query_group_num")
+            or text_config.get("num_kv_heads")
+            or heads
+        )
+        return cls(
+            num_layers=int(num_layers),
+            hidden_size=int(hidden_size),
+            num_attention_heads=int(heads),
+            num_kv_heads=int(kv_heads),
+            head_dim=int(text_config.get("head_dim") or hidden_size // heads),
+            vocab_size=int(text_config.get("vocab_size", 32000)),
+            intermediate_size=int(text_config.get("intermediate_size") or text_config.get("ffn_hidden_size") or 0),
+            tie_word_embeddings=bool(config.get("tie_word_embeddings", False)),
+            num_parameters=config.get("num_parameters"),
+            torch_dtype=config.get("torch_dtype"),
+        )
+
+    def estimated_parameters(self) -> int:
+        """파라미터 수 추정 (num_parameters가 없을 때, LLaMA 계열 gated MLP 기준)"""
+        if self.num_parameters:
+            return int(self.num_parameters)
+        q_dim = self.num_attention_heads * self.head_dim
+        kv_dim = self.num_kv_heads * self.head_dim
+        attention = self.hidden_size * (2 * q_dim + 2 * kv_dim)
+        intermediate = self.intermediate_size or 4 * self.hidden_size
+        mlp = 3 * self.hidden_size * intermediate
+        embeddings = self.vocab_size * self.hidden_size * (1 if self.tie_word_embeddings else 2)
+        return self.num_layers * (attention + mlp) + embeddings
+
+
+@dataclass
+class CapacityEstimate:
+    """프로파일 하나의 GPU 메모리/KV 캐시 용량 추정 결과"""
+    profile_id: str
+    architecture_source: str  # config.json | profile
+    weights_gb: float  # 전체 가중치 (GPU당은 / tensor_parallel_size)
+    weights_source: str  # files | parameters
+    kv_bytes_per_token: int  # 전체 GPU 합계 (K+V, 모든 레이어)
+    kv_cache_gb: float  # 전체 GPU의 KV 캐시 영역
+    kv_cache_tokens: int
+    swap_tokens: int  # CPU 스왑 영역에 둘 수 있는 토큰 수 (선점된 시퀀스용)
+    context_tokens: int
+    max_concurrent_sequences: int  # context_tokens 길이 시퀀스 기준 (vLLM max_num_seqs 상한 적용)
+    max_concurrent_at_max_len: int  # max_model_len 길이 시퀀스 기준
+    fits: bool  # KV 캐시가 max_model_len 시퀀스 하나를 담을 수 있는지 (아니면 vLLM 기동 실패)
+    message: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _snapshot_key(model_id: str) -> Optional[tuple[Path, float]]:
+    """스냅샷 디렉터리와 그 mtime (파일이 추가되면 mtime이 바뀌어 아래 캐시가 다시 읽음)"""
+    snapshot = resolve_snapshot(model_id)
+    if snapshot is None:
+        return None
+    return snapshot, snapshot.stat().st_mtime
+
+
+# vLLM이 아직 내려받는 중이면 config.json/가중치가 없거나 일부만 있으므로 스냅샷 mtime을 키에 넣어
+# 다운로드가 진행되면 다시 읽는다 (없음 결과가 프로세스 수명 동안 고정되지 않도록)
+@lru_cache(maxsize=64)
+def _read_config(snapshot: Path, mtime: float) -> Optional[dict]:
+    if not (snapshot / "config.json").is_file():
+        return None
+    with open(snapshot / "config.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=64)
+def _weight_bytes(model_id: str, snapshot: Path, mtime: float) -> int:
+    return sum(path.stat().st_size for path in resolve_weight_files(model_id))
+
+
+def _load_local_config(model_id: str) -> Optional[dict]:
+    key = _snapshot_key(model_id)
+    return _read_config(*key) if key is not None else None
+
+
+def _local_weight_bytes(model_id: str) -> int:
+    key = _snapshot_key(model_id)
+    return _weight_bytes(model_id, *key) if key is not None else 0
+
+
+def load_architecture(profile: ModelProfile) -> tuple[Optional[ModelArchitecture], str]:
+    """모델 구조와 출처 (로컬 config.json 우선, 없으면 프로파일 architecture)"""
+    try:
+        config = _load_local_config(profile.model_id)
+        if config is not None:
+            return ModelArchitecture.from_config(config), "config.json"
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"config.json 해석 실패 ({profile.model_id}): {e}")
+    if profile.architecture:
+        return ModelArchitecture.from_config(profile.architecture), "profile"
+    return None, "unknown"
+
+
+def estimate_capacity(
+    profile_id: str,
+    profile: ModelProfile,
+    gpu_memory_mb: list[int],
+    context_tokens: int,
+    gpu_memory_utilization: Optional[float] = None,
+    architecture: Optional[ModelArchitecture] = None,
+    architecture_source: str = "profile",
+    weight_bytes: Optional[int] = None,
+) -> CapacityEstimate:
+    """프로파일을 gpu_memory_mb(인스턴스가 쓰는 GPU들의 전체 메모리) 위에 올렸을 때의 용량
+
+    vLLM은 GPU마다 전체 메모리 × gpu_memory_utilization을 확보하고, 그중 가중치와
+    실행 오버헤드를 뺀 나머지를 KV 캐시 블록으로 나눈다.
+    """
+    if architecture is None:
+        architecture, architecture_source = load_architecture(profile)
+        if architecture is None:
+            raise ValueError(f"'{profile_id}' 모델 구조 정보 없음 (로컬 config.json 또는 프로파일 architecture 필요)")
+
+    tp = max(profile.tensor_parallel_size, 1)
+    utilization = gpu_memory_utilization or profile.gpu_memory_utilization
+    dtype_bytes = DTYPE_BYTES.get(profile.dtype, 2)
+
+    weights_source = "files"
+    if weight_bytes is None:
+        weight_bytes = _local_weight_bytes(profile.model_id)
+        stored_bytes = DTYPE_BYTES.get(architecture.torch_dtype or profile.dtype, dtype_bytes)
+        weight_bytes = weight_bytes * dtype_bytes // stored_bytes  # 저장 dtype과 서빙 dtype이 다르면 환산
+    if not weight_bytes:
+        weights_source = "parameters"
+        weight_bytes = architecture.estimated_parameters() * dtype_bytes
+
+    # KV 헤드는 TP로 나뉘고, 헤드 수보다 GPU가 많으면 복제된다
+    kv_heads_per_gpu = max(1, math.ceil(architecture.num_kv_heads / tp))
+    kv_bytes_per_token_per_gpu = 2 * architecture.num_layers * kv_heads_per_gpu * architecture.head_dim * dtype_bytes
+    kv_bytes_per_token = kv_bytes_per_token_per_gpu * tp
+
+    gpus = gpu_memory_mb[:tp]
+    if len(gpus) < tp:
+        raise ValueError(f"GPU {tp}개 필요 (전체 {len(gpu_memory_mb)}개)")
+    # 가장 작은 GPU 기준으로 모든 랭크가 같은 블록 수를 가짐
+    budget_per_gpu = (
+        min(gpus) * 1024 * 1024 * utilization
+        - weight_bytes / tp
+        - RUNTIME_OVERHEAD_MB * 1024 * 1024
+    )
+    blocks = max(0, int(budget_per_gpu // (kv_bytes_per_token_per_gpu * KV_BLOCK_TOKENS)))
+    kv_cache_tokens = blocks * KV_BLOCK_TOKENS
+    swap_tokens = int(profile.swap_space * 1024 ** 3 // (kv_bytes_per_token_per_gpu * KV_BLOCK_TOKENS)) * KV_BLOCK_TOKENS
+
+    def sequences(length: int) -> int:
+        per_sequence = math.ceil(max(length, 1) / KV_BLOCK_TOKENS)
+        return min(blocks // per_sequence, VLLM_MAX_NUM_SEQS)
+
+    context_tokens = min(context_tokens, profile.max_model_len)
+    at_max_len = sequences(profile.max_model_len)
+    fits = at_max_len >= 1
+    if fits:
+        message = f"{context_tokens} 토큰 시퀀스 {sequences(context_tokens)}개 동시 처리 가능"
+    elif budget_per_gpu <= 0:
+        message = "가중치와 실행 오버헤드가 할당 메모리를 넘음"
+    else:
+        message = f"KV 캐시({kv_cache_tokens} 토큰)가 max_model_len({profile.max_model_len})보다 작음"
+
+    return CapacityEstimate(
+        profile_id=profile_id,
+        architecture_source=architecture_source,
+        weights_gb=round(weight_bytes / 1024 ** 3, 2),
+        weights_source=weights_source,
+        kv_bytes_per_token=kv_bytes_per_token,
+        kv_cache_gb=round(max(budget_per_gpu, 0) * tp / 1024 ** 3, 2),
+        kv_cache_tokens=kv_cache_tokens,
+        swap_tokens=swap_tokens,
+        context_tokens=context_tokens,
+        max_concurrent_sequences=sequences(context_tokens),
+        max_concurrent_at_max_len=at_max_len,
+        fits=fits,
+        message=message,
+    )
+
+
+def main():
+    import argparse
+
+    import yaml
+
+    parser = argparse.ArgumentParser(description="model_profiles.yml 기준 KV 캐시 용량 추정")
+    parser.add_argument("profiles", nargs="+", help="추정할 프로파일 ID")
+    parser.add_argument("--profiles-path", default="/app/model_profiles.yml")
+    parser.add_argument("--gpus", default="24576,24576", help="GPU별 메모리(MB), 쉼표 구분")
+    parser.add_argument("--context", type=int, default=2048, help="동시 시퀀스 수를 계산할 컨텍스트 길이")
+    args = parser.parse_args()
+
+    with open(args.profiles_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    profiles = {
+        profile_id: ModelProfile(**data)
+        for profile_id, data in config.get("model_profiles", {}).items()
+    }
+    gpus = [int(memory) for memory in args.gpus.split(",")]
+    results = {}
+    for profile_id in args.profiles:
+        try:
+            results[profile_id] = estimate_capacity(profile_id, profiles[profile_id], gpus, args.context).to_dict()
+        except (KeyError, ValueError) as e:
+            results[profile_id] = {"error": str(e)}
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
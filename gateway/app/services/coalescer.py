@@ -0,0 +1,179 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _CallFlight:
+    """비스트리밍 요청 하나의 진행 중인 업스트림 호출"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class StreamFlight:
+    """스트리밍 요청 하나의 진행 중인 업스트림 스트림 (청크를 모든 구독자에게 팬아웃)
+
+    늦게 합류한 구독자도 이미 전송된 청크부터 다시 받는다. 모든 구독자가 떠나면
+    업스트림 스트림을 취소한다.
+    """
+
+    def __init__(self, coalescer: "RequestCoalescer", key: str):
+        self.coalescer = coalescer
+        self.key = key
+        self.chunks: list[bytes] = []
+        self.done = False
+        self.participants = 1
+        self.open_error: Optional[BaseException] = None
+        self._opened = asyncio.Event()
+        self._changed = asyncio.Event()
+        self._producer: Optional[asyncio.Task] = None
+
+    def attach(self, source: AsyncIterator[bytes]):
+        """리더가 연 업스트림 스트림을 연결하고 수신 시작"""
+        self._producer = asyncio.create_task(self._produce(source))
+        self._opened.set()
+
+    def fail(self, error: BaseException):
+        """리더가 업스트림을 열지 못함 - 대기 중인 팔로워에게도 같은 오류 전달"""
+        self.open_error = error
+        self.done = True
+        self._opened.set()
+        self.coalescer._finish_stream(self)
+
+    async def wait_opened(self):
+        """팔로워: 리더가 스트림을 열 때까지 대기 (실패 시 같은 오류 발생)"""
+        try:
+            await self._opened.wait()
+        except BaseException:
+            self.leave()
+            raise
+        if self.open_error is not None:
+            self.leave()
+            raise self.open_error
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _produce(self, source: AsyncIterator[bytes]):
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except asyncio.CancelledError:
+            logger.info(f"구독자가 모두 떠나 업스트림 스트림 취소: {self.key[:12]}")
+        finally:
+            await source.aclose()
+            self.done = True
+            self._notify()
+            self.coalescer._finish_stream(self)
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        """처음부터 모든 청크를 순서대로 전달하는 구독 제너레이터"""
+        index = 0
+        try:
+            while True:
+                while index < len(self.chunks):
+                    chunk = self.chunks[index]
+                    index += 1
+                    yield chunk
+                if self.done:
+                    return
+                await self._changed.wait()
+        finally:
+            self.leave()
+
+    def leave(self):
+        self.participants -= 1
+        if self.participants <= 0 and self._producer is not None and not self._producer.done():
+            self._producer.cancel()
+
+
+class RequestCoalescer:
+    """동일한 결정적 요청의 업스트림 호출을 하나로 합치는 single-flight 레이어"""
+
+    def __init__(
+        self,
+        enabled: bool = settings.COALESCE_ENABLED,
+        max_waiters: int = settings.COALESCE_MAX_WAITERS,
+    ):
+        self.enabled = enabled
+        self.max_waiters = max_waiters
+        self._calls: dict[str, _CallFlight] = {}
+        self._streams: dict[str, StreamFlight] = {}
+        self.counters = {"leaders": 0, "joined": 0, "overflow": 0}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """비스트리밍 호출 합치기 - 같은 키의 진행 중인 호출이 있으면 그 결과를 공유
+
+        업스트림 호출은 별도 태스크로 실행되어 리더의 연결이 끊겨도 남은 대기자가 있으면
+        계속 진행되고, 대기자가 모두 떠나면 취소된다.
+        """
+        flight = self._calls.get(key)
+        if flight is not None and flight.waiters >= self.max_waiters:
+            self.counters["overflow"] += 1
+            return await factory()
+
+        if flight is None:
+            flight = _CallFlight(asyncio.create_task(factory()))
+            self._calls[key] = flight
+            flight.task.add_done_callback(lambda _: self._finish_call(key, flight))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["joined"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _finish_call(self, key: str, flight: _CallFlight):
+        if self._calls.get(key) is flight:
+            del self._calls[key]
+        # 대기자가 모두 떠난 뒤 실패한 경우 "exception never retrieved" 경고 방지
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def join_stream(self, key: str) -> tuple[Optional[StreamFlight], bool]:
+        """스트리밍 호출 합류 - (flight, 리더 여부) 반환
+
+        flight가 None이면 대기자 상한 초과로 합치지 않고 단독 처리해야 한다.
+        """
+        flight = self._streams.get(key)
+        if flight is not None and not flight.done:
+            if flight.participants >= self.max_waiters:
+                self.counters["overflow"] += 1
+                return None, True
+            flight.participants += 1
+            self.counters["joined"] += 1
+            return flight, False
+
+        flight = StreamFlight(self, key)
+        self._streams[key] = flight
+        self.counters["leaders"] += 1
+        return flight, True
+
+    def _finish_stream(self, flight: StreamFlight):
+        if self._streams.get(flight.key) is flight:
+            del self._streams[flight.key]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            **self.counters,
+            "inflight_calls": len(self._calls),
+            "inflight_streams": len(self._streams),
+        }
+
+
+# 전역 요청 병합기 인스턴스
+coalescer = RequestCoalescer()
@@ -0,0 +1,243 @@
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..redis_client import RedisBreaker, get_redis
+from .conversation_repository import MAX_PAGE_SIZE, ConversationRepository
+from .turn_writer import turn_writer
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "ctx"
+LRU_KEY = f"{REDIS_KEY_PREFIX}:lru"  # sorted set: 대화 ID → 마지막 사용 시각
+SIZES_KEY = f"{REDIS_KEY_PREFIX}:sizes"  # hash: 대화 ID → 항목 바이트 수
+BYTES_KEY = f"{REDIS_KEY_PREFIX}:bytes"  # 전체 항목 바이트 합계
+
+# 항목 저장 + LRU 갱신 + 용량 초과분을 가장 오래 안 쓴 대화부터 제거 (원자적으로)
+# TTL로 먼저 만료된 항목의 크기는 LRU에서 밀려날 때 차감되므로 합계는 실제보다 크거나 같다
+_STORE_SCRIPT = """
+local prefix = ARGV[1]
+local id = ARGV[2]
+local value = ARGV[3]
+local previous = tonumber(redis.call('HGET', KEYS[2], id) or '0')
+redis.call('SET', prefix .. id, value, 'EX', ARGV[4])
+redis.call('ZADD', KEYS[1], ARGV[5], id)
+redis.call('HSET', KEYS[2], id, string.len(value))
+local total = redis.call('INCRBY', KEYS[3], string.len(value) - previous)
+local evicted = 0
+while total > tonumber(ARGV[6]) do
+  local oldest = redis.call('ZPOPMIN', KEYS[1])
+  if #oldest == 0 then break end
+  local size = tonumber(redis.call('HGET', KEYS[2], oldest[1]) or '0')
+  redis.call('HDEL', KEYS[2], oldest[1])
+  redis.call('DEL', prefix .. oldest[1])
+  total = redis.call('DECRBY', KEYS[3], size)
+  evicted = evicted + 1
+end
+return evicted
+"""
+
+# 항목 조회 + 있으면 LRU 갱신
+_LOAD_SCRIPT = """
+local value = redis.call('GET', ARGV[1] .. ARGV[2])
+if value then
+  redis.call('ZADD', KEYS[1], ARGV[3], ARGV[2])
+end
+return value
+"""
+
+_REMOVE_SCRIPT = """
+local size = tonumber(redis.call('HGET', KEYS[2], ARGV[2]) or '0')
+redis.call('HDEL', KEYS[2], ARGV[2])
+redis.call('ZREM', KEYS[1], ARGV[2])
+redis.call('DEL', ARGV[1] .. ARGV[2])
+if size > 0 then
+  redis.call('DECRBY', KEYS[3], size)
+end
+return size
+"""
+
+
+@dataclass
+class ConversationContext:
+    """프롬프트 복원에 쓰는 대화 컨텍스트 (시스템 프롬프트 + 최근 메시지)"""
+    user_id: int
+    system_prompt: Optional[str] = None
+    messages: list[dict] = field(default_factory=list)
+    cacheable: bool = field(default=True, compare=False)  # False면 누락된 턴이 있을 수 있어 Redis에 저장하지 않음
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {"user_id": self.user_id, "system_prompt": self.system_prompt, "messages": self.messages},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+
+    @classmethod
+    def from_bytes(cls, value: bytes) -> "ConversationContext":
+        data = json.loads(value)
+        return cls(user_id=data["user_id"], system_prompt=data.get("system_prompt"), messages=data["messages"])
+
+    def prompt(self, message: dict) -> list[dict]:
+        """vLLM에 보낼 전체 메시지 목록"""
+        system = [{"role": "system", "content": self.system_prompt}] if self.system_prompt else []
+        return system + self.messages + [message]
+
+    def extended(self, turn: list[dict]) -> "ConversationContext":
+        return ConversationContext(self.user_id, self.system_prompt, self.messages + turn, self.cacheable)
+
+
+class ContextCache:
+    """대화별 최근 메시지를 Redis에 보관해 클라이언트가 새 메시지만 보내도 프롬프트를 복원
+
+    Redis 전체 사용량은 max_bytes로 제한되며 초과 시 가장 오래 쓰이지 않은 대화부터 제거한다
+    (게이트웨이 워커들이 같은 항목을 공유하도록 프로세스 내 캐시는 두지 않음).
+    미스이면 messages 테이블과 아직 저장되지 않은 turn_writer 큐에서 다시 만든다.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.CONTEXT_CACHE_ENABLED,
+        max_bytes: int = settings.CONTEXT_CACHE_MAX_BYTES,
+        max_entry_bytes: int = settings.CONTEXT_CACHE_MAX_ENTRY_BYTES,
+        max_messages: int = settings.CONTEXT_CACHE_MAX_MESSAGES,
+        ttl: int = settings.CONTEXT_CACHE_TTL,
+    ):
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.max_messages = max(1, min(max_messages, MAX_PAGE_SIZE))
+        self.ttl = ttl
+        self._breaker = RedisBreaker()
+        self._scripts: dict = {}
+        self._scripts_client = None
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0, "uncached_rebuilds": 0}
+
+    def _script(self, name: str, source: str):
+        """Redis 클라이언트별로 스크립트 등록 (close_redis 후 새 클라이언트면 다시 등록)"""
+        client = get_redis()
+        if client is not self._scripts_client:
+            self._scripts = {}
+            self._scripts_client = client
+        if name not in self._scripts:
+            self._scripts[name] = client.register_script(source)
+        return self._scripts[name]
+
+    def _trim(self, messages: list[dict]) -> list[dict]:
+        """최근 max_messages개, 직렬화 크기 max_entry_bytes 이내로 자름 (오래된 메시지부터 제외)"""
+        messages = messages[-self.max_messages:]
+        sizes = [len(json.dumps(message, ensure_ascii=False)) + 1 for message in messages]
+        total = sum(sizes)
+        start = 0
+        while total > self.max_entry_bytes and start < len(messages) - 1:
+            total -= sizes[start]
+            start += 1
+        return messages[start:]
+
+    async def _redis_get(self, conversation_id: int) -> Optional[ConversationContext]:
+        if not self._breaker.available:
+            return None
+        try:
+            value = await self._script("load", _LOAD_SCRIPT)(
+                keys=[LRU_KEY],
+                args=[f"{REDIS_KEY_PREFIX}:", conversation_id, time.time()],
+            )
+        except Exception as e:
+            self._breaker.record_failure(e)
+            return None
+        if value is None:
+            return None
+        try:
+            return ConversationContext.from_bytes(value)
+        except (ValueError, KeyError) as e:
+            logger.warning(f"대화 컨텍스트 캐시 항목 해석 실패 ({conversation_id}): {e}")
+            return None
+
+    async def _load(self, user_id: int, conversation_id: int) -> Optional[ConversationContext]:
+        """messages 테이블 + 저장 대기 중인 턴으로 컨텍스트 생성 (사용자 소유 대화가 아니면 None)
+
+        스필 파일에 이 대화의 행이 남아 있거나 읽는 도중 배치 저장이 끝났으면 턴이 빠졌을 수 있으므로
+        캐시하지 않는 컨텍스트로 표시한다 (이번 요청에만 쓰고 다음 요청에서 다시 만듦).
+        """
+        commits = turn_writer.commits
+        async with AsyncSessionLocal() as session:
+            repository = ConversationRepository(session)
+            conversation = await repository.get_conversation(user_id, conversation_id)
+            if conversation is None:
+                return None
+            messages, _ = await repository.list_messages(conversation_id, self.max_messages)
+        history = [{"role": message["role"], "content": message["content"]} for message in messages]
+        history += turn_writer.pending(conversation_id)
+        cacheable = turn_writer.settled(conversation_id) and turn_writer.commits == commits
+        if not cacheable:
+            self.counters["uncached_rebuilds"] += 1
+        return ConversationContext(user_id, conversation["system_prompt"], self._trim(history), cacheable)
+
+    async def get(self, user_id: int, conversation_id: int) -> Optional[ConversationContext]:
+        """대화 컨텍스트 조회 (Redis → DB 순, 없거나 다른 사용자의 대화면 None)"""
+        if self.enabled:
+            context = await self._redis_get(conversation_id)
+            if context is not None:
+                if context.user_id != user_id:
+                    return None
+                self.counters["hits"] += 1
+                return context
+            self.counters["misses"] += 1
+
+        context = await self._load(user_id, conversation_id)
+        if context is not None:
+            await self.store(conversation_id, context)
+        return context
+
+    async def store(self, conversation_id: int, context: ConversationContext):
+        """턴 완료 후 컨텍스트 갱신 (최근 메시지만 남기고 LRU 용량 초과분 제거)
+
+        턴이 빠졌을 수 있는 컨텍스트(cacheable=False)는 저장하지 않고 기존 항목을 지운다.
+        """
+        if not context.cacheable:
+            await self.invalidate(conversation_id)
+            return
+        if not self.enabled or not self._breaker.available:
+            return
+        context.messages = self._trim(context.messages)
+        value = context.to_bytes()
+        try:
+            evicted = await self._script("store", _STORE_SCRIPT)(
+                keys=[LRU_KEY, SIZES_KEY, BYTES_KEY],
+                args=[f"{REDIS_KEY_PREFIX}:", conversation_id, value, self.ttl, time.time(), self.max_bytes],
+            )
+        except Exception as e:
+            self._breaker.record_failure(e)
+            return
+        self.counters["stores"] += 1
+        self.counters["evictions"] += int(evicted or 0)
+
+    async def invalidate(self, conversation_id: int):
+        """서버 컨텍스트를 쓰지 않은 턴(클라이언트가 전체 이력 전송)이 끝나면 항목 제거"""
+        if not self.enabled or not self._breaker.available:
+            return
+        try:
+            await self._script("remove", _REMOVE_SCRIPT)(
+                keys=[LRU_KEY, SIZES_KEY, BYTES_KEY],
+                args=[f"{REDIS_KEY_PREFIX}:", conversation_id],
+            )
+        except Exception as e:
+            self._breaker.record_failure(e)
+            return
+        self.counters["invalidations"] += 1
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "enabled": self.enabled,
+            **self.counters,
+            "hit_ratio": round(self.counters["hits"] / lookups, 4) if lookups else None,
+        }
+
+
+# 전역 대화 컨텍스트 캐시 인스턴스
+context_cache = ContextCache()
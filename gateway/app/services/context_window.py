@@ -0,0 +1,269 @@
+"""
+프롬프트 토큰 수 계산과 컨텍스트 길이 관리
+
+프로파일 모델의 tokenizer.json(로컬 HF 캐시)으로 메시지별 토큰 수를 세고, 프롬프트가
+max_model_len에서 생성 몫을 뺀 한도를 넘으면 정책에 따라 가장 오래된 턴을 빼거나 잘라
+vLLM에 보내기 전에 맞춘다. 시스템 프롬프트와 마지막 메시지는 항상 남긴다.
+토크나이저는 모델별로 한 번만 읽고, 메시지별 토큰 수는 (모델, 역할, 내용) 해시로 메모한다.
+토크나이저를 쓸 수 없으면 UTF-8 바이트 수로 보수적으로 추정한다.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from ..config import settings
+from ..metrics import CONTEXT_TRIMMED_MESSAGES, profile_label
+from ..schemas.model import ModelProfile
+from .weight_prewarm import resolve_snapshot
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop_oldest", "truncate_oldest", "reject")
+MESSAGE_OVERHEAD_TOKENS = 4  # 채팅 템플릿이 메시지마다 붙이는 역할/구분 토큰 (템플릿마다 3~5)
+PROMPT_OVERHEAD_TOKENS = 3  # BOS + 어시스턴트 생성 프롬프트
+FALLBACK_BYTES_PER_TOKEN = 3  # 토크나이저 없을 때 (한글 1자 ≈ 1토큰, 영문은 과대 추정되어 안전한 쪽)
+INLINE_TOKENIZE_CHARS = 16384  # 메모에 없는 내용이 이보다 길면 스레드에서 토큰화 (이벤트 루프 보호)
+TOKENIZER_RETRY_INTERVAL = 300.0  # tokenizer.json이 없던 모델을 다시 찾아보는 간격 (vLLM이 다운로드 중일 수 있음)
+
+
+class ContextOverflow(Exception):
+    """시스템 프롬프트와 마지막 메시지만으로도 한도를 넘거나 reject 정책에서 한도를 넘음"""
+
+    def __init__(self, prompt_tokens: int, limit: int):
+        self.prompt_tokens = prompt_tokens
+        self.limit = limit
+        self.detail = f"프롬프트({prompt_tokens} 토큰)가 모델 컨텍스트 한도({limit} 토큰)를 초과합니다"
+        super().__init__(self.detail)
+
+
+@dataclass
+class ContextFit:
+    """한도에 맞춘 메시지 목록과 메시지별 내용 토큰 수 (템플릿 오버헤드 제외)"""
+    messages: list[dict]
+    token_counts: list[int]
+    prompt_tokens: int  # 템플릿 오버헤드를 포함한 프롬프트 전체 추정치
+    limit: int  # 프롬프트에 쓸 수 있는 토큰 수 (max_model_len - 생성 몫)
+    dropped: int = 0
+    truncated: int = 0
+    exact: bool = True  # 토크나이저로 센 값인지 (False면 바이트 수 추정)
+
+
+def _content_text(message: dict) -> str:
+    """토큰 수를 셀 텍스트 (멀티모달 content 배열은 text 항목만)"""
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def _memo_key(model_id: str, role: str, text: str) -> str:
+    return hashlib.sha256(f"{model_id}\0{role}\0{text}".encode()).hexdigest()
+
+
+def _load_tokenizer(model_id: str) -> Optional[Any]:
+    snapshot = resolve_snapshot(model_id)
+    if snapshot is None or not (snapshot / "tokenizer.json").is_file():
+        return None
+    from tokenizers import Tokenizer  # 선택 의존성 - 없으면 ImportError로 추정치 사용
+    return Tokenizer.from_file(str(snapshot / "tokenizer.json"))
+
+
+class ContextWindowManager:
+    """프로파일별 토크나이저 캐시 + 메시지 토큰 수 메모 + 한도 초과 시 오래된 턴 정리"""
+
+    def __init__(
+        self,
+        policy: str = settings.CONTEXT_WINDOW_POLICY,
+        memo_size: int = settings.CONTEXT_WINDOW_TOKEN_MEMO_SIZE,
+        default_output_tokens: int = settings.CONTEXT_WINDOW_DEFAULT_OUTPUT_TOKENS,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"지원하지 않는 컨텍스트 정책: {policy}")
+        self.enabled = settings.CONTEXT_WINDOW_ENABLED
+        self.policy = policy
+        self.memo_size = memo_size
+        self.default_output_tokens = default_output_tokens
+        self._tokenizers: dict[str, Any] = {}
+        self._unavailable: dict[str, float] = {}  # 모델 ID -> 다시 찾아볼 시각
+        self._loading: dict[str, asyncio.Task] = {}
+        self._memo: OrderedDict[str, int] = OrderedDict()
+        self.counters = {"memo_hits": 0, "memo_misses": 0, "estimated": 0, "dropped": 0, "truncated": 0, "rejected": 0}
+
+    async def tokenizer(self, model_id: str) -> Optional[Any]:
+        """모델 토크나이저 (최초 1회 스레드에서 로드, 없으면 None)"""
+        if model_id in self._tokenizers:
+            return self._tokenizers[model_id]
+        if time.monotonic() < self._unavailable.get(model_id, 0.0):
+            return None
+        task = self._loading.get(model_id)
+        if task is None:
+            task = self._loading[model_id] = asyncio.create_task(asyncio.to_thread(_load_tokenizer, model_id))
+        try:
+            tokenizer = await asyncio.shield(task)
+        except Exception as e:
+            logger.warning(f"토크나이저 로드 실패 ({model_id}), 바이트 수로 추정: {e!r}")
+            tokenizer = None
+        finally:
+            if self._loading.get(model_id) is task:
+                del self._loading[model_id]
+        if tokenizer is None:
+            self._unavailable[model_id] = time.monotonic() + TOKENIZER_RETRY_INTERVAL
+            return None
+        self._tokenizers[model_id] = tokenizer
+        logger.info(f"토크나이저 로드: {model_id}")
+        return tokenizer
+
+    def _remember(self, key: str, count: int):
+        self._memo[key] = count
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    async def count_messages(self, model_id: str, messages: list[dict]) -> tuple[list[int], bool]:
+        """메시지별 내용 토큰 수와 토크나이저 사용 여부 (메모에 없는 것만 한 번에 토큰화)"""
+        tokenizer = await self.tokenizer(model_id)
+        counts: list[Optional[int]] = [None] * len(messages)
+        misses: list[tuple[int, str, str]] = []
+        for index, message in enumerate(messages):
+            text = _content_text(message)
+            if tokenizer is None:
+                counts[index] = math.ceil(len(text.encode()) / FALLBACK_BYTES_PER_TOKEN)
+                continue
+            key = _memo_key(model_id, str(message.get("role")), text)
+            count = self._memo.get(key)
+            if count is None:
+                misses.append((index, key, text))
+            else:
+                self._memo.move_to_end(key)
+                counts[index] = count
+        if tokenizer is None:
+            self.counters["estimated"] += len(messages)
+            return counts, False
+
+        self.counters["memo_hits"] += len(messages) - len(misses)
+        self.counters["memo_misses"] += len(misses)
+        if misses:
+            texts = [text for _, _, text in misses]
+            if sum(len(text) for text in texts) > INLINE_TOKENIZE_CHARS:
+                encodings = await asyncio.to_thread(tokenizer.encode_batch, texts, add_special_tokens=False)
+            else:
+                encodings = tokenizer.encode_batch(texts, add_special_tokens=False)
+            for (index, key, _), encoding in zip(misses, encodings):
+                counts[index] = len(encoding.ids)
+                self._remember(key, counts[index])
+        return counts, True
+
+    async def _truncate_head(self, model_id: str, message: dict, keep_tokens: int, count: int) -> dict:
+        """내용 앞부분을 잘라 뒤쪽 keep_tokens개 토큰만 남긴 메시지"""
+        text = message["content"]
+        tokenizer = await self.tokenizer(model_id)
+        if tokenizer is None:
+            kept = text[len(text) - int(len(text) * keep_tokens / count):]
+        else:
+            kept = await self._tail_tokens(tokenizer, text, keep_tokens)
+        return {**message, "content": kept}
+
+    @staticmethod
+    async def _tail_tokens(tokenizer: Any, text: str, keep_tokens: int) -> str:
+        """text의 뒤쪽 keep_tokens개 토큰을 다시 문자열로 (긴 내용은 스레드에서 - 이벤트 루프 보호)"""
+        def tail() -> str:
+            ids = tokenizer.encode(text, add_special_tokens=False).ids
+            return tokenizer.decode(ids[len(ids) - keep_tokens:])
+
+        if len(text) > INLINE_TOKENIZE_CHARS:
+            return await asyncio.to_thread(tail)
+        return tail()
+
+    def output_reserve(self, request: dict, profile: ModelProfile) -> int:
+        """생성에 남겨 둘 토큰 수 (요청의 max_tokens - vLLM도 프롬프트 + max_tokens로 검사, 없으면 기본값)"""
+        try:
+            requested = int(request.get("max_tokens") or request.get("max_completion_tokens") or 0)
+        except (TypeError, ValueError):
+            requested = 0  # 잘못된 값은 vLLM이 400으로 거절
+        if requested > 0:
+            return requested
+        return min(self.default_output_tokens, profile.max_model_len // 2)
+
+    async def fit(self, request: dict, profile: ModelProfile, profile_id: Optional[str] = None) -> ContextFit:
+        """요청 messages를 max_model_len - 생성 몫 이내로 맞춤 (불가능하면 ContextOverflow)"""
+        messages = list(request.get("messages") or [])
+        limit = profile.max_model_len - self.output_reserve(request, profile)
+        counts, exact = await self.count_messages(profile.model_id, messages)
+        total = PROMPT_OVERHEAD_TOKENS + sum(counts) + MESSAGE_OVERHEAD_TOKENS * len(messages)
+        if total <= limit:
+            return ContextFit(messages, counts, total, limit, exact=exact)
+        if self.policy == "reject" or len(messages) < 2:
+            self.counters["rejected"] += 1
+            raise ContextOverflow(total, limit)
+
+        # 시스템 메시지와 마지막 메시지를 뺀 나머지를 오래된 순으로 정리
+        # 넘친 만큼만 빼고, 남은 이력이 어시스턴트 응답으로 시작하지 않도록 턴 단위로 뺀다
+        removed: set[int] = set()
+        truncated = 0
+        for index in range(len(messages) - 1):
+            message = messages[index]
+            if message.get("role") == "system":
+                continue
+            if total <= limit and message.get("role") == "user":
+                break
+            cost = counts[index] + MESSAGE_OVERHEAD_TOKENS
+            overflow = total - limit
+            if (
+                self.policy == "truncate_oldest"
+                and 0 < overflow < counts[index]
+                and isinstance(message.get("content"), str)
+            ):
+                keep = counts[index] - overflow
+                messages[index] = await self._truncate_head(profile.model_id, message, keep, counts[index])
+                (counts[index],), _ = await self.count_messages(profile.model_id, [messages[index]])
+                total -= cost - counts[index] - MESSAGE_OVERHEAD_TOKENS
+                truncated += 1
+                if total <= limit:
+                    break
+                continue
+            removed.add(index)
+            total -= cost
+
+        if total > limit:
+            self.counters["rejected"] += 1
+            raise ContextOverflow(total, limit)
+
+        label = profile_label(profile_id)
+        if removed:
+            self.counters["dropped"] += len(removed)
+            CONTEXT_TRIMMED_MESSAGES.labels(profile=label, action="dropped").inc(len(removed))
+        if truncated:
+            self.counters["truncated"] += truncated
+            CONTEXT_TRIMMED_MESSAGES.labels(profile=label, action="truncated").inc(truncated)
+        logger.info(f"컨텍스트 한도 초과로 오래된 메시지 정리: 제외 {len(removed)}건, 잘라냄 {truncated}건 ({total}/{limit} 토큰)")
+        kept = [index for index in range(len(messages)) if index not in removed]
+        return ContextFit(
+            [messages[index] for index in kept],
+            [counts[index] for index in kept],
+            total,
+            limit,
+            dropped=len(removed),
+            truncated=truncated,
+            exact=exact,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "policy": self.policy,
+            "tokenizers": sorted(self._tokenizers),
+            "memo_entries": len(self._memo),
+            **self.counters,
+        }
+
+
+# 전역 컨텍스트 윈도우 관리자 인스턴스
+context_window = ContextWindowManager()
@@ -0,0 +1,209 @@
+import base64
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Conversation, Message
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """페이지네이션 커서를 해석할 수 없음"""
+
+
+def encode_cursor(*values) -> str:
+    """키셋 위치를 불투명한 커서 문자열로 인코딩"""
+    raw = "|".join(value.isoformat() if isinstance(value, datetime) else str(value) for value in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> list[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"잘못된 커서: {cursor}") from e
+
+
+def _conversation_cursor(cursor: str) -> tuple[datetime, int]:
+    parts = _decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(parts[0]), int(parts[1])
+    except (IndexError, ValueError) as e:
+        raise InvalidCursor(f"잘못된 커서: {cursor}") from e
+
+
+def _message_cursor(cursor: str) -> int:
+    try:
+        return int(_decode_cursor(cursor)[0])
+    except ValueError as e:
+        raise InvalidCursor(f"잘못된 커서: {cursor}") from e
+
+
+def _message_count():
+    """대화별 메시지 수 - 목록 조회와 같은 쿼리에서 계산 (대화마다 추가 쿼리 없음)"""
+    return (
+        select(func.count(Message.id))
+        .where(Message.conversation_id == Conversation.id)
+        .correlate(Conversation)
+        .scalar_subquery()
+        .label("message_count")
+    )
+
+
+def _conversation_dict(conversation: Conversation, message_count: int) -> dict:
+    return {
+        "id": conversation.id,
+        "title": conversation.title,
+        "model": conversation.model,
+        "system_prompt": conversation.system_prompt,
+        "created_at": conversation.created_at,
+        "updated_at": conversation.updated_at,
+        "message_count": message_count,
+    }
+
+
+def _message_dict(message: Message) -> dict:
+    return {
+        "id": message.id,
+        "role": message.role,
+        "content": message.content,
+        "token_count": message.token_count or 0,
+        "created_at": message.created_at,
+    }
+
+
+class ConversationRepository:
+    """대화/메시지 영속화 - 요청당 쿼리 수가 페이지 크기와 무관하도록 작성
+
+    - 대화 목록: (user_id, updated_at, id) 키셋 페이지네이션, 1쿼리
+    - 대화 조회: 대화 1쿼리 + 최근 메시지 한 페이지 1쿼리
+    - 메시지 추가: 일괄 INSERT 1쿼리 + 대화 updated_at 갱신 1쿼리
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def list_conversations(
+        self,
+        user_id: int,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[dict], Optional[str]]:
+        """최근 갱신 순 대화 목록 한 페이지와 다음 페이지 커서"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = (
+            select(Conversation, _message_count())
+            .where(Conversation.user_id == user_id)
+            .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            updated_at, conversation_id = _conversation_cursor(cursor)
+            query = query.where(
+                or_(
+                    Conversation.updated_at < updated_at,
+                    and_(Conversation.updated_at == updated_at, Conversation.id < conversation_id),
+                )
+            )
+
+        rows = (await self.session.execute(query)).all()
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1][0]
+            next_cursor = encode_cursor(last.updated_at, last.id)
+        return [_conversation_dict(conversation, count) for conversation, count in page], next_cursor
+
+    async def get_conversation(self, user_id: int, conversation_id: int) -> Optional[dict]:
+        """사용자 소유 대화 (없거나 다른 사용자 대화면 None)"""
+        row = (
+            await self.session.execute(
+                select(Conversation, _message_count()).where(
+                    Conversation.id == conversation_id,
+                    Conversation.user_id == user_id,
+                )
+            )
+        ).first()
+        if row is None:
+            return None
+        return _conversation_dict(*row)
+
+    async def list_messages(
+        self,
+        conversation_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[dict], Optional[str]]:
+        """최근 메시지부터 한 페이지 (응답은 시간순), 다음 커서로 더 이전 메시지 조회"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = (
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            query = query.where(Message.id < _message_cursor(cursor))
+
+        messages = list((await self.session.scalars(query)).all())
+        page = messages[:limit]
+        next_cursor = encode_cursor(page[-1].id) if len(messages) > limit else None
+        return [_message_dict(message) for message in reversed(page)], next_cursor
+
+    async def create_conversation(
+        self,
+        user_id: int,
+        title: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+    ) -> dict:
+        conversation = (
+            await self.session.scalars(
+                insert(Conversation)
+                .values(user_id=user_id, title=title, model=model, system_prompt=system_prompt)
+                .returning(Conversation)
+            )
+        ).one()
+        await self.session.commit()
+        return _conversation_dict(conversation, 0)
+
+    async def append_messages(
+        self,
+        user_id: int,
+        conversation_id: int,
+        messages: list[dict],
+    ) -> Optional[list[dict]]:
+        """메시지 일괄 추가 (사용자 소유 대화가 아니면 None)"""
+        # 소유권 확인과 updated_at 갱신을 한 번에 (목록 정렬 키 갱신)
+        owned = await self.session.scalar(
+            update(Conversation)
+            .where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+            .values(updated_at=func.now())
+            .returning(Conversation.id)
+            .execution_options(synchronize_session=False)
+        )
+        if owned is None:
+            await self.session.rollback()
+            return None
+
+        # executemany + RETURNING은 asyncpg에서 다중 VALUES INSERT로 묶여 한 번에 전송됨
+        inserted = (
+            await self.session.scalars(
+                insert(Message).returning(Message, sort_by_parameter_order=True),
+                [
+                    {
+                        "conversation_id": conversation_id,
+                        "role": message["role"],
+                        "content": message["content"],
+                        "token_count": message.get("token_count", 0),
+                    }
+                    for message in messages
+                ],
+            )
+        ).all()
+        await self.session.commit()
+        return [_message_dict(message) for message in inserted]
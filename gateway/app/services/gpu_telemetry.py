@@ -0,0 +1,255 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Optional, Protocol
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GpuSample:
+    """GPU 하나의 특정 시점 상태"""
+    index: int
+    name: str
+    memory_total_mb: int
+    memory_used_mb: int
+    utilization_pct: int
+    sampled_at: float
+
+    @property
+    def memory_free_mb(self) -> int:
+        return max(0, self.memory_total_mb - self.memory_used_mb)
+
+
+class TelemetrySource(Protocol):
+    """GPU 상태를 읽는 소스 (NVML 또는 테스트용 가짜 소스)"""
+    name: str
+
+    def read(self) -> list[GpuSample]: ...
+
+    def close(self) -> None: ...
+
+
+class NvmlSource:
+    """NVML(nvidia-ml-py)로 GPU 메모리/사용률 조회"""
+
+    name = "nvml"
+
+    def __init__(self):
+        import pynvml  # GPU 없는 환경에서는 설치되지 않을 수 있어 지연 임포트
+
+        self._nvml = pynvml
+        pynvml.nvmlInit()
+        self._handles = [pynvml.nvmlDeviceGetHandleByIndex(index) for index in range(pynvml.nvmlDeviceGetCount())]
+        self._names = []
+        for handle in self._handles:
+            name = pynvml.nvmlDeviceGetName(handle)
+            self._names.append(name.decode() if isinstance(name, bytes) else name)
+
+    def read(self) -> list[GpuSample]:
+        now = time.time()
+        samples = []
+        for index, handle in enumerate(self._handles):
+            memory = self._nvml.nvmlDeviceGetMemoryInfo(handle)
+            utilization = self._nvml.nvmlDeviceGetUtilizationRates(handle)
+            samples.append(GpuSample(
+                index=index,
+                name=self._names[index],
+                memory_total_mb=memory.total // (1024 * 1024),
+                memory_used_mb=memory.used // (1024 * 1024),
+                utilization_pct=utilization.gpu,
+                sampled_at=now,
+            ))
+        return samples
+
+    def close(self):
+        try:
+            self._nvml.nvmlShutdown()
+        except Exception:
+            pass
+
+
+class FakeSource:
+    """GPU 없는 환경용 가짜 소스 - 메모리 사용량을 코드에서 직접 지정"""
+
+    name = "fake"
+
+    def __init__(self, memory_total_mb: list[int], gpu_name: str = "Fake GPU"):
+        self.memory_total_mb = list(memory_total_mb)
+        self.memory_used_mb = [0] * len(self.memory_total_mb)
+        self.utilization_pct = [0] * len(self.memory_total_mb)
+        self.gpu_name = gpu_name
+
+    def set_usage(self, index: int, memory_used_mb: int, utilization_pct: int = 0):
+        self.memory_used_mb[index] = memory_used_mb
+        self.utilization_pct[index] = utilization_pct
+
+    def read(self) -> list[GpuSample]:
+        now = time.time()
+        return [
+            GpuSample(
+                index=index,
+                name=self.gpu_name,
+                memory_total_mb=total,
+                memory_used_mb=self.memory_used_mb[index],
+                utilization_pct=self.utilization_pct[index],
+                sampled_at=now,
+            )
+            for index, total in enumerate(self.memory_total_mb)
+        ]
+
+    def close(self):
+        pass
+
+
+def create_source(kind: str = settings.GPU_TELEMETRY_SOURCE) -> TelemetrySource:
+    if kind == "fake":
+        totals = [int(value) for value in settings.GPU_TELEMETRY_FAKE_GPUS.split(",") if value.strip()]
+        return FakeSource(totals)
+    if kind == "nvml":
+        return NvmlSource()
+    raise ValueError(f"지원하지 않는 GPU 텔레메트리 소스: {kind}")
+
+
+class GpuTelemetry:
+    """백그라운드 스레드에서 GPU 상태를 주기적으로 샘플링하고 링 버퍼에 보관
+
+    NVML 호출은 블로킹이므로 이벤트 루프가 아닌 별도 스레드에서 수행하고,
+    요청 경로에서는 마지막 샘플만 읽는다.
+    """
+
+    def __init__(
+        self,
+        source_factory=create_source,
+        interval: float = settings.GPU_TELEMETRY_INTERVAL,
+        history: int = settings.GPU_TELEMETRY_HISTORY,
+    ):
+        self.source_factory = source_factory
+        self.interval = interval
+        self.source: Optional[TelemetrySource] = None
+        self.last_error: Optional[str] = None
+        self._history: deque[list[GpuSample]] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample_once(self) -> list[GpuSample]:
+        """소스에서 한 번 읽어 링 버퍼에 추가"""
+        if self.source is None:
+            self.source = self.source_factory()
+            logger.info(f"GPU 텔레메트리 소스 초기화: {self.source.name}")
+        samples = self.source.read()
+        with self._lock:
+            self._history.append(samples)
+        self.last_error = None
+        return samples
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample_once()
+            except Exception as e:
+                if self.last_error != str(e):
+                    logger.error(f"GPU 텔레메트리 수집 실패: {e}")
+                self.last_error = str(e)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="gpu-telemetry", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+    def latest(self) -> Optional[list[GpuSample]]:
+        with self._lock:
+            return self._history[-1] if self._history else None
+
+    def history(self, seconds: Optional[float] = None) -> list[list[GpuSample]]:
+        with self._lock:
+            snapshots = list(self._history)
+        if seconds is None:
+            return snapshots
+        cutoff = time.time() - seconds
+        return [samples for samples in snapshots if samples and samples[0].sampled_at >= cutoff]
+
+    def hardware_info(self) -> dict:
+        """model_manager 하드웨어 정보 형식으로 최근 샘플 반환 (샘플이 없거나 오래되면 RuntimeError)
+
+        상태 스냅샷의 ETag가 미세한 변동으로 바뀌지 않도록 메모리는 GB 단위로 맞추고
+        사용률은 포함하지 않는다 (상세 값은 summary()). 호환성 검사(OOM 방지)에 쓰이므로
+        여유 메모리는 내림, 사용 메모리는 올림해 실제보다 크게 잡지 않는다.
+        """
+        samples = self.latest()
+        if not samples:
+            raise RuntimeError(f"GPU 텔레메트리 샘플 없음: {self.last_error or '수집 대기 중'}")
+        age = time.time() - samples[0].sampled_at
+        if age > max(self.interval * 5, 10.0):
+            raise RuntimeError(f"GPU 텔레메트리 샘플이 오래됨 ({age:.0f}초 전): {self.last_error}")
+
+        def floor_gb(mb: int) -> int:
+            return mb // 1024 * 1024
+
+        def ceil_gb(mb: int) -> int:
+            return math.ceil(mb / 1024) * 1024
+
+        gpus = [
+            {
+                "index": sample.index,
+                "name": sample.name,
+                "memory_total_mb": sample.memory_total_mb,
+                "memory_used_mb": ceil_gb(sample.memory_used_mb),
+                "memory_free_mb": floor_gb(sample.memory_free_mb),
+            }
+            for sample in samples
+        ]
+        return {
+            "gpus": gpus,
+            "gpu_count": len(gpus),
+            "total_vram_gb": round(sum(s.memory_total_mb for s in samples) / 1024, 1),
+            "available_vram_gb": round(sum(floor_gb(s.memory_free_mb) for s in samples) / 1024, 1),
+            "source": self.source.name if self.source else None,
+        }
+
+    def summary(self, seconds: float = 60.0) -> dict:
+        """최근 샘플과 구간별 GPU 사용률/메모리 통계"""
+        window = self.history(seconds)
+        latest = self.latest()
+        per_gpu = {}
+        for samples in window:
+            for sample in samples:
+                stats = per_gpu.setdefault(sample.index, {"utilization": [], "memory_used_mb": []})
+                stats["utilization"].append(sample.utilization_pct)
+                stats["memory_used_mb"].append(sample.memory_used_mb)
+        return {
+            "source": self.source.name if self.source else None,
+            "last_error": self.last_error,
+            "window_seconds": seconds,
+            "samples": len(window),
+            "latest": [asdict(sample) for sample in latest] if latest else [],
+            "window": {
+                index: {
+                    "utilization_avg_pct": round(sum(stats["utilization"]) / len(stats["utilization"]), 1),
+                    "utilization_max_pct": max(stats["utilization"]),
+                    "memory_used_max_mb": max(stats["memory_used_mb"]),
+                }
+                for index, stats in per_gpu.items()
+            },
+        }
+
+
+# 전역 GPU 텔레메트리 인스턴스
+gpu_telemetry = GpuTelemetry()
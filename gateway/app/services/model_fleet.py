@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from ..config import settings
+from .backend_pool import Backend, BackendPool
+from .model_manager import model_manager
+from .placement import PlacementDecision, PlacementPlan, gpus_from_hardware_info, plan_placement
+
+logger = logging.getLogger(__name__)
+
+
+class ModelInstance:
+    """배치 계획에 따라 띄운 vLLM 인스턴스 하나 (전용 백엔드 풀을 가짐)"""
+
+    def __init__(self, decision: PlacementDecision, port: int):
+        self.decision = decision
+        self.port = port
+        self.container = f"{settings.FLEET_CONTAINER_PREFIX}{decision.profile_id}"
+        self.url = settings.FLEET_INSTANCE_URL_TEMPLATE.format(container=self.container, port=port)
+        self.pool = BackendPool([self.url], strategy="least_outstanding")
+        self.started_at = time.time()
+
+    @property
+    def profile_id(self) -> str:
+        return self.decision.profile_id
+
+    @property
+    def model_id(self) -> str:
+        return self.decision.model_id
+
+    def same_placement(self, decision: PlacementDecision) -> bool:
+        return (
+            self.decision.gpu_indices == decision.gpu_indices
+            and self.decision.gpu_memory_utilization == decision.gpu_memory_utilization
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "profile_id": self.profile_id,
+            "model_id": self.model_id,
+            "container": self.container,
+            "url": self.url,
+            "gpu_indices": self.decision.gpu_indices,
+            "gpu_memory_utilization": self.decision.gpu_memory_utilization,
+            "started_at": self.started_at,
+            "backend": self.pool.backends[0].snapshot(),
+        }
+
+
+class ModelFleet:
+    """여러 프로파일을 동시에 서빙하는 vLLM 인스턴스 집합
+
+    기본 인스턴스(model_manager가 관리하는 vllm 서비스)와 별도로, 배치 계획에 따라
+    프로파일별 컨테이너를 띄우고 요청의 model 필드로 해당 인스턴스에 라우팅한다.
+    """
+
+    def __init__(self):
+        self.instances: dict[str, ModelInstance] = {}
+        self.last_plan: Optional[PlacementPlan] = None
+        self._lock = asyncio.Lock()
+
+    def resolve(self, model: Optional[str]) -> Optional[ModelInstance]:
+        """model 필드(프로파일 ID 또는 모델 ID)에 해당하는 인스턴스"""
+        if not model or not isinstance(model, str):
+            return None
+        instance = self.instances.get(model)
+        if instance is not None:
+            return instance
+        for instance in self.instances.values():
+            if instance.model_id == model:
+                return instance
+        return None
+
+    def healthy_backends(self) -> list[Backend]:
+        return [backend for instance in self.instances.values() for backend in instance.pool.healthy_backends()]
+
+    def _reserved_allocation(self) -> dict[int, float]:
+        """기본 vllm 인스턴스가 쓰고 있는 GPU 비율 (compose에서 앞쪽 GPU부터 사용)"""
+        profile = model_manager.profiles.get(model_manager.current_profile or "")
+        if profile is None or model_manager.status not in ("running", "switching"):
+            return {}
+        return {index: profile.gpu_memory_utilization for index in range(profile.tensor_parallel_size)}
+
+    async def plan(self, profile_ids: list[str]) -> PlacementPlan:
+        """현재 하드웨어 기준 배치 계획 (드라이런)"""
+        hardware_info = await model_manager._get_hardware_info()
+        return plan_placement(
+            model_manager.profiles,
+            gpus_from_hardware_info(hardware_info),
+            profile_ids,
+            reserved=self._reserved_allocation(),
+            headroom=settings.PLACEMENT_GPU_HEADROOM,
+        )
+
+    async def apply(self, profile_ids: list[str]) -> PlacementPlan:
+        """배치 계획대로 인스턴스 구성 (계획에서 빠지거나 위치가 바뀐 인스턴스는 종료)"""
+        async with self._lock:
+            plan = await self.plan(profile_ids)
+            self.last_plan = plan
+            desired = {decision.profile_id: decision for decision in plan.placements}
+
+            for profile_id, instance in list(self.instances.items()):
+                decision = desired.get(profile_id)
+                if decision is None or not instance.same_placement(decision):
+                    await self._terminate(instance)
+
+            # vLLM 메모리 프로파일링이 겹치지 않도록 하나씩 띄운다
+            for decision in plan.placements:
+                if decision.profile_id in self.instances:
+                    continue
+                instance = ModelInstance(decision, self._free_port())
+                if await self._launch(instance):
+                    self.instances[decision.profile_id] = instance
+                    await instance.pool.start()
+                else:
+                    plan.unplaced[decision.profile_id] = "인스턴스 기동 실패"
+
+            logger.info(f"멀티 모델 구성 완료: {sorted(self.instances)} (미배치: {plan.unplaced})")
+            model_manager._notify_status_change()
+            return plan
+
+    def _free_port(self) -> int:
+        used = {instance.port for instance in self.instances.values()}
+        port = settings.PLACEMENT_BASE_PORT
+        while port in used:
+            port += 1
+        return port
+
+    async def _docker(self, *args: str) -> tuple[int, str]:
+        process = await asyncio.create_subprocess_exec(
+            "docker", *args,
+            cwd="/app",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await process.communicate()
+        return process.returncode, stderr.decode(errors="ignore")
+
+    async def _launch(self, instance: ModelInstance) -> bool:
+        """vllm 서비스 정의를 재사용해 전용 GPU/포트로 컨테이너 기동 후 준비 완료 대기"""
+        profile = model_manager.profiles[instance.profile_id]
+        decision = instance.decision
+        # 이전 게이트웨이 실행에서 남은 같은 이름의 컨테이너 정리
+        await self._docker("rm", "-f", instance.container)
+        returncode, stderr = await self._docker(
+            "compose", "run", "-d", "--no-deps",
+            "--name", instance.container,
+            "-e", f"CUDA_VISIBLE_DEVICES={decision.cuda_visible_devices}",
+            settings.VLLM_SERVICE,
+            "--model", profile.model_id,
+            "--dtype", profile.dtype,
+            "--max-model-len", str(profile.max_model_len),
+            "--tensor-parallel-size", str(profile.tensor_parallel_size),
+            "--gpu-memory-utilization", str(decision.gpu_memory_utilization),
+            "--swap-space", str(profile.swap_space),
+            "--host", "0.0.0.0",
+            "--port", str(instance.port),
+        )
+        if returncode != 0:
+            logger.error(f"vLLM 인스턴스 기동 실패 ({instance.profile_id}): {stderr}")
+            return False
+        try:
+            await model_manager._wait_for_vllm_ready(instance.url)
+        except TimeoutError:
+            logger.error(f"vLLM 인스턴스 준비 시간 초과: {instance.profile_id}")
+            await self._docker("rm", "-f", instance.container)
+            return False
+        logger.info(f"vLLM 인스턴스 기동: {instance.profile_id} -> {instance.url} (GPU {decision.cuda_visible_devices})")
+        return True
+
+    async def _terminate(self, instance: ModelInstance):
+        """라우팅에서 제외하고 진행 중인 요청이 끝나면 컨테이너 종료"""
+        self.instances.pop(instance.profile_id, None)
+        await instance.pool.stop()
+        await instance.pool.drain(instance.pool.backends, settings.BLUE_GREEN_DRAIN_TIMEOUT)
+        await self._docker("rm", "-f", instance.container)
+        logger.info(f"vLLM 인스턴스 종료: {instance.profile_id}")
+
+    async def stop(self):
+        """헬스 체크 루프만 정리 (컨테이너는 게이트웨이 재시작과 무관하게 유지)"""
+        for instance in self.instances.values():
+            await instance.pool.stop()
+
+    def stats(self) -> dict:
+        return {
+            "instances": [instance.snapshot() for instance in self.instances.values()],
+            "last_plan": self.last_plan.to_dict() if self.last_plan else None,
+        }
+
+
+# 전역 멀티 모델 인스턴스 집합
+model_fleet = ModelFleet()
@@ -2,13 +2,28 @@ import asyncio
 import logging
 import os
 import subprocess
-from typing import Optional
-import aiohttp
+import time
+from collections.abc import AsyncIterator
+from typing import Callable, Optional
 import json
 
 import yaml
 
+from ..config import settings
+from ..metrics import (
+    MODEL_IDLE_UNLOADED_SECONDS,
+    MODEL_SWITCH_DURATION,
+    MODEL_SWITCH_PHASE_DURATION,
+    MODEL_WAKE_DURATION,
+    profile_label,
+)
 from ..schemas.model import ModelProfile, ModelStatusResponse
+from .backend_pool import Backend, backend_pool
+from .gpu_telemetry import gpu_telemetry
+from .response_cache import response_cache
+from .switch_history import switch_history
+from .upstream import upstream_client
+from .weight_prewarm import weight_prewarmer
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +40,18 @@ class VLLMModelManager:
         self.vllm_process: Optional[subprocess.Popen] = None
         self._cached_hardware_info: Optional[dict] = None  # 캐시된 하드웨어 정보
         self.vllm_base_url = os.getenv("VLLM_BASE_URL", "http://localhost:8000/v1")
+        self._status_listeners: list[Callable[[], None]] = []
+        self.active_slot = "blue"  # blue/green 전환 시 현재 서비스 중인 슬롯
+        self.switch_timeline: list[dict] = []  # 최근 모델 전환 단계별 기록
+        self._switch_started_at: Optional[float] = None
+        # 유휴 언로드 / 요청 시 재기동 상태
+        self._last_activity = time.monotonic()
+        self._idle_accounted_at: Optional[float] = None
+        self._wake_task: Optional[asyncio.Task] = None
+        self._wake_started_at: Optional[float] = None
+        self._last_wake_duration: Optional[float] = None
+        self._lifecycle_lock = asyncio.Lock()
+        self._idle_task: Optional[asyncio.Task] = None
         self.load_profiles()
 
     def load_profiles(self):
@@ -59,11 +86,24 @@ class VLLMModelManager:
             self.current_profile = "default"
             self.hardware_profiles = {}
 
-    async def get_status(self) -> ModelStatusResponse:
-        """현재 모델 상태 반환"""
-        logger.info("=== get_status 함수 호출됨 ===")
+    def add_status_listener(self, listener: Callable[[], None]):
+        """전환 시작/완료 등 상태 변경 시 호출할 콜백 등록"""
+        self._status_listeners.append(listener)
+
+    def _notify_status_change(self):
+        for listener in self._status_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"상태 변경 알림 실패: {e}")
+
+    async def get_status(self, probe: bool = True) -> ModelStatusResponse:
+        """현재 모델 상태 반환
+
+        probe=False면 vLLM을 직접 호출하지 않고 백엔드 풀의 최근 헬스 체크 결과를 사용한다.
+        """
         # vLLM 서버 실제 상태 확인
-        await self._check_vllm_status()
+        await self._check_vllm_status(probe)
         
         # 하드웨어 정보 추가 - 실패시 예외 발생
         try:
@@ -77,56 +117,71 @@ class VLLMModelManager:
                 status="error",
                 available_profiles=self.profiles,
                 message=f"서비스 오류: {str(e)}",
-                hardware_info=None
+                hardware_info=None,
+                active_slot=self.active_slot,
+                switch_timeline=list(self.switch_timeline) or None,
+                prewarm=weight_prewarmer.stats() or None,
             )
 
         return ModelStatusResponse(
             current_profile=self.current_profile,
             status=self.status,
             available_profiles=self.profiles,
-            message=f"현재 {'실행 중' if self.status == 'running' else '정지됨'}",
-            hardware_info=hardware_info
+            message=self._status_message(),
+            hardware_info=hardware_info,
+            active_slot=self.active_slot,
+            switch_timeline=list(self.switch_timeline) or None,
+            prewarm=weight_prewarmer.stats() or None,
         )
 
+    def _status_message(self) -> str:
+        if self.status == "idle":
+            return "유휴 상태로 언로드됨 (다음 요청 시 자동 재기동)"
+        if self.status == "waking":
+            return f"요청으로 재기동 중 ({self.wake_status()['elapsed_s']:.0f}초 경과)"
+        if self.status == "switching" and self.switch_timeline:
+            phase = self.switch_timeline[-1]["phase"]
+            job = weight_prewarmer.jobs.get(self.switch_timeline[0].get("profile", ""))
+            if phase == "prewarming" and job is not None and job.status == "running":
+                progress = job.snapshot()
+                eta = f", 약 {progress['eta_s']:.0f}초 남음" if progress["eta_s"] is not None else ""
+                return f"모델 전환 중 (prewarming {progress['progress'] or 0:.0%}{eta})"
+            return f"모델 전환 중 ({phase})"
+        return f"현재 {'실행 중' if self.status == 'running' else '정지됨'}"
+
     async def _get_hardware_info(self) -> dict:
-        """하드웨어 정보 조회 - 기본 GPU 정보 반환"""
-        logger.info("기본 GPU 정보 사용 (nvidia-smi 의존성 제거)")
-        
-        # 기본 GPU 정보 (RTX 3090 24GB x 2)
-        hardware_info = {
-            "gpus": [
-                {
-                    "name": "NVIDIA GeForce RTX 3090",
-                    "memory_total_mb": 24576,  # 24GB in MB
-                    "memory_used_mb": 0,
-                    "memory_free_mb": 24576
-                },
-                {
-                    "name": "NVIDIA GeForce RTX 3090", 
-                    "memory_total_mb": 24576,  # 24GB in MB
-                    "memory_used_mb": 0,
-                    "memory_free_mb": 24576
-                }
-            ],
-            "gpu_count": 2,
-            "total_vram_gb": 48.0,  # 48GB total
-            "available_vram_gb": 48.0  # 48GB available
-        }
-        
-        # 결과를 캐시
+        """하드웨어 정보 조회 - GPU 텔레메트리의 최근 샘플 (없으면 RuntimeError)"""
+        if gpu_telemetry.latest() is None:
+            # 수집 스레드가 아직 첫 샘플을 만들기 전이면 한 번 직접 읽음
+            try:
+                await asyncio.to_thread(gpu_telemetry.sample_once)
+            except Exception as e:
+                raise RuntimeError(f"GPU 정보 조회 실패: {e}") from e
+
+        hardware_info = gpu_telemetry.hardware_info()
         self._cached_hardware_info = hardware_info
-        logger.info("기본 GPU 정보 설정 완료: 2개 GPU, 48GB VRAM")
         return hardware_info
 
-    async def _check_vllm_status(self):
+    async def _check_vllm_status(self, probe: bool = True):
         """vLLM 서버 실제 상태 확인"""
-        await self._update_status_from_vllm()
+        await self._update_status_from_vllm(probe)
+
+    def switch_strategy_error(self) -> Optional[str]:
+        """현재 구성에서 전환 전략을 쓸 수 없는 이유 (쓸 수 있으면 None)"""
+        if settings.MODEL_SWITCH_STRATEGY == "blue_green" and len(backend_pool.backends) > 1:
+            # 슬롯 하나만 바꾸면 나머지 레플리카는 이전 모델로 남고, 풀 전체를 바꾸면 레플리카가 사라진다
+            return "blue_green 전환은 vLLM 백엔드가 하나일 때만 지원합니다 (VLLM_BACKEND_URLS에 여러 레플리카 지정됨)"
+        return None
 
     async def switch_model(self, profile_id: str) -> bool:
         """모델 전환"""
         if profile_id not in self.profiles:
             raise ValueError(f"프로파일 '{profile_id}'를 찾을 수 없습니다.")
 
+        strategy_error = self.switch_strategy_error()
+        if strategy_error:
+            raise ValueError(strategy_error)
+
         # 하드웨어 호환성 검증
         profile = self.profiles[profile_id]
         
@@ -140,23 +195,41 @@ class VLLMModelManager:
         if not compatibility_check["compatible"]:
             raise ValueError(f"하드웨어 호환성 문제: {compatibility_check['message']}")
 
+        switch_started_at = time.monotonic()
+        strategy = settings.MODEL_SWITCH_STRATEGY
+        result = "error"
+        self._switch_started_at = switch_started_at
+        self.switch_timeline = []
         try:
+            if self.status == "idle":
+                # 언로드 상태에서 바로 다른 모델로 전환
+                self._account_idle_time()
+                self._idle_accounted_at = None
             self.status = "switching"
-            logger.info(f"모델 전환 시작: {profile_id}")
+            self._record_phase("started", profile=profile_id, strategy=strategy)
+            logger.info(f"모델 전환 시작: {profile_id} (전략: {strategy})")
 
-            # 기존 vLLM 프로세스 종료
-            await self._stop_vllm()
+            previous_profile = self.current_profile
+            if settings.MODEL_PREWARM_ENABLED:
+                # 기존 모델을 내리기 전에 새 가중치를 페이지 캐시에 올려 서비스 중단 시간을 줄임
+                await self._prewarm(profile_id)
 
-            # 새 모델로 vLLM 시작
-            success = await self._start_vllm(profile_id)
+            if strategy == "blue_green":
+                success = await self._switch_blue_green(profile_id)
+            else:
+                success = await self._switch_restart(profile_id)
 
             if success:
                 self.current_profile = profile_id
                 self.status = "running"
+                # 이전 모델로 생성된 캐시 응답 무효화
+                await response_cache.invalidate(previous_profile)
+                result = "success"
                 logger.info(f"모델 전환 완료: {profile_id}")
                 return True
             else:
                 self.status = "error"
+                result = "failure"
                 logger.error(f"모델 전환 실패: {profile_id}")
                 return False
 
@@ -164,14 +237,152 @@ class VLLMModelManager:
             self.status = "error"
             logger.error(f"모델 전환 중 오류: {e}")
             return False
+        finally:
+            self._record_phase("completed" if result == "success" else "failed")
+            duration = time.monotonic() - switch_started_at
+            MODEL_SWITCH_DURATION.labels(profile=profile_id, result=result).observe(duration)
+            await self._save_switch_history(profile_id, strategy, result, duration)
+
+    def _record_phase(self, phase: str, **detail):
+        """전환 타임라인에 단계 기록 후 상태 구독자에게 알림 (직전 단계의 소요 시간 확정)"""
+        elapsed = time.monotonic() - (self._switch_started_at or time.monotonic())
+        if self.switch_timeline:
+            previous = self.switch_timeline[-1]
+            previous["duration_s"] = max(0.0, round(elapsed - previous["elapsed_s"], 2))
+        self.switch_timeline.append({
+            "phase": phase,
+            "at": time.time(),
+            "elapsed_s": round(elapsed, 2),
+            **detail,
+        })
+        self._notify_status_change()
+
+    def _phase_durations(self) -> dict[str, float]:
+        """타임라인의 단계별 소요 시간 (시작/완료 표시 항목 제외, 같은 단계는 합산)"""
+        durations: dict[str, float] = {}
+        for entry in self.switch_timeline:
+            if entry["phase"] in ("started", "prewarmed", "completed", "failed") or "duration_s" not in entry:
+                continue
+            durations[entry["phase"]] = round(durations.get(entry["phase"], 0.0) + entry["duration_s"], 2)
+        return durations
+
+    async def _save_switch_history(self, profile_id: str, strategy: str, result: str, duration: float):
+        phases = self._phase_durations()
+        if result == "success":
+            for phase, seconds in phases.items():
+                MODEL_SWITCH_PHASE_DURATION.labels(profile=profile_id, phase=phase).observe(seconds)
+        await switch_history.append({
+            "profile": profile_id,
+            "strategy": strategy,
+            "result": result,
+            "started_at": self.switch_timeline[0]["at"] if self.switch_timeline else time.time(),
+            "duration_s": round(duration, 2),
+            "phases": phases,
+        })
+
+    async def _prewarm(self, profile_id: str):
+        """전환 대상 가중치 프리웜 (실패해도 전환은 계속 진행)"""
+        job = weight_prewarmer.start(profile_id, self.profiles[profile_id].model_id)
+        self._record_phase("prewarming", profile=profile_id)
+        await weight_prewarmer.wait(job, settings.MODEL_PREWARM_TIMEOUT)
+        self._record_phase(
+            "prewarmed",
+            result=job.status,
+            gb=round(job.bytes_done / 1024 ** 3, 2),
+            **({"message": job.message} if job.message else {}),
+        )
+
+    def _slot(self, slot: str) -> tuple[str, str]:
+        """슬롯별 (docker compose 서비스, vLLM API URL)"""
+        if slot == "green":
+            return settings.VLLM_GREEN_SERVICE, settings.VLLM_GREEN_URL
+        return settings.VLLM_SERVICE, self.vllm_base_url
+
+    async def _switch_restart(self, profile_id: str) -> bool:
+        """기존 인스턴스를 내리고 같은 슬롯에 새 모델을 올림 (전환 중 서비스 중단)"""
+        service, url = self._slot(self.active_slot)
+
+        # 기존 vLLM 프로세스 종료
+        self._record_phase("stopping", service=service)
+        await self._stop_vllm(service)
+        self._record_phase("releasing_gpu_memory")
+        await self._wait_for_gpu_release(profile_id)
+
+        # 새 모델로 vLLM 시작
+        self._record_phase("starting", service=service)
+        started_at = time.time()
+        if not await self._start_vllm(profile_id, service):
+            return False
+        await self._wait_for_vllm_ready(
+            url, service=service, model_id=self.profiles[profile_id].model_id, since=started_at
+        )
+        return True
+
+    async def _switch_blue_green(self, profile_id: str) -> bool:
+        """무중단 전환 - 반대 슬롯에 새 모델을 올리고 준비되면 라우팅을 옮긴 뒤 이전 인스턴스 드레인/종료"""
+        old_slot = self.active_slot
+        new_slot = "green" if old_slot == "blue" else "blue"
+        old_service, _ = self._slot(old_slot)
+        new_service, new_url = self._slot(new_slot)
+
+        self._record_phase("starting", slot=new_slot, service=new_service)
+        started_at = time.time()
+        if not await self._start_vllm(profile_id, new_service):
+            return False
+        try:
+            await self._wait_for_vllm_ready(
+                new_url, service=new_service, model_id=self.profiles[profile_id].model_id, since=started_at
+            )
+        except TimeoutError:
+            # 기존 인스턴스는 계속 서비스 중이므로 새 인스턴스만 정리
+            await self._stop_vllm(new_service)
+            raise
+
+        # 라우팅 전환 - 마지막 점검 동안 도착한 요청은 거절하지 않고 잠시 대기시킴
+        self._record_phase("cutover", slot=new_slot)
+        candidate = Backend(new_url)
+        backend_pool.pause_routing()
+        try:
+            if not await backend_pool.check_backend(candidate):
+                logger.error(f"새 vLLM 인스턴스 최종 점검 실패: {candidate.last_error}")
+                await self._stop_vllm(new_service)
+                return False
+            retired = backend_pool.replace_backends([candidate])
+            self.active_slot = new_slot
+            self.current_profile = profile_id
+        finally:
+            backend_pool.resume_routing()
+
+        # 이전 인스턴스의 진행 중인 스트림이 끝난 뒤 종료
+        self._record_phase("draining", slot=old_slot, in_flight=sum(b.outstanding for b in retired))
+        drained = await backend_pool.drain(retired, settings.BLUE_GREEN_DRAIN_TIMEOUT)
+        self._record_phase("stopping_old", slot=old_slot, service=old_service, drained=drained)
+        await self._stop_vllm(old_service)
+        return True
+
+    def _reclaimable_memory_mb(self, hardware_info: dict) -> dict[int, float]:
+        """전환 시 반환될 GPU 메모리 (restart 전략에서 현재 기본 인스턴스가 쓰는 양)"""
+        profile = self.profiles.get(self.current_profile or "")
+        if (
+            settings.MODEL_SWITCH_STRATEGY == "blue_green"
+            or profile is None
+            or self.status != "running"
+        ):
+            return {}
+        gpus = hardware_info.get("gpus", [])
+        return {
+            index: gpus[index]["memory_total_mb"] * profile.gpu_memory_utilization
+            for index in range(min(profile.tensor_parallel_size, len(gpus)))
+        }
 
     def _check_hardware_compatibility(self, profile: ModelProfile, hardware_info: dict) -> dict:
-        """하드웨어 호환성 검증"""
+        """하드웨어 호환성 검증 (실측 여유 메모리 + 전환 시 반환될 메모리 기준)"""
         gpu_count = hardware_info.get("gpu_count", 0)
-        available_vram_gb = hardware_info.get("available_vram_gb", 0)
+        reclaimable = self._reclaimable_memory_mb(hardware_info)
+        available_vram_gb = hardware_info.get("available_vram_gb", 0) + sum(reclaimable.values()) / 1024
 
         # profile에서 하드웨어 요구사항 확인 (있는 경우)
-        hardware_reqs = getattr(profile, 'hardware_requirements', {})
+        hardware_reqs = getattr(profile, 'hardware_requirements', None) or {}
 
         min_vram = hardware_reqs.get('min_vram_gb', 8)  # 기본값
         min_gpus = hardware_reqs.get('min_gpus', 1)
@@ -195,47 +406,52 @@ class VLLMModelManager:
                 "message": f"모델의 tensor_parallel_size({profile.tensor_parallel_size})가 사용 가능한 GPU 수({gpu_count})보다 큽니다"
             }
 
+        # vLLM은 각 GPU에서 전체 메모리 × gpu_memory_utilization을 확보하므로 GPU별로 확인
+        # (기본 인스턴스는 compose 설정상 앞쪽 GPU부터 사용)
+        for index, gpu in enumerate(hardware_info.get("gpus", [])[: profile.tensor_parallel_size]):
+            required_mb = gpu["memory_total_mb"] * profile.gpu_memory_utilization
+            free_mb = gpu.get("memory_free_mb", 0) + reclaimable.get(index, 0)
+            if free_mb < required_mb:
+                return {
+                    "compatible": False,
+                    "message": (
+                        f"GPU {index} 여유 메모리 부족: {required_mb / 1024:.1f}GB 필요 "
+                        f"(현재 {free_mb / 1024:.1f}GB 사용 가능)"
+                    )
+                }
+
         return {
             "compatible": True,
             "message": "하드웨어 호환성 확인됨"
         }
 
-    async def _check_vllm_connection(self) -> bool:
-        """vLLM 서버 연결 상태 확인"""
+    async def _check_vllm_connection(self, probe: bool = True) -> bool:
+        """정상 백엔드 존재 여부 반환 (probe=True면 풀 전체를 즉시 헬스 체크)"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.vllm_base_url}/models", timeout=5) as response:
-                    if response.status == 200:
-                        logger.info("vLLM 서버 연결 성공")
-                        return True
-                    else:
-                        logger.warning(f"vLLM 서버 응답 오류: {response.status}")
-                        return False
+            healthy = await backend_pool.refresh() if probe else bool(backend_pool.healthy_backends())
+            if healthy:
+                logger.info("vLLM 서버 연결 성공")
+                return True
+            logger.warning(f"정상 vLLM 백엔드 없음: {backend_pool.stats()['backends']}")
+            return False
         except Exception as e:
             logger.error(f"vLLM 서버 연결 실패: {e}")
             return False
 
     async def _get_vllm_models(self) -> list[dict]:
-        """vLLM 서버에서 실제 모델 목록 가져오기"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.vllm_base_url}/models", timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        models = data.get("data", [])
-                        logger.info(f"vLLM에서 {len(models)}개 모델 발견")
-                        return models
-                    else:
-                        logger.error(f"vLLM 모델 목록 조회 실패: {response.status}")
-                        return []
-        except Exception as e:
-            logger.error(f"vLLM 모델 목록 조회 오류: {e}")
-            return []
+        """정상 백엔드들이 서빙 중인 모델 목록 (헬스 체크 결과 재사용)"""
+        models = backend_pool.available_models()
+        logger.info(f"vLLM에서 {len(models)}개 모델 발견")
+        return models
 
-    async def _update_status_from_vllm(self):
+    async def _update_status_from_vllm(self, probe: bool = True):
         """vLLM 서버 상태를 기반으로 상태 업데이트"""
+        if self.status in ("switching", "idle", "waking"):
+            # 전환/언로드/재기동 중에는 일시적인 연결 실패로 상태를 덮어쓰지 않음
+            return
+        previous_status = self.status
         try:
-            is_connected = await self._check_vllm_connection()
+            is_connected = await self._check_vllm_connection(probe)
             if is_connected:
                 models = await self._get_vllm_models()
                 if models:
@@ -261,6 +477,8 @@ class VLLMModelManager:
         except Exception as e:
             logger.error(f"vLLM 상태 업데이트 실패: {e}")
             self.status = "stopped"
+        if self.status != previous_status:
+            self._notify_status_change()
 
     async def _create_profiles_from_vllm_models(self, models: list[dict]):
         """vLLM에서 가져온 실제 모델들을 프로파일로 변환"""
@@ -303,26 +521,183 @@ class VLLMModelManager:
         except Exception as e:
             logger.error(f"프로파일 생성 실패: {e}")
 
-    async def _stop_vllm(self):
+    def record_activity(self):
+        """기본 인스턴스로 가는 채팅 요청 도착 (유휴 타이머 초기화)"""
+        self._last_activity = time.monotonic()
+
+    @property
+    def asleep(self) -> bool:
+        """유휴 언로드되었거나 재기동 중이라 바로 요청을 보낼 수 없는 상태"""
+        return self.status in ("idle", "waking")
+
+    def _idle_expired(self) -> bool:
+        if settings.MODEL_IDLE_TIMEOUT <= 0 or self.status != "running":
+            return False
+        if any(backend.outstanding for backend in backend_pool.backends):
+            self.record_activity()  # 긴 스트림이 진행 중이면 유휴가 아님
+            return False
+        return time.monotonic() - self._last_activity >= settings.MODEL_IDLE_TIMEOUT
+
+    def _account_idle_time(self):
+        """언로드 상태로 보낸 시간을 메트릭에 누적"""
+        if self._idle_accounted_at is None:
+            return
+        now = time.monotonic()
+        MODEL_IDLE_UNLOADED_SECONDS.labels(profile=profile_label(self.current_profile)).inc(
+            now - self._idle_accounted_at
+        )
+        self._idle_accounted_at = now
+
+    async def unload_idle(self):
+        """채팅 요청이 MODEL_IDLE_TIMEOUT 동안 없으면 vLLM을 내려 GPU를 비움"""
+        async with self._lifecycle_lock:
+            if not self._idle_expired():
+                return
+            service, _ = self._slot(self.active_slot)
+            idle_for = time.monotonic() - self._last_activity
+            logger.info(f"유휴 {idle_for:.0f}초 - vLLM 언로드: {self.current_profile} ({service})")
+            self.status = "idle"
+            self._idle_accounted_at = time.monotonic()
+            self._notify_status_change()
+            await self._stop_vllm(service)
+
+    def wake_status(self) -> dict:
+        """재기동 진행 상황 (SSE 진행 이벤트/상태 메시지용)"""
+        elapsed = time.monotonic() - self._wake_started_at if self._wake_started_at else 0.0
+        return {
+            "status": self.status,
+            "profile": self.current_profile,
+            "elapsed_s": round(elapsed, 1),
+            "expected_s": round(self._last_wake_duration, 1) if self._last_wake_duration else None,
+        }
+
+    def _start_wake(self) -> asyncio.Task:
+        if self._wake_task is None or self._wake_task.done():
+            self._wake_task = asyncio.create_task(self._wake())
+        return self._wake_task
+
+    async def _wake(self) -> bool:
+        """언로드된 프로파일을 같은 슬롯에 다시 띄우고 백엔드 풀에 반영"""
+        async with self._lifecycle_lock:
+            if self.status != "idle":
+                return self.status == "running"
+            profile_id = self.current_profile
+            service, url = self._slot(self.active_slot)
+            self._account_idle_time()
+            self._idle_accounted_at = None
+            self.status = "waking"
+            self._wake_started_at = time.monotonic()
+            self._notify_status_change()
+            logger.info(f"요청 도착 - vLLM 재기동: {profile_id} ({service})")
+
+            success = False
+            try:
+                if await self._start_vllm(profile_id, service):
+                    await self._wait_for_vllm_ready(url)
+                    success = await backend_pool.refresh()
+            except Exception as e:
+                logger.error(f"vLLM 재기동 실패: {e}")
+
+            duration = time.monotonic() - self._wake_started_at
+            MODEL_WAKE_DURATION.labels(
+                profile=profile_label(profile_id), result="success" if success else "failure"
+            ).observe(duration)
+            if success:
+                self._last_wake_duration = duration
+                logger.info(f"vLLM 재기동 완료: {profile_id} ({duration:.1f}초)")
+            self.status = "running" if success else "error"
+            self._wake_started_at = None
+            self.record_activity()
+            self._notify_status_change()
+            return success
+
+    async def wake_progress(self, timeout: float = settings.MODEL_WAKE_TIMEOUT) -> AsyncIterator[dict]:
+        """언로드 상태면 재기동을 시작(또는 진행 중인 재기동에 합류)하고 완료될 때까지 진행 상황을 내보냄
+
+        timeout 안에 준비되지 않으면 TimeoutError, 재기동에 실패하면 RuntimeError.
+        """
+        self.record_activity()
+        if not self.asleep:
+            return
+        task = self._start_wake()
+        await asyncio.sleep(0)  # 재기동 작업이 상태를 waking으로 바꾼 뒤 첫 진행 상황을 보냄
+        deadline = time.monotonic() + timeout
+        while not task.done():
+            yield self.wake_status()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("모델 재기동 대기 시간 초과")
+            await asyncio.wait({task}, timeout=min(settings.MODEL_WAKE_PROGRESS_INTERVAL, remaining))
+        if not task.result():
+            raise RuntimeError("모델 재기동 실패")
+
+    async def ensure_awake(self, timeout: float = settings.MODEL_WAKE_TIMEOUT):
+        """필요하면 재기동하고 준비될 때까지 대기"""
+        async for _ in self.wake_progress(timeout):
+            pass
+
+    async def _idle_loop(self):
+        while True:
+            await asyncio.sleep(settings.MODEL_IDLE_CHECK_INTERVAL)
+            try:
+                if self.status == "idle":
+                    self._account_idle_time()
+                elif self._idle_expired():
+                    await self.unload_idle()
+            except Exception as e:
+                logger.error(f"유휴 언로드 확인 실패: {e}")
+
+    async def start(self):
+        if self._idle_task is None and settings.MODEL_IDLE_TIMEOUT > 0:
+            self._idle_task = asyncio.create_task(self._idle_loop())
+
+    async def stop(self):
+        if self._idle_task is not None:
+            self._idle_task.cancel()
+            try:
+                await self._idle_task
+            except asyncio.CancelledError:
+                pass
+            self._idle_task = None
+
+    async def _stop_vllm(self, service: str = settings.VLLM_SERVICE):
         """vLLM 프로세스 종료"""
         try:
             # Docker 컨테이너 중지
             process = await asyncio.create_subprocess_exec(
-                "docker", "compose", "stop", "vllm",
+                "docker", "compose", "stop", service,
                 cwd="/app",
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
             await process.wait()
 
-            # GPU 메모리 정리
-            await asyncio.sleep(5)  # GPU 메모리 해제 대기
-
         except Exception as e:
             logger.error(f"vLLM 종료 실패: {e}")
 
-    async def _start_vllm(self, profile_id: str) -> bool:
-        """새 프로파일로 vLLM 시작"""
+    async def _wait_for_gpu_release(self, profile_id: str, timeout: float = settings.VLLM_GPU_RELEASE_TIMEOUT) -> bool:
+        """종료한 인스턴스의 GPU 메모리가 반환되어 새 프로파일이 들어갈 자리가 생길 때까지 대기"""
+        profile = self.profiles[profile_id]
+        deadline = time.monotonic() + timeout
+        delay = settings.VLLM_READY_POLL_INITIAL
+        while True:
+            try:
+                await asyncio.to_thread(gpu_telemetry.sample_once)
+                if self._check_hardware_compatibility(profile, gpu_telemetry.hardware_info())["compatible"]:
+                    return True
+            except Exception as e:
+                # 텔레메트리를 쓸 수 없으면 예전처럼 고정 시간 대기
+                logger.warning(f"GPU 메모리 반환 확인 불가, 5초 대기: {e}")
+                await asyncio.sleep(5)
+                return False
+            if time.monotonic() >= deadline:
+                logger.warning(f"GPU 메모리 반환 대기 시간 초과 ({timeout:.0f}초), 전환 계속 진행")
+                return False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.VLLM_READY_POLL_MAX)
+
+    async def _start_vllm(self, profile_id: str, service: str = settings.VLLM_SERVICE) -> bool:
+        """새 프로파일로 vLLM 컨테이너 시작 (준비 완료 대기는 호출 측에서)"""
         try:
             profile = self.profiles[profile_id]
 
@@ -339,44 +714,104 @@ class VLLMModelManager:
 
             # Docker 컨테이너 시작
             process = await asyncio.create_subprocess_exec(
-                "docker", "compose", "up", "-d", "vllm",
+                "docker", "compose", "up", "-d", service,
                 cwd="/app",
                 env=env,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
 
-            stdout, stderr = await process.wait()
+            stdout, stderr = await process.communicate()
 
             if process.returncode == 0:
-                # vLLM 준비 완료 대기
-                await self._wait_for_vllm_ready()
                 return True
             else:
-                logger.error(f"vLLM 시작 실패: {stderr}")
+                logger.error(f"vLLM 시작 실패: {stderr.decode(errors='ignore')}")
                 return False
 
         except Exception as e:
             logger.error(f"vLLM 시작 중 오류: {e}")
             return False
 
-    async def _wait_for_vllm_ready(self, timeout: int = 300):
-        """vLLM 서버 준비 완료 대기"""
-        import httpx
+    async def _weights_loaded(self, service: str, since: float) -> bool:
+        """since 이후 컨테이너 로그에 가중치 로드 완료 메시지가 있는지 확인"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "docker", "compose", "logs", "--no-log-prefix", "--since", str(int(since)), service,
+                cwd="/app",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT
+            )
+            stdout, _ = await process.communicate()
+            return settings.VLLM_WEIGHTS_LOADED_MARKER.encode() in stdout
+        except Exception as e:
+            logger.debug(f"vLLM 로그 조회 실패: {e}")
+            return False
 
-        for _ in range(timeout // 5):
+    async def _wait_for_vllm_ready(
+        self,
+        base_url: str,
+        timeout: float = settings.VLLM_READY_TIMEOUT,
+        service: Optional[str] = None,
+        model_id: Optional[str] = None,
+        since: Optional[float] = None,
+    ):
+        """vLLM 서버 준비 완료 대기 (짧은 간격부터 늘려 가며 폴링)
+
+        service를 주면 전환 타임라인에 loading_weights(컨테이너 로그의 가중치 로드 완료까지),
+        waiting_ready(/models 첫 성공까지), first_token(model_id로 토큰 하나 생성 성공까지)을 기록한다.
+        """
+        deadline = time.monotonic() + timeout
+        delay = settings.VLLM_READY_POLL_INITIAL
+        weights_loaded = service is None
+        next_log_check = 0.0
+        if service is not None:
+            self._record_phase("loading_weights", service=service)
+
+        while True:
+            if not weights_loaded and time.monotonic() >= next_log_check:
+                # 로그 조회는 서브프로세스라 폴링보다 드물게
+                next_log_check = time.monotonic() + settings.VLLM_READY_POLL_MAX
+                if await self._weights_loaded(service, since or time.time() - timeout):
+                    weights_loaded = True
+                    self._record_phase("waiting_ready", url=base_url)
+                    delay = settings.VLLM_READY_POLL_INITIAL  # 곧 준비되므로 다시 촘촘하게
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get("http://vllm-server:8000/v1/models", timeout=5.0)
-                    if response.status_code == 200:
-                        logger.info("vLLM 서버 준비 완료")
-                        return
-            except:
+                response = await upstream_client.client.get(f"{base_url}/models", timeout=5.0)
+                if response.status_code == 200:
+                    logger.info(f"vLLM 서버 준비 완료: {base_url}")
+                    break
+            except Exception:
                 pass
-
-            await asyncio.sleep(5)
-
-        raise TimeoutError("vLLM 서버 준비 시간 초과")
+            if time.monotonic() >= deadline:
+                raise TimeoutError("vLLM 서버 준비 시간 초과")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.VLLM_READY_POLL_MAX)
+
+        if service is None or model_id is None:
+            return
+        if not weights_loaded:
+            # 로그에서 완료 메시지를 놓친 경우에도 단계 순서는 유지
+            self._record_phase("waiting_ready", url=base_url)
+        self._record_phase("first_token", url=base_url)
+        delay = settings.VLLM_READY_POLL_INITIAL
+        while True:
+            try:
+                response = await upstream_client.client.post(
+                    f"{base_url}/completions",
+                    json={"model": model_id, "prompt": "Hello", "max_tokens": 1},
+                    timeout=30.0,
+                )
+                if response.status_code == 200:
+                    logger.info(f"vLLM 첫 토큰 생성 성공: {model_id}")
+                    return
+                logger.debug(f"첫 토큰 생성 실패: HTTP {response.status_code}")
+            except Exception as e:
+                logger.debug(f"첫 토큰 생성 실패: {e}")
+            if time.monotonic() >= deadline:
+                raise TimeoutError("vLLM 첫 토큰 생성 시간 초과")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.VLLM_READY_POLL_MAX)
 
 
 # 전역 모델 매니저 인스턴스
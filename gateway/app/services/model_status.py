@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from ..config import settings
+from ..schemas.model import ModelStatusResponse
+from .model_manager import model_manager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    """특정 시점의 모델 상태 (직렬화 결과와 ETag를 함께 보관, 생성 후 변경하지 않음)"""
+    version: int
+    etag: str
+    body: bytes
+    status: ModelStatusResponse
+    refreshed_at: float
+
+
+class ModelStatusPublisher:
+    """모델 상태 스냅샷을 백그라운드에서 갱신하고 변경 시 대기 중인 클라이언트를 깨움
+
+    주기 갱신은 백엔드 풀의 헬스 체크 결과만 사용하고, 전환 시작/완료 이벤트에서는
+    vLLM을 즉시 다시 점검한다. 요청 경로에서는 vLLM을 호출하지 않는다.
+    """
+
+    def __init__(self, interval: float = settings.MODEL_STATUS_REFRESH_INTERVAL):
+        self.interval = interval
+        self._snapshot: Optional[StatusSnapshot] = None
+        self._changed = asyncio.Event()
+        self._kick = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        model_manager.add_status_listener(self.request_refresh)
+
+    @property
+    def snapshot(self) -> Optional[StatusSnapshot]:
+        return self._snapshot
+
+    async def current(self) -> StatusSnapshot:
+        """현재 스냅샷 (기동 직후 아직 없으면 한 번 생성)"""
+        if self._snapshot is None:
+            await self.refresh(probe=True)
+        return self._snapshot
+
+    def request_refresh(self):
+        """상태 변경 이벤트 - 다음 주기를 기다리지 않고 즉시 갱신"""
+        self._kick.set()
+
+    async def refresh(self, probe: bool = False) -> StatusSnapshot:
+        """상태를 다시 만들어 내용이 바뀌었으면 새 스냅샷으로 교체"""
+        async with self._lock:
+            status = await model_manager.get_status(probe=probe)
+            body = status.model_dump_json().encode()
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            previous = self._snapshot
+            if previous is not None and previous.etag == etag:
+                return previous
+
+            self._snapshot = StatusSnapshot(
+                version=previous.version + 1 if previous else 1,
+                etag=etag,
+                body=body,
+                status=status,
+                refreshed_at=time.time(),
+            )
+            # 대기자를 깨우고 다음 변경용 이벤트로 교체
+            changed, self._changed = self._changed, asyncio.Event()
+            changed.set()
+            logger.info(f"모델 상태 스냅샷 갱신: v{self._snapshot.version}, status={status.status}")
+            return self._snapshot
+
+    async def wait_for_change(self, etag: Optional[str], timeout: float) -> Optional[StatusSnapshot]:
+        """etag와 다른 스냅샷이 생길 때까지 대기 (timeout 내 변경이 없으면 None)"""
+        snapshot = await self.current()
+        if snapshot.etag != etag:
+            return snapshot
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self._snapshot
+
+    async def _loop(self):
+        probe = True
+        while True:
+            try:
+                await self.refresh(probe=probe)
+            except Exception as e:
+                logger.error(f"모델 상태 스냅샷 갱신 실패: {e}")
+            try:
+                await asyncio.wait_for(self._kick.wait(), timeout=self.interval)
+                probe = True
+            except asyncio.TimeoutError:
+                probe = False
+            self._kick.clear()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 전역 모델 상태 퍼블리셔 인스턴스
+model_status_publisher = ModelStatusPublisher()
@@ -0,0 +1,184 @@
+"""
+멀티 모델 GPU 배치 계획
+
+프로파일별 tensor_parallel_size, gpu_memory_utilization, hardware_requirements를 보고
+어떤 프로파일을 어떤 GPU에 올릴지 결정한다. 외부 호출 없이 입력만으로 계산하므로
+가짜 GPU 목록으로 오프라인에서 결과를 확인할 수 있다.
+
+    python -m app.services.placement --profiles-path ../model_profiles.yml \\
+        --gpus 24576,24576 phi3-mini deepseek-coder-7b
+"""
+
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from ..schemas.model import ModelProfile
+
+UTILIZATION_STEP = 0.05  # 메모리 비율을 줄여 가며 배치를 시도할 때의 단위
+
+
+@dataclass(frozen=True)
+class GpuDevice:
+    """배치 대상 GPU 하나"""
+    index: int
+    name: str
+    memory_total_mb: int
+
+
+@dataclass
+class PlacementDecision:
+    """프로파일 하나의 배치 결과"""
+    profile_id: str
+    model_id: str
+    gpu_indices: list[int]
+    gpu_memory_utilization: float
+
+    @property
+    def cuda_visible_devices(self) -> str:
+        return ",".join(str(index) for index in self.gpu_indices)
+
+
+@dataclass
+class PlacementPlan:
+    """배치 계획 - 배치된 프로파일, 배치하지 못한 프로파일(사유), GPU별 할당 비율"""
+    placements: list[PlacementDecision] = field(default_factory=list)
+    unplaced: dict[str, str] = field(default_factory=dict)
+    gpu_allocation: dict[int, float] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "placements": [asdict(decision) for decision in self.placements],
+            "unplaced": self.unplaced,
+            "gpu_allocation": {index: round(value, 3) for index, value in self.gpu_allocation.items()},
+        }
+
+
+def gpus_from_hardware_info(hardware_info: dict) -> list[GpuDevice]:
+    """model_manager 하드웨어 정보(gpus 목록)를 GpuDevice 목록으로 변환"""
+    return [
+        GpuDevice(index=index, name=gpu.get("name", f"gpu{index}"), memory_total_mb=int(gpu["memory_total_mb"]))
+        for index, gpu in enumerate(hardware_info.get("gpus", []))
+    ]
+
+
+def _min_memory_per_gpu_mb(profile: ModelProfile) -> float:
+    requirements = profile.hardware_requirements or {}
+    return requirements.get("min_vram_gb", 0) * 1024 / max(profile.tensor_parallel_size, 1)
+
+
+def _candidate_utilizations(profile: ModelProfile, gpus: list[GpuDevice]) -> list[float]:
+    """프로파일 설정값부터 최소 요구 메모리를 만족하는 값까지 내려가며 시도할 비율 목록"""
+    preferred = profile.gpu_memory_utilization
+    min_mb = _min_memory_per_gpu_mb(profile)
+    largest = max(gpu.memory_total_mb for gpu in gpus)
+    floor = math.ceil(min_mb / largest / UTILIZATION_STEP) * UTILIZATION_STEP if min_mb else preferred
+    candidates = [preferred]
+    value = round(preferred - UTILIZATION_STEP, 2)
+    while value >= floor - 1e-9 and value > 0:
+        candidates.append(value)
+        value = round(value - UTILIZATION_STEP, 2)
+    return candidates
+
+
+def plan_placement(
+    profiles: dict[str, ModelProfile],
+    gpus: list[GpuDevice],
+    requested: list[str],
+    reserved: Optional[dict[int, float]] = None,
+    headroom: float = 0.05,
+) -> PlacementPlan:
+    """요청된 프로파일들을 GPU에 배치
+
+    - 프로파일 하나는 tensor_parallel_size개의 GPU에 같은 메모리 비율로 올라간다.
+    - GPU별 할당 비율 합은 1 - headroom을 넘지 않는다 (reserved는 이미 쓰이는 비율).
+    - 각 GPU에 할당되는 메모리는 min_vram_gb / tensor_parallel_size 이상이어야 한다.
+    - 큰 프로파일부터 best-fit으로 배치하고, 설정된 비율로 자리가 없으면 최소 요구량까지
+      비율을 줄여 다시 시도한다.
+    """
+    plan = PlacementPlan()
+    allocation = {gpu.index: 0.0 for gpu in gpus}
+    for index, value in (reserved or {}).items():
+        if index in allocation:
+            allocation[index] += value
+    capacity = 1.0 - headroom
+
+    candidates: list[tuple[str, ModelProfile]] = []
+    for profile_id in dict.fromkeys(requested):
+        profile = profiles.get(profile_id)
+        if profile is None:
+            plan.unplaced[profile_id] = "알 수 없는 프로파일"
+        elif profile.tensor_parallel_size > len(gpus):
+            plan.unplaced[profile_id] = (
+                f"GPU {profile.tensor_parallel_size}개 필요 (전체 {len(gpus)}개)"
+            )
+        else:
+            candidates.append((profile_id, profile))
+
+    # 요구량이 큰 프로파일부터 (같으면 요청 순서)
+    candidates.sort(key=lambda item: -item[1].gpu_memory_utilization * item[1].tensor_parallel_size)
+
+    for profile_id, profile in candidates:
+        min_mb = _min_memory_per_gpu_mb(profile)
+        decision = None
+        for utilization in _candidate_utilizations(profile, gpus):
+            eligible = [
+                gpu for gpu in gpus
+                if allocation[gpu.index] + utilization <= capacity + 1e-9
+                and utilization * gpu.memory_total_mb >= min_mb
+            ]
+            if len(eligible) < profile.tensor_parallel_size:
+                continue
+            # best-fit: 남는 자리가 가장 적은 GPU부터 채워 큰 빈자리를 남겨 둔다
+            eligible.sort(key=lambda gpu: (capacity - allocation[gpu.index] - utilization, gpu.index))
+            chosen = sorted(gpu.index for gpu in eligible[: profile.tensor_parallel_size])
+            decision = PlacementDecision(
+                profile_id=profile_id,
+                model_id=profile.model_id,
+                gpu_indices=chosen,
+                gpu_memory_utilization=utilization,
+            )
+            break
+
+        if decision is None:
+            plan.unplaced[profile_id] = (
+                f"GPU {profile.tensor_parallel_size}개에 GPU당 {min_mb / 1024:.1f}GB 이상 남은 자리가 없음"
+            )
+            continue
+        for index in decision.gpu_indices:
+            allocation[index] += decision.gpu_memory_utilization
+        plan.placements.append(decision)
+
+    plan.gpu_allocation = allocation
+    return plan
+
+
+def main():
+    import argparse
+    import json
+
+    import yaml
+
+    parser = argparse.ArgumentParser(description="model_profiles.yml 기준 GPU 배치 계획 (드라이런)")
+    parser.add_argument("profiles", nargs="+", help="배치할 프로파일 ID")
+    parser.add_argument("--profiles-path", default="/app/model_profiles.yml")
+    parser.add_argument("--gpus", default="24576,24576", help="GPU별 메모리(MB), 쉼표 구분")
+    parser.add_argument("--headroom", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with open(args.profiles_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    profiles = {
+        profile_id: ModelProfile(**data)
+        for profile_id, data in config.get("model_profiles", {}).items()
+    }
+    gpus = [
+        GpuDevice(index=index, name=f"gpu{index}", memory_total_mb=int(memory))
+        for index, memory in enumerate(args.gpus.split(","))
+    ]
+    plan = plan_placement(profiles, gpus, args.profiles, headroom=args.headroom)
+    print(json.dumps(plan.to_dict(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
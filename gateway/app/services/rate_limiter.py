@@ -0,0 +1,210 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+from ..config import settings
+from ..redis_client import RedisBreaker, get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "ratelimit"
+
+# 요청 버킷과 토큰 버킷을 한 번의 왕복으로 원자적으로 검사한다.
+# 시각은 게이트웨이 간 시계 차이를 피하려고 Redis TIME을 사용한다.
+# KEYS[1]=요청 버킷, KEYS[2]=토큰 버킷
+# ARGV: 요청 용량, 요청 충전율(/s), 토큰 용량, 토큰 충전율(/s), TTL(s)
+CHECK_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local function refill(key, capacity, rate)
+  local data = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(data[1])
+  local ts = tonumber(data[2])
+  if tokens == nil then
+    return capacity
+  end
+  return math.min(capacity, tokens + math.max(0, now - ts) * rate)
+end
+local req_cap, req_rate = tonumber(ARGV[1]), tonumber(ARGV[2])
+local tok_cap, tok_rate = tonumber(ARGV[3]), tonumber(ARGV[4])
+local ttl = tonumber(ARGV[5])
+local req = refill(KEYS[1], req_cap, req_rate)
+local retry = 0
+if req < 1 then
+  retry = (1 - req) / req_rate
+end
+if tok_cap > 0 then
+  local tok = refill(KEYS[2], tok_cap, tok_rate)
+  if tok < 1 then
+    retry = math.max(retry, (1 - tok) / tok_rate)
+  end
+  redis.call('HSET', KEYS[2], 'tokens', tok, 'ts', now)
+  redis.call('EXPIRE', KEYS[2], ttl)
+end
+local allowed = 0
+if retry == 0 then
+  req = req - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', req, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ttl)
+return {allowed, tostring(retry), tostring(req)}
+"""
+
+# 생성 토큰 차감 (응답 완료 후) - 잔량이 음수가 되면 다음 요청부터 대기
+# KEYS[1]=토큰 버킷, ARGV: 토큰 용량, 충전율(/s), 차감량, TTL(s)
+DEBIT_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local cap, rate, cost, ttl = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1])
+if tokens == nil then
+  tokens = cap
+else
+  tokens = math.min(cap, tokens + math.max(0, now - tonumber(data[2])) * rate)
+end
+tokens = tokens - cost
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ttl)
+return tostring(tokens)
+"""
+
+
+@dataclass
+class RateLimitDecision:
+    """레이트 리밋 판정 결과"""
+    allowed: bool
+    retry_after: float = 0.0
+    remaining: float = 0.0
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class LocalTokenBucket:
+    """Redis 장애 시 사용하는 프로세스 내 토큰 버킷"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def _refill(self, key: str, now: float) -> float:
+        tokens, ts = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + max(0.0, now - ts) * self.rate)
+
+    def peek(self, key: str) -> float:
+        now = time.monotonic()
+        tokens = self._refill(key, now)
+        self._buckets[key] = (tokens, now)
+        return tokens
+
+    def take(self, key: str, cost: float) -> float:
+        now = time.monotonic()
+        tokens = self._refill(key, now) - cost
+        self._buckets[key] = (tokens, now)
+        return tokens
+
+
+class RateLimiter:
+    """사용자별 요청 수 / 생성 토큰 수 레이트 리미터 (Redis 토큰 버킷, 로컬 폴백)"""
+
+    def __init__(
+        self,
+        requests_per_window: int = settings.RATE_LIMIT_REQUESTS,
+        tokens_per_window: int = settings.RATE_LIMIT_TOKENS,
+        window: int = settings.RATE_LIMIT_WINDOW,
+    ):
+        self.request_capacity = requests_per_window
+        self.request_rate = requests_per_window / window
+        self.token_capacity = tokens_per_window
+        self.token_rate = tokens_per_window / window
+        self.ttl = window * 2
+        self._breaker = RedisBreaker()
+        self._check_script = None
+        self._debit_script = None
+        self._local_requests = LocalTokenBucket(self.request_capacity, self.request_rate)
+        self._local_tokens = LocalTokenBucket(self.token_capacity, self.token_rate)
+        self.counters = {"allowed": 0, "rejected": 0, "local_fallback": 0}
+
+    @staticmethod
+    def _keys(user: str) -> tuple[str, str]:
+        return f"{REDIS_KEY_PREFIX}:req:{user}", f"{REDIS_KEY_PREFIX}:tok:{user}"
+
+    def _scripts(self):
+        if self._check_script is None:
+            client = get_redis()
+            self._check_script = client.register_script(CHECK_SCRIPT)
+            self._debit_script = client.register_script(DEBIT_SCRIPT)
+        return self._check_script, self._debit_script
+
+    async def check(self, user: str) -> RateLimitDecision:
+        """요청 1건 허용 여부 판정 (허용 시 요청 버킷 1 차감)"""
+        decision = None
+        if self._breaker.available:
+            try:
+                check_script, _ = self._scripts()
+                allowed, retry_after, remaining = await check_script(
+                    keys=list(self._keys(user)),
+                    args=[
+                        self.request_capacity,
+                        self.request_rate,
+                        self.token_capacity,
+                        self.token_rate,
+                        self.ttl,
+                    ],
+                )
+                decision = RateLimitDecision(bool(allowed), float(retry_after), float(remaining))
+            except Exception as e:
+                self._breaker.record_failure(e)
+
+        if decision is None:
+            self.counters["local_fallback"] += 1
+            decision = self._check_local(user)
+
+        self.counters["allowed" if decision.allowed else "rejected"] += 1
+        return decision
+
+    def _check_local(self, user: str) -> RateLimitDecision:
+        retry_after = 0.0
+        requests = self._local_requests.peek(user)
+        if requests < 1:
+            retry_after = (1 - requests) / self.request_rate
+        if self.token_capacity > 0:
+            tokens = self._local_tokens.peek(user)
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / self.token_rate)
+        if retry_after > 0:
+            return RateLimitDecision(False, retry_after, requests)
+        return RateLimitDecision(True, 0.0, self._local_requests.take(user, 1))
+
+    async def consume_tokens(self, user: str, tokens: int):
+        """응답 완료 후 생성 토큰 수만큼 토큰 버킷 차감"""
+        if self.token_capacity <= 0 or tokens <= 0:
+            return
+        if self._breaker.available:
+            try:
+                _, debit_script = self._scripts()
+                await debit_script(
+                    keys=[self._keys(user)[1]],
+                    args=[self.token_capacity, self.token_rate, tokens, self.ttl],
+                )
+                return
+            except Exception as e:
+                self._breaker.record_failure(e)
+        self._local_tokens.take(user, tokens)
+
+    def stats(self) -> dict:
+        return {
+            "requests_per_window": self.request_capacity,
+            "tokens_per_window": self.token_capacity,
+            "window_seconds": settings.RATE_LIMIT_WINDOW,
+            **self.counters,
+        }
+
+
+# 전역 레이트 리미터 인스턴스
+rate_limiter = RateLimiter()
@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Float, cast, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import RequestLog
+
+BUCKET_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+class RequestLogRepository:
+    """request_logs 집계 조회 (PostgreSQL 전용 - date_trunc, percentile_cont 사용)
+
+    created_at 범위 조건이 항상 붙으므로 조회 구간에 해당하는 일 파티션만 읽는다.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def rollup(
+        self,
+        since: datetime,
+        until: datetime,
+        bucket: str = "hour",
+        model: Optional[str] = None,
+    ) -> list[dict]:
+        """시간 구간 × 모델별 요청 수, 오류 수, 지연 분포, 토큰 처리량"""
+        if bucket not in BUCKET_SECONDS:
+            raise ValueError(f"지원하지 않는 집계 단위: {bucket}")
+
+        # 바인드 파라미터면 SELECT와 GROUP BY의 식이 같은지 PostgreSQL이 판단하지 못하므로 리터럴로 (검증된 값)
+        bucket_start = func.date_trunc(literal_column(f"'{bucket}'"), RequestLog.created_at).label("bucket")
+        succeeded = RequestLog.status_code < 400
+        query = (
+            select(
+                bucket_start,
+                RequestLog.model,
+                func.count().label("requests"),
+                func.count().filter(RequestLog.status_code >= 400).label("errors"),
+                func.avg(RequestLog.latency_ms).label("latency_avg_ms"),
+                func.percentile_cont(0.5).within_group(RequestLog.latency_ms).label("latency_p50_ms"),
+                func.percentile_cont(0.95).within_group(RequestLog.latency_ms).label("latency_p95_ms"),
+                func.coalesce(func.sum(RequestLog.input_tokens), 0).label("input_tokens"),
+                func.coalesce(func.sum(RequestLog.output_tokens), 0).label("output_tokens"),
+                # 성공 요청의 생성 토큰 합 / 처리 시간 합 (요청 하나가 체감하는 생성 속도)
+                (
+                    cast(func.sum(RequestLog.output_tokens).filter(succeeded), Float)
+                    / cast(func.nullif(func.sum(RequestLog.latency_ms).filter(succeeded), 0), Float)
+                    * 1000
+                ).label("decode_tokens_per_s"),
+            )
+            .where(RequestLog.created_at >= since, RequestLog.created_at < until)
+            .group_by(bucket_start, RequestLog.model)
+            .order_by(bucket_start, RequestLog.model)
+        )
+        if model:
+            query = query.where(RequestLog.model == model)
+
+        seconds = BUCKET_SECONDS[bucket]
+        return [
+            {
+                "bucket": row.bucket,
+                "model": row.model,
+                "requests": row.requests,
+                "errors": row.errors,
+                "latency_avg_ms": round(float(row.latency_avg_ms), 1) if row.latency_avg_ms is not None else None,
+                "latency_p50_ms": round(row.latency_p50_ms, 1) if row.latency_p50_ms is not None else None,
+                "latency_p95_ms": round(row.latency_p95_ms, 1) if row.latency_p95_ms is not None else None,
+                "input_tokens": int(row.input_tokens),
+                "output_tokens": int(row.output_tokens),
+                # 구간 전체의 생성 토큰 처리량 (동시 요청 포함)
+                "output_tokens_per_s": round(int(row.output_tokens) / seconds, 2),
+                "decode_tokens_per_s": (
+                    round(row.decode_tokens_per_s, 1) if row.decode_tokens_per_s is not None else None
+                ),
+            }
+            for row in (await self.session.execute(query)).all()
+        ]
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import insert, text
+
+from ..config import settings
+from ..database import AsyncSessionLocal, engine
+from ..metrics import REQUEST_LOG_DROPPED, REQUEST_LOG_FLUSH_DURATION, REQUEST_LOG_QUEUE_DEPTH
+from ..models import RequestLog
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "request_logs_p"
+PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{8}})$")
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+class RequestLogWriter:
+    """채팅 요청 기록을 request_logs에 비동기 배치 저장
+
+    요청 경로는 큐에 넣기만 하고 백그라운드 작업이 배치 크기나 주기마다 다중 행 INSERT로 쓴다.
+    모니터링용 기록이므로 큐가 가득 차거나 저장이 실패하면 재시도하지 않고 버린다 (버린 수는 메트릭으로 집계).
+    PostgreSQL이면 일 단위 파티션을 미리 만들고 보존 기간이 지난 파티션을 DROP한다.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = settings.REQUEST_LOG_QUEUE_SIZE,
+        batch_size: int = settings.REQUEST_LOG_BATCH_SIZE,
+        flush_interval: float = settings.REQUEST_LOG_FLUSH_INTERVAL,
+        flush_timeout: float = settings.REQUEST_LOG_FLUSH_TIMEOUT,
+        partitions_ahead: int = settings.REQUEST_LOG_PARTITIONS_AHEAD,
+        retention_days: int = settings.REQUEST_LOG_RETENTION_DAYS,
+        maintenance_interval: float = settings.REQUEST_LOG_MAINTENANCE_INTERVAL,
+    ):
+        self.enabled = settings.REQUEST_LOG_ENABLED
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.flush_timeout = flush_timeout
+        self.partitions_ahead = partitions_ahead
+        self.retention_days = retention_days
+        self.maintenance_interval = maintenance_interval
+        self.queue: deque[dict] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.last_flush_ms: Optional[float] = None
+        self.partitions: list[str] = []
+        self.partitioned: Optional[bool] = None  # PostgreSQL에서 확인 전이면 None
+
+    def record(
+        self,
+        model: Optional[str],
+        status_code: int,
+        latency_ms: float,
+        user_id: Optional[int] = None,
+        conversation_id: Optional[int] = None,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        error_message: Optional[str] = None,
+    ):
+        """요청 한 건 기록 (큐가 가득 차면 버림, 블로킹 없음)"""
+        if not self.enabled:
+            return
+        if len(self.queue) >= self.queue_size:
+            self._drop(1, "queue_full")
+            return
+        self.queue.append({
+            "user_id": user_id,
+            "conversation_id": conversation_id,
+            "model": (model or "")[:100] or None,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "latency_ms": int(latency_ms),
+            "status_code": status_code,
+            "error_message": error_message[:1000] if error_message else None,
+            "created_at": datetime.now(timezone.utc),
+        })
+        REQUEST_LOG_QUEUE_DEPTH.set(len(self.queue))
+        if len(self.queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _drop(self, count: int, reason: str):
+        self.dropped += count
+        REQUEST_LOG_DROPPED.labels(reason=reason).inc(count)
+
+    async def _insert(self, batch: list[dict]):
+        async with AsyncSessionLocal() as session:
+            await session.execute(insert(RequestLog), batch)
+            await session.commit()
+
+    async def _flush(self, batch: list[dict]):
+        started_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._insert(batch), timeout=self.flush_timeout)
+        except Exception as e:
+            REQUEST_LOG_FLUSH_DURATION.labels(result="error").observe(time.perf_counter() - started_at)
+            logger.warning(f"요청 로그 {len(batch)}건 저장 실패, 버림: {e!r}")
+            self._drop(len(batch), "flush_failed")
+            return
+        elapsed = time.perf_counter() - started_at
+        REQUEST_LOG_FLUSH_DURATION.labels(result="success").observe(elapsed)
+        self.last_flush_ms = round(elapsed * 1000, 1)
+        self.written += len(batch)
+
+    async def _drain(self):
+        while self.queue:
+            batch = [self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))]
+            REQUEST_LOG_QUEUE_DEPTH.set(len(self.queue))
+            await self._flush(batch)
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._drain()
+            except Exception as e:
+                logger.error(f"요청 로그 저장 루프 오류: {e}")
+
+    async def _execute_ddl(self, statement: str) -> bool:
+        """DDL 한 문장을 별도 트랜잭션으로 실행 (하나가 실패해도 나머지는 진행)"""
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text(statement))
+            return True
+        except Exception as e:
+            logger.error(f"request_logs 파티션 DDL 실패 ({statement.split(' PARTITION')[0]}): {e}")
+            return False
+
+    async def _is_partitioned(self) -> bool:
+        """request_logs가 파티션 테이블인지 (파티션 도입 전 init.sql로 만든 일반 테이블이면 False)"""
+        async with engine.connect() as conn:
+            relkind = await conn.scalar(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('request_logs')"))
+        return relkind == "p"
+
+    async def _partition_names(self) -> list[str]:
+        async with engine.connect() as conn:
+            rows = await conn.execute(text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = 'request_logs'"
+            ))
+            return sorted(row[0] for row in rows)
+
+    async def _create_partition(self, day: date) -> bool:
+        """일 파티션 생성 - 기본 파티션에 그날 행이 있으면 새 파티션으로 옮긴 뒤 붙임
+
+        기본 파티션에 범위가 겹치는 행이 있으면 PARTITION OF가 실패하므로, 같은 트랜잭션에서
+        빈 테이블을 만들고 행을 옮긴 다음 ATTACH한다 (그동안 request_logs 쓰기는 잠시 대기).
+        """
+        name = partition_name(day)
+        start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+        bounds = {"start": start, "end": start + timedelta(days=1)}
+        in_range = "created_at >= :start AND created_at < :end"
+        values = (
+            f"FOR VALUES FROM ('{day:%Y-%m-%d} 00:00:00+00') "
+            f"TO ('{day + timedelta(days=1):%Y-%m-%d} 00:00:00+00')"
+        )
+        try:
+            async with engine.begin() as conn:
+                stray = await conn.scalar(text(f"SELECT count(*) FROM request_logs_default WHERE {in_range}"), bounds)
+                if not stray:
+                    await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF request_logs {values}"))
+                    return True
+                # INSERT와 같은 순서(부모 → 파티션)로 잠가 교착을 피하고, 옮기는 동안 새 행이 들어오지 않게 함
+                await conn.execute(text("LOCK TABLE ONLY request_logs IN ACCESS EXCLUSIVE MODE"))
+                await conn.execute(text(f"CREATE TABLE {name} (LIKE request_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+                moved = await conn.execute(
+                    text(
+                        f"WITH moved AS (DELETE FROM request_logs_default WHERE {in_range} RETURNING *) "
+                        f"INSERT INTO {name} SELECT * FROM moved"
+                    ),
+                    bounds,
+                )
+                await conn.execute(text(f"ALTER TABLE request_logs ATTACH PARTITION {name} {values}"))
+            logger.info(f"기본 파티션의 요청 로그 {moved.rowcount}건을 {name}으로 옮김")
+            return True
+        except Exception as e:
+            logger.error(f"request_logs 파티션 생성 실패 ({name}): {e}")
+            return False
+
+    async def _purge_default(self, cutoff: date):
+        """파티션이 없던 날짜로 기본 파티션에 남은 행 중 보존 기간이 지난 것 삭제"""
+        try:
+            async with engine.begin() as conn:
+                result = await conn.execute(
+                    text("DELETE FROM request_logs_default WHERE created_at < :cutoff"),
+                    {"cutoff": datetime.combine(cutoff, datetime.min.time(), tzinfo=timezone.utc)},
+                )
+            if result.rowcount:
+                logger.info(f"보존 기간이 지난 기본 파티션 요청 로그 {result.rowcount}건 삭제")
+        except Exception as e:
+            logger.error(f"request_logs_default 정리 실패: {e}")
+
+    async def maintain_partitions(self, today: Optional[date] = None):
+        """오늘부터 partitions_ahead일 뒤까지 파티션 생성, 보존 기간이 지난 파티션 DROP"""
+        if engine.dialect.name != "postgresql":
+            return
+        self.partitioned = await self._is_partitioned()
+        if not self.partitioned:
+            # 일반 테이블에는 파티션을 붙일 수 없고, 남아 있는 users/conversations FK 때문에
+            # 클라이언트가 보낸 conversation_id 하나로 배치 전체가 실패할 수 있다
+            logger.error(
+                "request_logs가 파티션 테이블이 아닙니다 (파티션 도입 전 스키마). "
+                "scripts/migrate_request_logs_partitions.sql을 실행하세요 - 그때까지 파티션 관리를 건너뜁니다"
+            )
+            return
+
+        today = today or datetime.now(timezone.utc).date()
+        names = await self._partition_names()
+        for offset in range(self.partitions_ahead + 1):
+            day = today + timedelta(days=offset)
+            if partition_name(day) not in names and await self._create_partition(day):
+                names.append(partition_name(day))
+        names.sort()
+
+        if self.retention_days > 0:
+            cutoff = today - timedelta(days=self.retention_days)
+            for name in list(names):
+                match = PARTITION_NAME.match(name)
+                if match and datetime.strptime(match.group(1), "%Y%m%d").date() < cutoff:
+                    if await self._execute_ddl(f"DROP TABLE IF EXISTS {name}"):
+                        logger.info(f"보존 기간이 지난 요청 로그 파티션 삭제: {name}")
+                        names.remove(name)
+            await self._purge_default(cutoff)
+        self.partitions = names
+
+    async def _maintenance_loop(self):
+        while True:
+            try:
+                await self.maintain_partitions()
+            except Exception as e:
+                logger.error(f"request_logs 파티션 관리 실패: {e}")
+            await asyncio.sleep(self.maintenance_interval)
+
+    async def start(self):
+        if not self.enabled:
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+        if self._maintenance_task is None:
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def stop(self):
+        """백그라운드 작업을 멈추고 남은 기록을 마지막으로 저장"""
+        for task in (self._task, self._maintenance_task):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(
+            *(task for task in (self._task, self._maintenance_task) if task is not None),
+            return_exceptions=True,
+        )
+        self._task = None
+        self._maintenance_task = None
+        await self._drain()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "queue_depth": len(self.queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "last_flush_ms": self.last_flush_ms,
+            "partitioned": self.partitioned,
+            "partitions": self.partitions,
+        }
+
+
+# 전역 요청 로그 기록 인스턴스
+request_log_writer = RequestLogWriter()
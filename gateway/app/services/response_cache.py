@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ..config import settings
+from ..redis_client import RedisBreaker, get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "respcache"
+
+
+def request_fingerprint(body: dict, profile: Optional[str]) -> str:
+    """요청 본문 + 활성 프로파일의 정규화 해시 (키 순서/공백과 무관)"""
+    canonical = json.dumps(
+        {"profile": profile, "body": body},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def is_deterministic(body: dict) -> bool:
+    """같은 입력에 같은 출력이 기대되는 요청인지 (temperature=0, 단일 후보)"""
+    return body.get("temperature") == 0 and body.get("n", 1) == 1
+
+
+class ByteBoundedLRU:
+    """바이트 용량 기준으로 제한되는 TTL LRU 캐시"""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        if len(value) > self.max_entry_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self.current_bytes += len(value)
+        while self.current_bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self.current_bytes -= len(value)
+
+
+class ResponseCache:
+    """비스트리밍 결정적 채팅 응답 캐시 (프로세스 내 LRU + Redis 2단계)"""
+
+    def __init__(
+        self,
+        enabled: bool = settings.RESPONSE_CACHE_ENABLED,
+        ttl: int = settings.RESPONSE_CACHE_TTL,
+        use_redis: bool = settings.RESPONSE_CACHE_REDIS,
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self.local = ByteBoundedLRU(
+            settings.RESPONSE_CACHE_MAX_BYTES,
+            settings.RESPONSE_CACHE_MAX_ENTRY_BYTES,
+        )
+        self._breaker = RedisBreaker()
+        self.counters = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "bypasses": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def _redis_key(profile: Optional[str], fingerprint: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{profile or '-'}:{fingerprint}"
+
+    def record_bypass(self):
+        self.counters["bypasses"] += 1
+
+    async def get(self, profile: Optional[str], fingerprint: str) -> Optional[bytes]:
+        """캐시된 응답 본문(JSON 바이트) 조회"""
+        key = self._redis_key(profile, fingerprint)
+        value = self.local.get(key)
+        if value is not None:
+            self.counters["local_hits"] += 1
+            return value
+
+        if self.use_redis and self._breaker.available:
+            try:
+                value = await get_redis().get(key)
+            except Exception as e:
+                self._breaker.record_failure(e)
+                value = None
+            if value is not None:
+                self.counters["redis_hits"] += 1
+                self.local.set(key, value, self.ttl)
+                return value
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, profile: Optional[str], fingerprint: str, value: bytes):
+        """응답 본문 저장 (두 계층 모두)"""
+        key = self._redis_key(profile, fingerprint)
+        self.local.set(key, value, self.ttl)
+        self.counters["stores"] += 1
+
+        if self.use_redis and self._breaker.available and len(value) <= self.local.max_entry_bytes:
+            try:
+                await get_redis().set(key, value, ex=self.ttl)
+            except Exception as e:
+                self._breaker.record_failure(e)
+
+    async def invalidate(self, profile: Optional[str] = None):
+        """모델 전환 시 캐시 무효화 (profile 지정 시 해당 프로파일 키만 Redis에서 삭제)"""
+        self.local.clear()
+        self.counters["invalidations"] += 1
+        if not self.use_redis or not self._breaker.available:
+            return
+
+        pattern = f"{REDIS_KEY_PREFIX}:{profile or '*'}:*"
+        try:
+            client = get_redis()
+            batch = []
+            async for key in client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    await client.unlink(*batch)
+                    batch.clear()
+            if batch:
+                await client.unlink(*batch)
+        except Exception as e:
+            self._breaker.record_failure(e)
+        logger.info(f"응답 캐시 무효화: {pattern}")
+
+    def stats(self) -> dict:
+        hits = self.counters["local_hits"] + self.counters["redis_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            "enabled": self.enabled,
+            **self.counters,
+            "evictions": self.local.evictions,
+            "entries": len(self.local),
+            "bytes": self.local.current_bytes,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+# 전역 응답 캐시 인스턴스
+response_cache = ResponseCache()
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import logging
+import time
+import inspect
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from typing import Optional
+
+import httpx
+
+from ..config import settings
+from ..metrics import (
+    INFLIGHT_STREAMS,
+    OUTPUT_TOKENS,
+    OUTPUT_TOKENS_PER_SECOND,
+    UPSTREAM_INTER_TOKEN,
+    UPSTREAM_TTFT,
+    profile_label,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StreamTimer:
+    """스트리밍 요청별 타이밍 기록 (TTFT, 청크 간 간격)"""
+
+    def __init__(self, profile: Optional[str] = None):
+        self.profile = profile_label(profile)
+        self.started_at = time.perf_counter()
+        self.first_chunk_at: Optional[float] = None
+        self.last_chunk_at: Optional[float] = None
+        self.chunk_count = 0
+        self.byte_count = 0
+        self.event_count = 0
+        self.max_gap = 0.0
+        self.total_gap = 0.0
+        self.tail: deque[bytes] = deque(maxlen=4)  # usage는 마지막 이벤트에 실려 옴
+
+    def mark_chunk(self, chunk: bytes):
+        now = time.perf_counter()
+        if self.first_chunk_at is None:
+            self.first_chunk_at = now
+            UPSTREAM_TTFT.labels(profile=self.profile).observe(now - self.started_at)
+        else:
+            gap = now - self.last_chunk_at
+            self.total_gap += gap
+            self.max_gap = max(self.max_gap, gap)
+            UPSTREAM_INTER_TOKEN.labels(profile=self.profile).observe(gap)
+        self.last_chunk_at = now
+        self.chunk_count += 1
+        self.byte_count += len(chunk)
+        self.event_count += chunk.count(b"data:") - chunk.count(b"[DONE]")
+        self.tail.append(chunk)
+
+    @property
+    def approx_output_tokens(self) -> int:
+        """SSE 이벤트 수 기반 생성 토큰 근사치 (첫 이벤트는 role만 포함)"""
+        return max(self.event_count - 1, 0)
+
+    @property
+    def usage(self) -> Optional[dict]:
+        """stream_options.include_usage로 받은 마지막 usage (없으면 None)"""
+        usage = None
+        for payload in iter_sse_payloads(b"".join(self.tail)):
+            usage = payload.get("usage") or usage
+        return usage
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """첫 청크까지 걸린 시간 (초)"""
+        if self.first_chunk_at is None:
+            return None
+        return self.first_chunk_at - self.started_at
+
+    @property
+    def mean_gap(self) -> Optional[float]:
+        """평균 청크 간 간격 (초)"""
+        if self.chunk_count < 2:
+            return None
+        return self.total_gap / (self.chunk_count - 1)
+
+    def record_throughput(self):
+        """스트림 종료 시 생성 토큰 수와 디코드 구간 처리량 기록"""
+        tokens = self.approx_output_tokens
+        OUTPUT_TOKENS.labels(profile=self.profile).inc(tokens)
+        if tokens > 0 and self.mean_gap is not None:
+            decode_time = self.last_chunk_at - self.first_chunk_at
+            OUTPUT_TOKENS_PER_SECOND.labels(profile=self.profile, stream="true").observe(tokens / decode_time)
+
+    def summary(self) -> dict:
+        return {
+            "ttft_ms": round(self.ttft * 1000, 1) if self.ttft is not None else None,
+            "mean_gap_ms": round(self.mean_gap * 1000, 1) if self.mean_gap is not None else None,
+            "max_gap_ms": round(self.max_gap * 1000, 1),
+            "chunks": self.chunk_count,
+            "events": self.event_count,
+            "bytes": self.byte_count,
+            "duration_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+        }
+
+
+def sse_progress_event(progress: dict) -> bytes:
+    """업스트림 응답 전 대기 상황을 알리는 SSE 이벤트 (이름 있는 이벤트라 data 전용 파서는 무시)"""
+    payload = json.dumps(progress, ensure_ascii=False)
+    return f"event: gateway.progress\ndata: {payload}\n\n".encode()
+
+
+def sse_error_event(message: str) -> bytes:
+    """스트림 도중 발생한 오류를 클라이언트에 알리는 SSE 이벤트"""
+    payload = json.dumps({"error": {"message": message, "type": "gateway_error"}}, ensure_ascii=False)
+    return f"data: {payload}\n\n".encode()
+
+
+def iter_sse_payloads(data: bytes) -> Iterator[dict]:
+    """SSE 바이트에서 data: 줄의 JSON 페이로드 (잘린 줄과 [DONE]은 건너뜀)"""
+    for line in data.splitlines():
+        if not line.startswith(b"data:"):
+            continue
+        payload = line[5:].strip()
+        if not payload or payload == b"[DONE]":
+            continue
+        try:
+            decoded = json.loads(payload)
+        except ValueError:
+            continue
+        if isinstance(decoded, dict):
+            yield decoded
+
+
+def collect_sse_completion(chunks: list[bytes]) -> tuple[str, Optional[str], int]:
+    """중계한 SSE 청크에서 첫 번째 선택지의 (응답 본문, finish_reason, 내용 이벤트 수) 추출"""
+    content = []
+    finish_reason = None
+    for payload in iter_sse_payloads(b"".join(chunks)):
+        for choice in payload.get("choices") or []:
+            if choice.get("index", 0) != 0:
+                continue
+            delta = choice.get("delta") or {}
+            if delta.get("content"):
+                content.append(delta["content"])
+            finish_reason = choice.get("finish_reason") or finish_reason
+    return "".join(content), finish_reason, len(content)
+
+
+async def open_upstream_stream(
+    client: httpx.AsyncClient,
+    url: str,
+    body: dict,
+) -> httpx.Response:
+    """업스트림 스트림을 열고 응답 헤더까지 수신 (본문은 읽지 않음)
+
+    연결 타임아웃은 httpx에, 헤더 수신까지의 대기는 첫 바이트 타임아웃에 맡긴다.
+    """
+    request = client.build_request(
+        "POST",
+        url,
+        json=body,
+        headers={"Accept": "text/event-stream"},
+        timeout=httpx.Timeout(
+            None,
+            connect=settings.STREAM_CONNECT_TIMEOUT,
+            pool=settings.UPSTREAM_POOL_TIMEOUT,
+        ),
+    )
+    return await asyncio.wait_for(
+        client.send(request, stream=True),
+        timeout=settings.STREAM_FIRST_BYTE_TIMEOUT,
+    )
+
+
+async def relay_stream(
+    response: httpx.Response,
+    timer: StreamTimer,
+    on_close: Optional[Callable[[bool], Optional[Awaitable[None]]]] = None,
+) -> AsyncIterator[bytes]:
+    """업스트림 SSE 바이트를 그대로 전달하는 제너레이터
+
+    다운스트림 send가 끝나야 다음 청크를 읽으므로 소켓 백프레셔가 그대로 업스트림까지 전파된다.
+    클라이언트가 끊기면 제너레이터가 닫히면서 업스트림 응답도 닫혀 vLLM이 요청을 중단한다.
+    on_close는 스트림 종료 시 업스트림 오류 여부(성공=True)와 함께 한 번 호출된다 (코루틴 가능).
+    """
+    success = True
+    chunks = response.aiter_raw()
+    first_byte_deadline = timer.started_at + settings.STREAM_FIRST_BYTE_TIMEOUT
+    inflight = INFLIGHT_STREAMS.labels(profile=timer.profile)
+    inflight.inc()
+    try:
+        while True:
+            if timer.first_chunk_at is None:
+                timeout = max(first_byte_deadline - time.perf_counter(), 0.0)
+            else:
+                timeout = settings.STREAM_IDLE_TIMEOUT
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                phase = "first byte" if timer.first_chunk_at is None else "idle"
+                logger.warning(f"업스트림 스트림 타임아웃: {phase} ({timeout:.1f}s)")
+                success = False
+                yield sse_error_event(f"upstream {phase} timeout")
+                break
+            except httpx.HTTPError as e:
+                logger.error(f"업스트림 스트림 오류: {e}")
+                success = False
+                yield sse_error_event("upstream stream error")
+                break
+
+            timer.mark_chunk(chunk)
+            yield chunk
+    finally:
+        inflight.dec()
+        timer.record_throughput()
+        await response.aclose()
+        if on_close is not None:
+            result = on_close(success)
+            if inspect.isawaitable(result):
+                await result
+        logger.info(f"스트리밍 완료: {timer.summary()}")
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """선형 보간 백분위수 (values는 비어 있지 않아야 함)"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class SwitchHistory:
+    """모델 전환 기록을 JSONL 파일에 누적하고 프로파일별 전환 시간 분포를 계산
+
+    기록 하나는 전환 한 번 (프로파일, 전략, 결과, 전체 시간, 단계별 시간).
+    최근 max_entries건은 메모리에도 보관해 조회 시 파일을 다시 읽지 않는다.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.MODEL_SWITCH_HISTORY_PATH,
+        max_entries: int = settings.MODEL_SWITCH_HISTORY_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.records: deque[dict] = deque(maxlen=max_entries)
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def _read(self) -> list[dict]:
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # 기록 중 중단된 마지막 줄 등
+        return records
+
+    def _write(self, record: dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def load(self):
+        async with self._lock:
+            if self._loaded:
+                return
+            try:
+                self.records.extend(await asyncio.to_thread(self._read))
+            except OSError as e:
+                logger.error(f"모델 전환 기록 로드 실패: {e}")
+            self._loaded = True
+
+    async def append(self, record: dict):
+        await self.load()
+        async with self._lock:
+            self.records.append(record)
+            try:
+                await asyncio.to_thread(self._write, record)
+            except OSError as e:
+                logger.error(f"모델 전환 기록 저장 실패: {e}")
+
+    async def summary(self, profile_id: Optional[str] = None, limit: int = 20) -> dict:
+        """프로파일별 성공한 전환의 전체/단계별 p50·p95와 최근 기록"""
+        await self.load()
+        records = [r for r in self.records if profile_id is None or r.get("profile") == profile_id]
+
+        by_profile: dict[str, list[dict]] = {}
+        for record in records:
+            by_profile.setdefault(record.get("profile", ""), []).append(record)
+
+        profiles = {}
+        for profile, entries in by_profile.items():
+            succeeded = [entry for entry in entries if entry.get("result") == "success"]
+            stats = {"count": len(entries), "succeeded": len(succeeded)}
+            if succeeded:
+                totals = [entry["duration_s"] for entry in succeeded]
+                stats["duration_s"] = {
+                    "p50": round(_percentile(totals, 0.5), 2),
+                    "p95": round(_percentile(totals, 0.95), 2),
+                }
+                phases: dict[str, list[float]] = {}
+                for entry in succeeded:
+                    for phase, seconds in entry.get("phases", {}).items():
+                        phases.setdefault(phase, []).append(seconds)
+                stats["phases"] = {
+                    phase: {
+                        "p50": round(_percentile(values, 0.5), 2),
+                        "p95": round(_percentile(values, 0.95), 2),
+                    }
+                    for phase, values in phases.items()
+                }
+            profiles[profile] = stats
+
+        return {"profiles": profiles, "recent": list(records)[-limit:][::-1]}
+
+
+# 전역 모델 전환 기록 인스턴스
+switch_history = SwitchHistory()
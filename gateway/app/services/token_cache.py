@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ..config import settings
+from ..redis_client import RedisBreaker, get_redis
+
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY_PREFIX = "auth:revoked"
+
+
+def token_digest(token: str) -> str:
+    """캐시/폐기 목록 키로 쓰는 토큰 다이제스트 (원본 토큰은 저장하지 않음)"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """서명 검증을 마친 JWT 클레임 캐시
+
+    항목은 토큰 자신의 exp 시각에 만료되므로 캐시가 토큰 유효 기간을 늘리지 않는다.
+    폐기된 토큰은 Redis 키(exp까지 유지)로 기록하고 pub/sub 채널로 전파해
+    모든 게이트웨이 프로세스의 캐시에서 즉시 제거한다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.AUTH_TOKEN_CACHE_MAX_ENTRIES,
+        channel: str = settings.AUTH_REVOCATION_CHANNEL,
+    ):
+        self.enabled = settings.AUTH_TOKEN_CACHE_ENABLED
+        self.max_entries = max_entries
+        self.channel = channel
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        # pub/sub로 받은 폐기 목록 (다이제스트 -> exp), Redis 장애 시에도 이 프로세스에서는 유지
+        self._revoked: dict[str, float] = {}
+        self._breaker = RedisBreaker()
+        self._listener: Optional[asyncio.Task] = None
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "revocations": 0}
+
+    def get(self, digest: str) -> Optional[dict]:
+        """캐시된 클레임 조회 (만료/폐기된 항목은 제거 후 None)"""
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+        claims, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[digest]
+            self.counters["misses"] += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.counters["hits"] += 1
+        return claims
+
+    def put(self, digest: str, claims: dict):
+        """검증된 클레임 저장 (exp가 없는 토큰은 캐시하지 않음)"""
+        if not self.enabled:
+            return
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or digest in self._revoked:
+            return
+        self._entries[digest] = (claims, float(expires_at))
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    async def is_revoked(self, digest: str) -> bool:
+        """폐기 여부 확인 (캐시 미스 경로에서만 호출)
+
+        Redis 장애 중에는 이 프로세스가 받은 폐기 목록만 확인한다.
+        """
+        if digest in self._revoked:
+            return True
+        if not self._breaker.available:
+            return False
+        try:
+            return bool(await get_redis().exists(f"{REVOKED_KEY_PREFIX}:{digest}"))
+        except Exception as e:
+            self._breaker.record_failure(e)
+            return False
+
+    async def revoke(self, digest: str, expires_at: float):
+        """토큰 폐기 - Redis에 exp까지 기록하고 다른 프로세스에 전파"""
+        self._apply_revocation(digest, expires_at)
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return
+        try:
+            client = get_redis()
+            await client.set(f"{REVOKED_KEY_PREFIX}:{digest}", 1, ex=ttl)
+            await client.publish(self.channel, f"{digest} {expires_at}")
+        except Exception as e:
+            self._breaker.record_failure(e)
+            logger.warning(f"토큰 폐기 전파 실패 (이 프로세스에만 반영): {e}")
+
+    def _apply_revocation(self, digest: str, expires_at: float):
+        now = time.time()
+        self._revoked = {key: exp for key, exp in self._revoked.items() if exp > now}
+        self._revoked[digest] = expires_at
+        if self._entries.pop(digest, None) is not None:
+            self.counters["revocations"] += 1
+
+    def _handle_message(self, data: bytes):
+        try:
+            digest, expires_at = data.decode().split()
+            self._apply_revocation(digest, float(expires_at))
+        except ValueError:
+            logger.warning(f"잘못된 토큰 폐기 메시지: {data!r}")
+
+    async def _listen(self):
+        """폐기 채널 구독 (연결이 끊기면 재구독)"""
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_redis().pubsub()
+                await pubsub.subscribe(self.channel)
+                while True:
+                    # 공용 클라이언트의 짧은 소켓 타임아웃에 걸리지 않도록 폴링 간격을 지정
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        self._handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"토큰 폐기 채널 구독 실패, 재시도 예정: {e}")
+                await asyncio.sleep(settings.REDIS_RETRY_COOLDOWN)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    async def start(self):
+        if self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "revoked_tracked": len(self._revoked),
+            "hit_ratio": round(self.counters["hits"] / lookups, 3) if lookups else None,
+            **self.counters,
+        }
+
+
+# 전역 토큰 캐시 인스턴스
+token_cache = VerifiedTokenCache()
@@ -0,0 +1,376 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, insert, select, update
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..metrics import (
+    TURN_WRITE_BATCH_SIZE,
+    TURN_WRITE_DROPPED,
+    TURN_WRITE_FLUSH_DURATION,
+    TURN_WRITE_QUEUE_DEPTH,
+)
+from ..models import Conversation, Message
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_COLUMNS = ("conversation_id", "role", "content", "token_count", "created_at")
+DB_BACKOFF_MAX = 30.0  # 저장 실패/지연 후 DB 재시도까지 최대 대기 시간
+
+
+def _spill_line(row: dict) -> str:
+    return json.dumps({**row, "created_at": row["created_at"].isoformat()}, ensure_ascii=False) + "\n"
+
+
+class TurnWriter:
+    """완료된 채팅 턴(사용자 메시지 + 어시스턴트 응답)을 응답 경로 밖에서 일괄 저장
+
+    채팅 응답은 메시지를 메모리 큐에 넣기만 하고, 백그라운드 작업이 배치 크기나 주기마다
+    다중 행 INSERT 한 번으로 messages 테이블에 쓴다. DB가 느리거나 실패하면
+    - spill: 배치를 로컬 추가 전용 파일에 기록하고, DB가 회복되면 파일을 다시 적재
+    - memory: 큐에 되돌려 재시도하고, 큐가 가득 차면 새 메시지를 버림
+    저장은 최소 한 번(at-least-once)이라 타임아웃 직전에 커밋된 배치는 중복될 수 있다.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = settings.TURN_WRITER_QUEUE_SIZE,
+        batch_size: int = settings.TURN_WRITER_BATCH_SIZE,
+        flush_interval: float = settings.TURN_WRITER_FLUSH_INTERVAL,
+        flush_timeout: float = settings.TURN_WRITER_FLUSH_TIMEOUT,
+        slow_flush: float = settings.TURN_WRITER_SLOW_FLUSH,
+        durability: str = settings.TURN_WRITER_DURABILITY,
+        spill_path: str = settings.TURN_WRITER_SPILL_PATH,
+    ):
+        self.enabled = settings.TURN_WRITER_ENABLED
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.flush_timeout = flush_timeout
+        self.slow_flush = slow_flush
+        self.durability = durability
+        self.spill_path = spill_path
+        self.queue: deque[dict] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._spill_lock = threading.Lock()
+        self._db_failures = 0
+        self._db_retry_at = 0.0
+        self._in_flight: list[dict] = []  # 큐에서 꺼내 저장(DB 또는 스필) 중인 배치
+        self._spilled_conversations: set[int] = set()  # 스필 파일에 아직 행이 남은 대화
+        self._spill_backlog_unknown = False  # 이전 프로세스가 남긴 스필 파일 (어느 대화인지 모름)
+        self.commits = 0  # DB에 커밋된 배치 수 (컨텍스트 재구성 중 저장이 끝났는지 판단용)
+        self.submitted = 0
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.last_flush_ms: Optional[float] = None
+
+    @property
+    def spill_enabled(self) -> bool:
+        return self.durability == "spill"
+
+    @property
+    def replay_path(self) -> str:
+        return f"{self.spill_path}.replay"
+
+    def submit(self, user_id: int, conversation_id: int, messages: list[dict]) -> bool:
+        """턴 저장 요청 - 응답 경로에서 호출되며 DB를 기다리지 않음
+
+        user_id는 저장 시 대화 소유자와 대조한다 (다른 사용자의 대화에는 쓰지 않음).
+        """
+        if not self.enabled or not messages:
+            return False
+        created_at = datetime.now(timezone.utc)
+        rows = [
+            {
+                "user_id": user_id,
+                "conversation_id": conversation_id,
+                "role": message["role"],
+                "content": message["content"],
+                "token_count": message.get("token_count", 0),
+                "created_at": created_at,
+            }
+            for message in messages
+        ]
+        self.submitted += len(rows)
+
+        if len(self.queue) + len(rows) > self.queue_size:
+            if not self.spill_enabled:
+                self._drop(len(rows), "queue_full")
+                return False
+            # 큐가 넘치면 바로 파일에 추가 (fsync는 백그라운드 스필에서만 - 이벤트 루프를 오래 막지 않음)
+            try:
+                self._write_spill(rows, sync=False)
+            except OSError as e:
+                logger.error(f"채팅 턴 스필 실패: {e}")
+                self._drop(len(rows), "spill_failed")
+                return False
+            return True
+
+        self.queue.extend(rows)
+        TURN_WRITE_QUEUE_DEPTH.set(len(self.queue))
+        if len(self.queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def pending(self, conversation_id: int) -> list[dict]:
+        """저장 중인 배치와 큐에서 아직 저장되지 않은 대화 메시지 (DB에서 컨텍스트를 다시 만들 때 뒤에 붙임)
+
+        스필 파일의 행은 포함하지 않는다 (settled()로 확인).
+        """
+        return [
+            {"role": row["role"], "content": row["content"]}
+            for row in (*self._in_flight, *self.queue)
+            if row["conversation_id"] == conversation_id
+        ]
+
+    def settled(self, conversation_id: int) -> bool:
+        """대화의 미저장 메시지가 모두 pending()에 있는지 (스필 파일에 남은 행이 있을 수 있으면 False)"""
+        return not self._spill_backlog_unknown and conversation_id not in self._spilled_conversations
+
+    def _drop(self, count: int, reason: str):
+        self.dropped += count
+        TURN_WRITE_DROPPED.labels(reason=reason).inc(count)
+
+    def _db_available(self) -> bool:
+        return time.monotonic() >= self._db_retry_at
+
+    def _db_backoff(self):
+        """저장 실패/지연 시 DB 재시도를 지수적으로 미룸"""
+        self._db_failures += 1
+        delay = min(DB_BACKOFF_MAX, self.flush_interval * 2 ** self._db_failures)
+        self._db_retry_at = time.monotonic() + delay
+
+    async def _insert(self, batch: list[dict]) -> int:
+        """소유권 확인 1쿼리 + 다중 행 INSERT 1쿼리 + 대화 updated_at 갱신 1쿼리"""
+        async with AsyncSessionLocal() as session:
+            conversation_ids = {row["conversation_id"] for row in batch}
+            owners = dict(
+                (
+                    await session.execute(
+                        select(Conversation.id, Conversation.user_id).where(Conversation.id.in_(conversation_ids))
+                    )
+                ).all()
+            )
+            rows = [
+                {column: row[column] for column in MESSAGE_COLUMNS}
+                for row in batch
+                if owners.get(row["conversation_id"]) == row["user_id"]
+            ]
+            if len(rows) < len(batch):
+                logger.warning(f"소유하지 않은 대화의 채팅 턴 {len(batch) - len(rows)}건 제외")
+                self._drop(len(batch) - len(rows), "not_owned")
+            if not rows:
+                return 0
+            await session.execute(insert(Message), rows)
+            await session.execute(
+                update(Conversation)
+                .where(Conversation.id.in_({row["conversation_id"] for row in rows}))
+                .values(updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            return len(rows)
+
+    async def _flush(self, batch: list[dict], target: str = "db") -> bool:
+        started_at = time.perf_counter()
+        try:
+            written = await asyncio.wait_for(self._insert(batch), timeout=self.flush_timeout)
+        except Exception as e:
+            TURN_WRITE_FLUSH_DURATION.labels(target=target, result="error").observe(time.perf_counter() - started_at)
+            logger.warning(f"채팅 턴 {len(batch)}건 저장 실패 ({target}): {e!r}")
+            self._db_backoff()
+            return False
+
+        elapsed = time.perf_counter() - started_at
+        TURN_WRITE_FLUSH_DURATION.labels(target=target, result="success").observe(elapsed)
+        TURN_WRITE_BATCH_SIZE.labels(target=target).observe(len(batch))
+        self.last_flush_ms = round(elapsed * 1000, 1)
+        self.commits += 1
+        if target == "replay":
+            self.replayed += written
+        else:
+            self.written += written
+        if elapsed > self.slow_flush and self.spill_enabled:
+            # 성공했지만 느림 - 잠시 새 배치는 파일로 우회해 큐가 쌓이지 않게 함
+            logger.warning(f"채팅 턴 저장 지연: {elapsed:.2f}초 ({len(batch)}건)")
+            self._db_backoff()
+        else:
+            self._db_failures = 0
+        return True
+
+    def _write_spill(self, rows: list[dict], sync: bool = True):
+        lines = "".join(_spill_line(row) for row in rows)
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._spilled_conversations.update(row["conversation_id"] for row in rows)
+        self.spilled += len(rows)
+
+    async def _spill(self, batch: list[dict]):
+        started_at = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._write_spill, batch)
+        except OSError as e:
+            TURN_WRITE_FLUSH_DURATION.labels(target="spill", result="error").observe(time.perf_counter() - started_at)
+            logger.error(f"채팅 턴 스필 실패: {e}")
+            self._drop(len(batch), "spill_failed")
+            return
+        TURN_WRITE_FLUSH_DURATION.labels(target="spill", result="success").observe(time.perf_counter() - started_at)
+        TURN_WRITE_BATCH_SIZE.labels(target="spill").observe(len(batch))
+
+    @staticmethod
+    def _read_spill(path: str) -> list[dict]:
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    row["created_at"] = datetime.fromisoformat(row["created_at"])
+                except (ValueError, KeyError):
+                    continue  # 기록 중 중단된 마지막 줄 등
+                rows.append(row)
+        return rows
+
+    def _rewrite_spill(self, path: str, rows: list[dict]):
+        """재적재하지 못한 나머지 행만 남김"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(_spill_line(row) for row in rows))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    async def _replay_spill(self):
+        """스필 파일을 DB에 다시 적재 (재적재 중 새 스필은 원래 경로에 계속 추가됨)"""
+        if not os.path.exists(self.replay_path):
+            if not os.path.exists(self.spill_path):
+                return
+            with self._spill_lock:
+                os.replace(self.spill_path, self.replay_path)
+
+        rows = await asyncio.to_thread(self._read_spill, self.replay_path)
+        if rows:
+            logger.info(f"스필된 채팅 턴 {len(rows)}건 재적재 시작")
+        for start in range(0, len(rows), self.batch_size):
+            if not await self._flush(rows[start:start + self.batch_size], target="replay"):
+                await asyncio.to_thread(self._rewrite_spill, self.replay_path, rows[start:])
+                return
+        os.remove(self.replay_path)
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                # 재적재 중 새로 스필된 행이 없으면 모든 대화가 DB와 큐만으로 복원 가능
+                self._spilled_conversations.clear()
+                self._spill_backlog_unknown = False
+
+    def _take_batch(self) -> list[dict]:
+        batch = [self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))]
+        TURN_WRITE_QUEUE_DEPTH.set(len(self.queue))
+        return batch
+
+    async def _drain(self):
+        """큐의 메시지를 배치 단위로 저장 (DB를 쓸 수 없으면 스필하거나 큐에 남김)"""
+        while self.queue:
+            if not self._db_available():
+                if not self.spill_enabled:
+                    return  # 재시도 시각까지 큐에 보관
+                self._in_flight = self._take_batch()
+                try:
+                    await self._spill(self._in_flight)
+                finally:
+                    self._in_flight = []
+                continue
+
+            batch = self._in_flight = self._take_batch()
+            try:
+                if await self._flush(batch):
+                    continue
+                if self.spill_enabled:
+                    await self._spill(batch)
+                    continue
+            finally:
+                self._in_flight = []
+            # 앞쪽으로 되돌려 순서 유지 (그 사이 큐가 찼다면 넘친 만큼 버림)
+            self.queue.extendleft(reversed(batch))
+            overflow = len(self.queue) - self.queue_size
+            for _ in range(max(overflow, 0)):
+                self.queue.pop()
+            if overflow > 0:
+                self._drop(overflow, "queue_full")
+            TURN_WRITE_QUEUE_DEPTH.set(len(self.queue))
+            return
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._drain()
+                if self.spill_enabled and not self.queue and self._db_available():
+                    await self._replay_spill()
+            except Exception as e:
+                logger.error(f"채팅 턴 저장 루프 오류: {e}")
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            if os.path.exists(self.spill_path) or os.path.exists(self.replay_path):
+                self._spill_backlog_unknown = True
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """백그라운드 작업을 멈추고 남은 메시지를 마지막으로 저장 (실패하면 스필)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._db_retry_at = 0.0
+        await self._drain()
+        if self.queue:
+            logger.error(f"종료 시 저장하지 못한 채팅 턴 {len(self.queue)}건 버림")
+            self._drop(len(self.queue), "queue_full")
+            self.queue.clear()
+
+    def stats(self) -> dict:
+        spill_bytes = 0
+        for path in (self.spill_path, self.replay_path):
+            try:
+                spill_bytes += os.path.getsize(path)
+            except OSError:
+                pass
+        return {
+            "enabled": self.enabled,
+            "durability": self.durability,
+            "queue_depth": len(self.queue),
+            "submitted": self.submitted,
+            "written": self.written,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "last_flush_ms": self.last_flush_ms,
+            "db_retry_in_s": round(max(0.0, self._db_retry_at - time.monotonic()), 1),
+            "spill_pending_bytes": spill_bytes,
+        }
+
+
+# 전역 채팅 턴 저장 인스턴스
+turn_writer = TurnWriter()
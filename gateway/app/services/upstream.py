@@ -0,0 +1,115 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 지원 패키지(h2) 설치 여부 확인"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class UpstreamClient:
+    """vLLM 업스트림 공용 HTTP 클라이언트 (프로세스당 1개, keep-alive 커넥션 풀)"""
+
+    def __init__(
+        self,
+        max_connections: int = settings.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections: int = settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = settings.UPSTREAM_KEEPALIVE_EXPIRY,
+        http2: bool = settings.UPSTREAM_HTTP2,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            settings.UPSTREAM_READ_TIMEOUT,
+            connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+            pool=settings.UPSTREAM_POOL_TIMEOUT,
+        )
+        self.http2 = http2
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = self.http2
+        if http2 and not _http2_available():
+            logger.warning("h2 패키지가 없어 HTTP/1.1 keep-alive로 동작합니다")
+            http2 = False
+
+        headers = {}
+        if settings.VLLM_API_KEY:
+            headers["Authorization"] = f"Bearer {settings.VLLM_API_KEY}"
+
+        logger.info(
+            f"업스트림 커넥션 풀 생성: max={self.limits.max_connections}, "
+            f"keepalive={self.limits.max_keepalive_connections}, http2={http2}"
+        )
+        return httpx.AsyncClient(
+            limits=self.limits,
+            timeout=self.timeout,
+            http2=http2,
+            headers=headers,
+        )
+
+    async def start(self):
+        """커넥션 풀 생성 (main.lifespan에서 호출)"""
+        if self._client is None:
+            self._client = self._build_client()
+
+    async def close(self):
+        """커넥션 풀 종료"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("업스트림 커넥션 풀 종료")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """공용 httpx 클라이언트 (lifespan 밖에서 호출되면 지연 생성)"""
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    def pool_stats(self) -> dict:
+        """커넥션 풀 통계: 사용 중 / 유휴 / 대기 중인 요청 수"""
+        stats = {
+            "started": self._client is not None,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "in_use": 0,
+            "idle": 0,
+            "waiting": 0,
+        }
+        if self._client is None:
+            return stats
+
+        # httpx는 풀 상태를 공개 API로 노출하지 않으므로 httpcore 풀을 직접 조회
+        pool = getattr(self._client._transport, "_pool", None)
+        if pool is None:
+            return stats
+
+        for connection in getattr(pool, "connections", []):
+            if connection.is_idle():
+                stats["idle"] += 1
+            else:
+                stats["in_use"] += 1
+
+        for pool_request in getattr(pool, "_requests", []):
+            if getattr(pool_request, "connection", None) is None:
+                stats["waiting"] += 1
+
+        return stats
+
+
+# 전역 업스트림 클라이언트 인스턴스
+upstream_client = UpstreamClient()
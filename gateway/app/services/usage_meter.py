@@ -0,0 +1,375 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import AsyncSessionLocal, engine
+from ..metrics import USAGE_FLUSH_DURATION, USAGE_QUOTA_REJECTED
+from ..models import UsageDaily
+from ..redis_client import RedisBreaker, get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "usage"
+PENDING_KEY = f"{REDIS_KEY_PREFIX}:pending"  # hash: "일|사용자|모델|필드" -> 아직 반영하지 않은 증분
+FLUSHING_KEY = f"{REDIS_KEY_PREFIX}:flushing"  # 반영 중인 증분 (실패하면 남아 다음 주기에 재시도)
+FLUSH_LOCK_KEY = f"{REDIS_KEY_PREFIX}:flush_lock"
+FIELDS = ("prompt_tokens", "completion_tokens", "requests")
+DAY_KEY_TTL = 2 * 86400
+
+# 반영할 증분을 flushing 키로 옮기고 내용 반환 (이전 반영이 실패해 남아 있으면 그것부터)
+# 다른 워커가 반영 중이면 false(None)
+TAKE_SCRIPT = """
+if not redis.call('SET', KEYS[3], ARGV[1], 'NX', 'EX', ARGV[2]) then
+  return false
+end
+if redis.call('EXISTS', KEYS[2]) == 0 then
+  if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {}
+  end
+  redis.call('RENAME', KEYS[1], KEYS[2])
+end
+return redis.call('HGETALL', KEYS[2])
+"""
+
+# 반영이 커밋되었으면 flushing 키 삭제, 잠금 해제 (자신이 잡은 잠금만)
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[2]) == ARGV[1] then
+  if ARGV[2] == '1' then
+    redis.call('DEL', KEYS[1])
+  end
+  redis.call('DEL', KEYS[2])
+end
+return 0
+"""
+
+
+def _day_key(day: date, user_id: int) -> str:
+    """쿼터 검사용 사용자 하루 합계 hash (필드: tokens, {모델}:tokens)"""
+    return f"{REDIS_KEY_PREFIX}:{day:%Y%m%d}:{user_id}"
+
+
+def _seconds_until_tomorrow(now: datetime) -> float:
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    return (tomorrow - now).total_seconds()
+
+
+@dataclass
+class QuotaDecision:
+    """하루 토큰 한도 판정 결과"""
+    allowed: bool
+    used: int = 0
+    limit: int = 0
+    scope: str = "user"  # user | model
+    retry_after: float = 0.0
+
+
+class UsageMeter:
+    """사용자 × 모델 × 일(UTC) 토큰 사용량 집계와 하루 한도 검사
+
+    응답 완료 시 Redis에 원자적으로 가산하고(MULTI 한 번), 백그라운드 작업이 주기마다
+    미반영 증분을 usage_daily에 배치 UPSERT한다. 반영은 한 워커만 하며 커밋 후에 증분을 지우므로
+    DB 장애 시에도 잃지 않는다 (커밋 직후 Redis 장애면 한 주기분이 두 번 더해질 수 있음).
+    한도 검사는 Redis HMGET 한 번이고, 결과는 quota_cache_ttl 동안 프로세스 내에 두고
+    이 프로세스의 가산을 반영해 쓴다. 한도는 응답 완료 후 가산되므로 진행 중인 요청만큼 넘을 수 있다.
+    Redis 장애 중에는 증분을 메모리에 모아 DB에 직접 반영하고, 한도 검사는 캐시가 없으면 통과시킨다.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = settings.USAGE_FLUSH_INTERVAL,
+        batch_size: int = settings.USAGE_FLUSH_BATCH_SIZE,
+        flush_timeout: float = settings.USAGE_FLUSH_TIMEOUT,
+        daily_quota: int = settings.USAGE_DAILY_TOKEN_QUOTA,
+        model_quotas: Optional[dict[str, int]] = None,
+        quota_cache_ttl: float = settings.USAGE_QUOTA_CACHE_TTL,
+    ):
+        self.enabled = settings.USAGE_METER_ENABLED
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.flush_timeout = flush_timeout
+        self.daily_quota = daily_quota
+        self.model_quotas = model_quotas if model_quotas is not None else dict(settings.USAGE_DAILY_MODEL_TOKEN_QUOTAS)
+        self.quota_cache_ttl = quota_cache_ttl
+        self._breaker = RedisBreaker()
+        self._scripts: dict = {}
+        self._scripts_client = None
+        # (일, 사용자 ID) -> (조회 시각, {필드: 토큰 수})
+        self._quota_cache: dict[tuple[date, int], tuple[float, dict[str, int]]] = {}
+        # Redis에 쓰지 못한 증분 (일, 사용자 ID, 모델, 필드) -> 값
+        self._local_pending: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self.last_flush_ms: Optional[float] = None
+        self.counters = {
+            "recorded": 0,
+            "flushed_rows": 0,
+            "flush_failures": 0,
+            "quota_checks": 0,
+            "quota_cache_hits": 0,
+            "quota_rejected": 0,
+            "local_fallback": 0,
+        }
+
+    @property
+    def quotas_enabled(self) -> bool:
+        return self.daily_quota > 0 or any(limit > 0 for limit in self.model_quotas.values())
+
+    def _script(self, name: str, source: str):
+        client = get_redis()
+        if client is not self._scripts_client:
+            self._scripts = {}
+            self._scripts_client = client
+        if name not in self._scripts:
+            self._scripts[name] = client.register_script(source)
+        return self._scripts[name]
+
+    def _apply_to_cache(self, day: date, user_id: int, model: str, tokens: int):
+        cached = self._quota_cache.get((day, user_id))
+        if cached is not None:
+            values = cached[1]
+            values["tokens"] = values.get("tokens", 0) + tokens
+            values[f"{model}:tokens"] = values.get(f"{model}:tokens", 0) + tokens
+
+    async def record(self, user_id: Optional[int], model: str, prompt_tokens: int, completion_tokens: int):
+        """요청 1건의 토큰 사용량 가산 (등록되지 않은 사용자는 집계하지 않음)"""
+        if not self.enabled or user_id is None:
+            return
+        prompt_tokens, completion_tokens = max(int(prompt_tokens or 0), 0), max(int(completion_tokens or 0), 0)
+        tokens = prompt_tokens + completion_tokens
+        day = datetime.now(timezone.utc).date()
+        increments = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "requests": 1}
+        self.counters["recorded"] += 1
+        self._apply_to_cache(day, user_id, model, tokens)
+
+        if self._breaker.available:
+            try:
+                async with get_redis().pipeline(transaction=True) as pipe:
+                    day_key = _day_key(day, user_id)
+                    pipe.hincrby(day_key, "tokens", tokens)
+                    pipe.hincrby(day_key, f"{model}:tokens", tokens)
+                    pipe.expire(day_key, DAY_KEY_TTL)
+                    for field, value in increments.items():
+                        if value:
+                            pipe.hincrby(PENDING_KEY, f"{day:%Y%m%d}|{user_id}|{model}|{field}", value)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                self._breaker.record_failure(e)
+        self.counters["local_fallback"] += 1
+        for field, value in increments.items():
+            self._local_pending[(day, user_id, model, field)] += value
+
+    async def _usage_today(self, day: date, user_id: int, model: str) -> Optional[dict[str, int]]:
+        """쿼터 검사용 오늘 사용량 (캐시 → Redis HMGET 1회, 알 수 없으면 None)"""
+        cached = self._quota_cache.get((day, user_id))
+        if cached is not None and time.monotonic() - cached[0] < self.quota_cache_ttl and f"{model}:tokens" in cached[1]:
+            self.counters["quota_cache_hits"] += 1
+            return cached[1]
+        if not self._breaker.available:
+            return cached[1] if cached is not None else None
+        try:
+            total, model_total = await get_redis().hmget(_day_key(day, user_id), "tokens", f"{model}:tokens")
+        except Exception as e:
+            self._breaker.record_failure(e)
+            return cached[1] if cached is not None else None
+        values = dict(cached[1]) if cached is not None else {}
+        values["tokens"] = int(total or 0)
+        values[f"{model}:tokens"] = int(model_total or 0)
+        if len(self._quota_cache) > 10000:
+            self._quota_cache = {key: value for key, value in self._quota_cache.items() if key[0] == day}
+        self._quota_cache[(day, user_id)] = (time.monotonic(), values)
+        return values
+
+    async def check(self, user_id: Optional[int], model: str) -> QuotaDecision:
+        """요청 전에 하루 토큰 한도 검사 (한도가 없거나 사용자를 모르면 통과)"""
+        if not self.enabled or user_id is None or not self.quotas_enabled:
+            return QuotaDecision(True)
+        self.counters["quota_checks"] += 1
+        now = datetime.now(timezone.utc)
+        usage = await self._usage_today(now.date(), user_id, model)
+        if usage is None:
+            return QuotaDecision(True)
+
+        retry_after = _seconds_until_tomorrow(now)
+        model_limit = self.model_quotas.get(model, 0)
+        if model_limit > 0 and usage.get(f"{model}:tokens", 0) >= model_limit:
+            decision = QuotaDecision(False, usage[f"{model}:tokens"], model_limit, "model", retry_after)
+        elif self.daily_quota > 0 and usage.get("tokens", 0) >= self.daily_quota:
+            decision = QuotaDecision(False, usage["tokens"], self.daily_quota, "user", retry_after)
+        else:
+            return QuotaDecision(True, usage.get("tokens", 0), self.daily_quota)
+        self.counters["quota_rejected"] += 1
+        USAGE_QUOTA_REJECTED.labels(profile=model).inc()
+        return decision
+
+    async def today(self, user_id: int) -> dict:
+        """오늘(UTC) 사용량 - Redis 실시간 합계 (아직 usage_daily에 반영되지 않은 것 포함)"""
+        day = datetime.now(timezone.utc).date()
+        try:
+            values = await get_redis().hgetall(_day_key(day, user_id))
+        except Exception as e:
+            self._breaker.record_failure(e)
+            cached = self._quota_cache.get((day, user_id))
+            values = cached[1] if cached is not None else {}
+        values = {(key.decode() if isinstance(key, bytes) else key): int(value) for key, value in values.items()}
+        return {
+            "day": day,
+            "tokens": values.pop("tokens", 0),
+            "models": {key.rsplit(":", 1)[0]: value for key, value in values.items()},
+        }
+
+    def quota_limits(self) -> dict:
+        return {"daily_tokens": self.daily_quota or None, "model_daily_tokens": self.model_quotas}
+
+    @staticmethod
+    async def history(session: AsyncSession, user_id: int, days: int) -> list[dict]:
+        """usage_daily의 최근 일별 × 모델별 사용량"""
+        since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        rows = await session.scalars(
+            select(UsageDaily)
+            .where(UsageDaily.user_id == user_id, UsageDaily.day >= since)
+            .order_by(UsageDaily.day.desc(), UsageDaily.model)
+        )
+        return [
+            {
+                "day": row.day,
+                "model": row.model,
+                "prompt_tokens": row.prompt_tokens,
+                "completion_tokens": row.completion_tokens,
+                "requests": row.requests,
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _rows(increments: Counter) -> list[dict]:
+        """(일, 사용자, 모델, 필드) 증분을 usage_daily 행으로 묶음"""
+        rows: dict[tuple, dict] = {}
+        for (day, user_id, model, field), value in increments.items():
+            row = rows.setdefault(
+                (day, user_id, model),
+                {"day": day, "user_id": user_id, "model": model[:100], **{name: 0 for name in FIELDS}},
+            )
+            row[field] += value
+        return list(rows.values())
+
+    async def _upsert(self, rows: list[dict]):
+        if engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert  # 개발용 SQLite
+        statement = insert(UsageDaily)
+        statement = statement.on_conflict_do_update(
+            index_elements=[UsageDaily.day, UsageDaily.user_id, UsageDaily.model],
+            set_={
+                **{name: getattr(UsageDaily, name) + getattr(statement.excluded, name) for name in FIELDS},
+                "updated_at": func.now(),
+            },
+        )
+        async with AsyncSessionLocal() as session:
+            for start in range(0, len(rows), self.batch_size):
+                await session.execute(statement, rows[start:start + self.batch_size])
+            await session.commit()
+
+    async def _take_redis(self) -> tuple[Optional[str], Counter]:
+        """Redis 미반영 증분 가져오기 → (잠금 토큰, 증분) - 다른 워커가 반영 중이거나 Redis 장애면 (None, 빈 값)"""
+        increments: Counter = Counter()
+        if not self._breaker.available:
+            return None, increments
+        token = uuid.uuid4().hex
+        try:
+            entries = await self._script("take", TAKE_SCRIPT)(
+                keys=[PENDING_KEY, FLUSHING_KEY, FLUSH_LOCK_KEY],
+                args=[token, max(int(self.flush_timeout * 3), 30)],
+            )
+        except Exception as e:
+            self._breaker.record_failure(e)
+            return None, increments
+        if entries is None:
+            return None, increments
+        for field, value in zip(entries[::2], entries[1::2]):
+            field = field.decode() if isinstance(field, bytes) else field
+            try:
+                day, user_id, rest = field.split("|", 2)
+                model, name = rest.rsplit("|", 1)
+                increments[(datetime.strptime(day, "%Y%m%d").date(), int(user_id), model, name)] += int(value)
+            except ValueError:
+                logger.warning(f"토큰 사용량 항목 해석 실패, 건너뜀: {field}")
+        return token, increments
+
+    async def _release(self, token: str, committed: bool):
+        try:
+            await self._script("release", RELEASE_SCRIPT)(
+                keys=[FLUSHING_KEY, FLUSH_LOCK_KEY],
+                args=[token, "1" if committed else "0"],
+            )
+        except Exception as e:
+            self._breaker.record_failure(e)
+
+    async def flush(self):
+        """미반영 증분(Redis + 로컬)을 usage_daily에 가산"""
+        local, self._local_pending = self._local_pending, Counter()
+        token, increments = await self._take_redis()
+        increments.update(local)
+        rows = self._rows(increments)
+        committed = False
+        started_at = time.perf_counter()
+        try:
+            if rows:
+                await asyncio.wait_for(self._upsert(rows), timeout=self.flush_timeout)
+            committed = True
+        except Exception as e:
+            USAGE_FLUSH_DURATION.labels(result="error").observe(time.perf_counter() - started_at)
+            logger.warning(f"토큰 사용량 {len(rows)}행 반영 실패, 다음 주기에 재시도: {e!r}")
+            self.counters["flush_failures"] += 1
+            self._local_pending.update(local)
+        finally:
+            if token is not None:
+                await self._release(token, committed)
+        if committed and rows:
+            elapsed = time.perf_counter() - started_at
+            USAGE_FLUSH_DURATION.labels(result="success").observe(elapsed)
+            self.last_flush_ms = round(elapsed * 1000, 1)
+            self.counters["flushed_rows"] += len(rows)
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"토큰 사용량 반영 루프 오류: {e}")
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """반영 작업을 멈추고 남은 증분을 마지막으로 반영"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.enabled:
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "quotas": self.quota_limits(),
+            "local_pending": len(self._local_pending),
+            "last_flush_ms": self.last_flush_ms,
+            **self.counters,
+        }
+
+
+# 전역 토큰 사용량 집계 인스턴스
+usage_meter = UsageMeter()
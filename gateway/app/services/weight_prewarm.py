@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def resolve_snapshot(model_id: str, cache_dir: str = settings.MODEL_PREWARM_HF_CACHE) -> Optional[Path]:
+    """로컬 HF 캐시(또는 로컬 경로)에서 모델 스냅샷 디렉터리 조회 (캐시에 없으면 None)"""
+    if os.path.isdir(model_id):
+        return Path(model_id)
+    repo = Path(cache_dir) / f"models--{model_id.replace('/', '--')}"
+    snapshots = repo / "snapshots"
+    if not snapshots.is_dir():
+        return None
+    ref = repo / "refs" / "main"
+    revision = ref.read_text().strip() if ref.is_file() else ""
+    if revision and (snapshots / revision).is_dir():
+        return snapshots / revision
+    candidates = [path for path in snapshots.iterdir() if path.is_dir()]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda path: path.stat().st_mtime)
+
+
+def resolve_weight_files(model_id: str, cache_dir: str = settings.MODEL_PREWARM_HF_CACHE) -> list[Path]:
+    """로컬 HF 캐시(또는 로컬 경로)에서 모델 가중치 파일 목록 조회 (캐시에 없으면 빈 목록)"""
+    snapshot = resolve_snapshot(model_id, cache_dir)
+    if snapshot is None:
+        return []
+
+    files = sorted(snapshot.glob("*.safetensors")) or sorted(snapshot.glob("pytorch_model*.bin"))
+    # 스냅샷의 파일은 blobs로의 심볼릭 링크 - 같은 blob은 한 번만 읽음
+    unique: dict[str, Path] = {}
+    for path in files:
+        real = os.path.realpath(path)
+        if os.path.isfile(real):
+            unique.setdefault(real, Path(real))
+    return list(unique.values())
+
+
+def available_memory_bytes() -> Optional[int]:
+    """/proc/meminfo의 MemAvailable (리눅스가 아니면 None)"""
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class BandwidthLimiter:
+    """여러 읽기 스레드가 공유하는 초당 바이트 제한 (0이면 무제한)"""
+
+    def __init__(self, bytes_per_second: float):
+        self.bytes_per_second = bytes_per_second
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes: int):
+        if self.bytes_per_second <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next_at, now)
+            self._next_at = start + nbytes / self.bytes_per_second
+        if start > now:
+            time.sleep(start - now)
+
+
+@dataclass
+class PrewarmJob:
+    """프로파일 하나의 가중치 프리웜 진행 상황"""
+    profile_id: str
+    model_id: str
+    files: list[Path] = field(default_factory=list)
+    bytes_total: int = 0
+    bytes_done: int = 0
+    status: str = "pending"  # pending, running, completed, skipped, cancelled, failed
+    message: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    cancelled: threading.Event = field(default_factory=threading.Event, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_progress(self, nbytes: int):
+        with self._lock:
+            self.bytes_done += nbytes
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ("pending", "running")
+
+    def snapshot(self) -> dict:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        rate = self.bytes_done / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, self.bytes_total - self.bytes_done)
+        return {
+            "profile_id": self.profile_id,
+            "model_id": self.model_id,
+            "status": self.status,
+            "message": self.message,
+            "files": len(self.files),
+            "bytes_total": self.bytes_total,
+            "bytes_done": self.bytes_done,
+            "progress": round(self.bytes_done / self.bytes_total, 3) if self.bytes_total else None,
+            "mb_per_second": round(rate / (1024 * 1024), 1),
+            "eta_s": round(remaining / rate, 1) if self.status == "running" and rate > 0 else None,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class WeightPrewarmer:
+    """모델 가중치 파일을 미리 읽어 OS 페이지 캐시에 올림
+
+    HF 캐시 볼륨은 vLLM 컨테이너와 같은 호스트 파일이므로 게이트웨이에서 읽어 두면
+    vLLM 기동 시 디스크 대신 페이지 캐시에서 읽는다. 파일 단위로 병렬로 읽고
+    전체 읽기 대역폭은 MODEL_PREWARM_MAX_MB_PER_SEC로 제한한다.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.MODEL_PREWARM_WORKERS,
+        max_mb_per_second: float = settings.MODEL_PREWARM_MAX_MB_PER_SEC,
+    ):
+        self.workers = max(1, workers)
+        self.limiter = BandwidthLimiter(max_mb_per_second * 1024 * 1024)
+        self.jobs: dict[str, PrewarmJob] = {}
+
+    def start(self, profile_id: str, model_id: str) -> PrewarmJob:
+        """프리웜 시작 (같은 프로파일이 이미 진행 중이면 그 작업을 반환)"""
+        job = self.jobs.get(profile_id)
+        if job is not None and not job.done:
+            return job
+        job = PrewarmJob(profile_id=profile_id, model_id=model_id)
+        self.jobs[profile_id] = job
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    async def wait(self, job: PrewarmJob, timeout: float) -> PrewarmJob:
+        """작업 완료 대기 (timeout이 지나면 취소하고 반환)"""
+        try:
+            await asyncio.wait_for(asyncio.shield(job.task), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.cancel(job)
+            await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    def cancel(self, job: PrewarmJob):
+        job.cancelled.set()
+
+    async def _run(self, job: PrewarmJob):
+        try:
+            job.files = await asyncio.to_thread(resolve_weight_files, job.model_id)
+            job.bytes_total = sum(path.stat().st_size for path in job.files)
+            if not job.files:
+                self._finish(job, "skipped", "로컬 HF 캐시에 가중치 파일 없음 (vLLM이 다운로드)")
+                return
+            available = available_memory_bytes()
+            if available is not None and job.bytes_total > available:
+                # 페이지 캐시에 다 들어가지 않으면 앞부분이 밀려나 효과가 없음
+                self._finish(
+                    job, "skipped",
+                    f"가중치 {job.bytes_total / 1024 ** 3:.1f}GB가 가용 메모리 {available / 1024 ** 3:.1f}GB보다 큼",
+                )
+                return
+
+            job.status = "running"
+            logger.info(
+                f"가중치 프리웜 시작: {job.profile_id} ({len(job.files)}개 파일, {job.bytes_total / 1024 ** 3:.1f}GB)"
+            )
+            semaphore = asyncio.Semaphore(self.workers)
+
+            async def read(path: Path):
+                async with semaphore:
+                    await asyncio.to_thread(self._read_file, job, path)
+
+            await asyncio.gather(*(read(path) for path in job.files))
+            if job.cancelled.is_set():
+                self._finish(job, "cancelled", "프리웜 중단")
+            else:
+                self._finish(job, "completed")
+        except Exception as e:
+            logger.error(f"가중치 프리웜 실패 ({job.profile_id}): {e}")
+            self._finish(job, "failed", str(e))
+
+    def _read_file(self, job: PrewarmJob, path: Path):
+        """파일을 순차로 읽어 버림 (페이지 캐시에만 남김)"""
+        buffer = bytearray(READ_CHUNK_BYTES)
+        with open(path, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while not job.cancelled.is_set():
+                nbytes = f.readinto(buffer)
+                if not nbytes:
+                    break
+                job.add_progress(nbytes)
+                self.limiter.consume(nbytes)
+
+    def _finish(self, job: PrewarmJob, status: str, message: Optional[str] = None):
+        job.status = status
+        job.message = message
+        job.finished_at = time.time()
+        logger.info(
+            f"가중치 프리웜 {status}: {job.profile_id} "
+            f"({job.bytes_done / 1024 ** 3:.1f}/{job.bytes_total / 1024 ** 3:.1f}GB, "
+            f"{job.finished_at - job.started_at:.1f}초){f' - {message}' if message else ''}"
+        )
+
+    async def stop(self):
+        for job in self.jobs.values():
+            if not job.done:
+                self.cancel(job)
+        await asyncio.gather(*(job.task for job in self.jobs.values() if job.task), return_exceptions=True)
+
+    def stats(self) -> list[dict]:
+        return [job.snapshot() for job in self.jobs.values()]
+
+
+# 전역 가중치 프리웜 인스턴스
+weight_prewarmer = WeightPrewarmer()
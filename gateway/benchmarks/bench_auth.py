@@ -0,0 +1,67 @@
+"""
+인증 경로 요청당 비용 마이크로 벤치마크
+
+토큰 캐시 도입 전(매 요청 jwt.decode 서명 검증)과 도입 후(검증된 클레임 캐시 적중)의
+요청당 verify_token 처리 시간을 비교한다. 캐시 미스 경로는 검증 비용에 더해
+Redis 폐기 목록 조회 1회가 추가되므로 여기서는 적중 경로만 측정한다.
+
+실행: cd gateway && python -m benchmarks.bench_auth [반복 횟수]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import timedelta
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.routers.auth import _decode_claims, create_access_token, verify_token
+from app.services.token_cache import token_cache, token_digest
+
+
+def legacy_verify(credentials: HTTPAuthorizationCredentials) -> str:
+    """비교 기준: 캐시 없이 매번 서명 검증하던 이전 verify_token"""
+    claims = _decode_claims(credentials.credentials)
+    return claims.get("sub")
+
+
+async def measure_async(func, credentials, iterations: int) -> float:
+    for _ in range(min(200, iterations)):
+        await func(credentials)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func(credentials)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def measure_sync(func, credentials, iterations: int) -> float:
+    for _ in range(min(200, iterations)):
+        func(credentials)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(credentials)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations: int):
+    token = create_access_token({"sub": "admin"}, expires_delta=timedelta(minutes=30))
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    # 첫 검증 결과를 미리 넣어 두고 적중 경로만 측정 (Redis 불필요)
+    token_cache.put(token_digest(token), _decode_claims(token))
+
+    legacy_us = measure_sync(legacy_verify, credentials, iterations)
+    cached_us = await measure_async(verify_token, credentials, iterations)
+
+    print(f"iterations={iterations}")
+    print(f"{'variant':<28}{'us/req':>10}")
+    print(f"{'jwt.decode every request':<28}{legacy_us:>10.1f}")
+    print(f"{'verified-claims cache hit':<28}{cached_us:>10.1f}")
+    print(f"cache stats: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,117 @@
+"""
+서버 대화 컨텍스트 턴당 비용 벤치마크 (로컬 Redis 필요)
+
+긴 대화(기본 100턴)를 진행하면서 턴마다 두 방식의 게이트웨이 측 비용을 비교한다.
+- full: 클라이언트가 매 턴 전체 이력을 messages로 전송 (턴이 끝나면 캐시 항목 제거)
+- server: 클라이언트는 conversation_id와 새 message만 전송, 게이트웨이가 Redis 컨텍스트로 프롬프트 복원 후 갱신
+
+측정 항목 (10, 50턴과 마지막 턴)
+- client_bytes: 클라이언트 → 게이트웨이 요청 본문 크기
+- redis_bytes: 게이트웨이 ↔ Redis 컨텍스트 전송량 (조회 + 갱신)
+- cpu_us: 요청 본문 파싱 + 프롬프트 구성 + 업스트림 본문 직렬화 + 캐시 호출의 프로세스 CPU 시간
+두 방식 모두 vLLM에 보내는 프롬프트는 같도록 full도 최근 CONTEXT_CACHE_MAX_MESSAGES건만 보낸다.
+
+REDIS_URL의 데이터베이스에 ctx:* 키를 쓰므로 전용 DB 번호를 쓰는 것이 좋다 (끝나면 벤치마크 대화 항목은 제거).
+
+실행: cd gateway && REDIS_URL=redis://localhost:6379/15 python -m benchmarks.bench_context [턴 수] [반복 횟수]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from pydantic import TypeAdapter
+
+from app.redis_client import close_redis
+from app.services.context_cache import ContextCache, ConversationContext
+
+CONVERSATION_ID = 900_000_001
+USER_ID = 1
+SYSTEM_PROMPT = "당신은 친절한 한국어 어시스턴트입니다. " * 10
+USER_MESSAGE = "이전 답변을 바탕으로 조금 더 자세히 설명해 주세요. " * 6  # ~200자
+ASSISTANT_MESSAGE = "자세히 설명드리면 다음과 같습니다. " * 60  # ~1200자
+REPORT_TURNS = (10, 50)
+
+# FastAPI가 Dict[str, Any] 본문을 검증하는 경로와 같은 비용
+_body_adapter = TypeAdapter(Dict[str, Any])
+
+
+def parse_body(body: bytes) -> Dict[str, Any]:
+    return _body_adapter.validate_python(json.loads(body))
+
+
+async def full_turn(cache: ContextCache, history: list[dict], message: dict) -> tuple[int, int]:
+    body = json.dumps({
+        "conversation_id": CONVERSATION_ID,
+        "messages": [{"role": "system", "content": SYSTEM_PROMPT}] + history[-cache.max_messages:] + [message],
+        "stream": True,
+    }, ensure_ascii=False).encode()
+    request = parse_body(body)
+    request.pop("conversation_id")
+    json.dumps(request)  # 업스트림 본문
+    await cache.invalidate(CONVERSATION_ID)
+    return len(body), 0
+
+
+async def server_turn(cache: ContextCache, history: list[dict], message: dict) -> tuple[int, int]:
+    body = json.dumps(
+        {"conversation_id": CONVERSATION_ID, "message": message, "stream": True}, ensure_ascii=False
+    ).encode()
+    request = parse_body(body)
+    context = await cache.get(USER_ID, CONVERSATION_ID)
+    read_bytes = len(context.to_bytes())
+    request = {key: value for key, value in request.items() if key != "conversation_id"}
+    request["messages"] = context.prompt(request.pop("message"))
+    json.dumps(request)  # 업스트림 본문
+    updated = context.extended([message, {"role": "assistant", "content": ASSISTANT_MESSAGE}])
+    await cache.store(CONVERSATION_ID, updated)
+    return len(body), read_bytes + len(updated.to_bytes())
+
+
+async def measure(turn_func, cache: ContextCache, history: list[dict], message: dict, repeat: int) -> tuple[int, int, float]:
+    """repeat회 실행한 턴당 평균 CPU 시간(us)과 전송량 (server는 매번 같은 컨텍스트에서 시작)"""
+    snapshot = ConversationContext(USER_ID, SYSTEM_PROMPT, list(history))
+    total = 0.0
+    for _ in range(repeat):
+        await cache.store(CONVERSATION_ID, snapshot)
+        start = time.process_time()
+        client_bytes, redis_bytes = await turn_func(cache, history, message)
+        total += time.process_time() - start
+    return client_bytes, redis_bytes, total / repeat * 1e6
+
+
+async def main(turns: int, repeat: int):
+    cache = ContextCache(enabled=True, max_bytes=64 * 1024 * 1024)
+    history: list[dict] = []
+    rows = []
+    for turn in range(1, turns + 1):
+        message = {"role": "user", "content": f"{turn}. {USER_MESSAGE}"}
+        if turn in REPORT_TURNS or turn == turns:
+            full = await measure(full_turn, cache, history, message, repeat)
+            server = await measure(server_turn, cache, history, message, repeat)
+            rows.append((turn, full, server))
+        history += [message, {"role": "assistant", "content": ASSISTANT_MESSAGE}]
+
+    await cache.invalidate(CONVERSATION_ID)
+    await close_redis()
+    assert cache.counters["misses"] == 0, "Redis에 연결되지 않아 DB 경로로 빠짐"
+
+    print(f"turns={turns} repeat={repeat} max_messages={cache.max_messages}")
+    print(f"{'turn':>6}{'mode':>8}{'client_bytes':>14}{'redis_bytes':>13}{'cpu_us':>10}")
+    for turn, full, server in rows:
+        for mode, (client_bytes, redis_bytes, cpu_us) in (("full", full), ("server", server)):
+            print(f"{turn:>6}{mode:>8}{client_bytes:>14}{redis_bytes:>13}{cpu_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        )
+    )
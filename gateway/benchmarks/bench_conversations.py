@@ -0,0 +1,167 @@
+"""
+대화 저장소 조회/추가 벤치마크 (로컬 PostgreSQL 필요)
+
+사용자 한 명에게 대화 수천~수만 건과 일부 대화에 긴 메시지 이력을 만든 뒤
+- 대화 목록: 키셋 커서 페이지네이션과 OFFSET 페이지네이션의 깊은 페이지 지연 비교
+- 대화 조회: 대화 1건 + 최근 메시지 한 페이지
+- 메시지 추가: 일괄 INSERT
+를 측정하고, 각 작업의 쿼리 수가 페이지 크기와 무관하게 고정인지(N+1 없음) 확인한다.
+
+DATABASE_URL은 scripts/init.sql이 적용된 데이터베이스를 가리켜야 하며,
+벤치마크 사용자(users.id)의 대화는 시작 전과 끝난 뒤 모두 삭제된다.
+
+실행: cd gateway && DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_conversations [대화 수] [사용자 ID]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from sqlalchemy import delete, event, insert, select
+
+from app.database import AsyncSessionLocal, engine
+from app.models import Conversation, Message
+from app.services.conversation_repository import ConversationRepository
+
+PAGE_SIZE = 20
+SEED_BATCH = 5000
+LONG_CONVERSATIONS = 10  # 긴 메시지 이력을 가진 대화 수
+MESSAGES_PER_LONG_CONVERSATION = 2000
+
+
+class QueryCounter:
+    """엔진에서 실행된 SQL 문 수 집계"""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def reset(self) -> int:
+        count, self.count = self.count, 0
+        return count
+
+
+async def seed(user_id: int, conversations: int) -> list[int]:
+    """대화와 메시지 생성 (updated_at은 1분 간격으로 분산, 동일 시각도 섞이도록 3건씩 묶음)"""
+    base = datetime.now(timezone.utc) - timedelta(minutes=conversations)
+    ids: list[int] = []
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(Conversation).where(Conversation.user_id == user_id))
+        for start in range(0, conversations, SEED_BATCH):
+            rows = [
+                {
+                    "user_id": user_id,
+                    "title": f"bench {i}",
+                    "model": "bench",
+                    "updated_at": base + timedelta(minutes=i // 3),
+                }
+                for i in range(start, min(start + SEED_BATCH, conversations))
+            ]
+            ids.extend(
+                await session.scalars(
+                    insert(Conversation).returning(Conversation.id, sort_by_parameter_order=True), rows
+                )
+            )
+        for conversation_id in ids[:LONG_CONVERSATIONS]:
+            await session.execute(
+                insert(Message),
+                [
+                    {"conversation_id": conversation_id, "role": "user", "content": f"message {i}"}
+                    for i in range(MESSAGES_PER_LONG_CONVERSATION)
+                ],
+            )
+        await session.commit()
+    return ids
+
+
+async def timed(func, repeat: int = 5) -> float:
+    """repeat회 실행 중 중앙값 (ms)"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+async def main(conversations: int, user_id: int):
+    print(f"seeding {conversations} conversations for user {user_id}...")
+    ids = await seed(user_id, conversations)
+    counter = QueryCounter()
+
+    async with AsyncSessionLocal() as session:
+        repository = ConversationRepository(session)
+
+        # 목록 마지막 근처 페이지까지 커서로 따라간 뒤 그 위치의 조회 지연을 OFFSET과 비교
+        depth = conversations - PAGE_SIZE
+        cursor = None
+        pages = 0
+        counter.reset()
+        while True:
+            page, next_cursor = await repository.list_conversations(user_id, PAGE_SIZE, cursor)
+            pages += 1
+            if next_cursor is None or pages * PAGE_SIZE >= depth:
+                break
+            cursor = next_cursor
+        list_queries = counter.reset()
+        assert list_queries == pages, f"목록 페이지당 1쿼리여야 함: {list_queries} / {pages}"
+
+        def offset_page():
+            return session.execute(
+                select(Conversation)
+                .where(Conversation.user_id == user_id)
+                .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+                .offset(pages * PAGE_SIZE - PAGE_SIZE)
+                .limit(PAGE_SIZE)
+            )
+
+        keyset_ms = await timed(lambda: repository.list_conversations(user_id, PAGE_SIZE, cursor))
+        offset_ms = await timed(offset_page)
+        first_ms = await timed(lambda: repository.list_conversations(user_id, PAGE_SIZE))
+
+        # 긴 이력 대화 조회: 대화 1쿼리 + 메시지 페이지 1쿼리
+        counter.reset()
+
+        async def read():
+            await repository.get_conversation(user_id, ids[0])
+            await repository.list_messages(ids[0], 50)
+
+        read_ms = await timed(read)
+        read_queries = counter.reset() // 5
+        assert read_queries == 2, f"대화 조회는 2쿼리여야 함: {read_queries}"
+
+        # 메시지 100건 일괄 추가: 소유권 확인/updated_at 갱신 1쿼리 + INSERT 1쿼리
+        batch = [{"role": "user", "content": f"appended {i}"} for i in range(100)]
+        counter.reset()
+        append_ms = await timed(lambda: repository.append_messages(user_id, ids[-1], batch), repeat=3)
+        append_queries = counter.reset() // 3
+        assert append_queries == 2, f"메시지 일괄 추가는 2쿼리여야 함: {append_queries}"
+
+        await session.execute(delete(Conversation).where(Conversation.user_id == user_id))
+        await session.commit()
+
+    await engine.dispose()
+
+    print(f"conversations={conversations} page_size={PAGE_SIZE} depth=page {pages}")
+    print(f"{'operation':<36}{'ms':>10}{'queries':>10}")
+    print(f"{'list first page (keyset)':<36}{first_ms:>10.2f}{1:>10}")
+    print(f"{'list deep page (keyset cursor)':<36}{keyset_ms:>10.2f}{1:>10}")
+    print(f"{'list deep page (OFFSET)':<36}{offset_ms:>10.2f}{1:>10}")
+    print(f"{'read conversation + 50 messages':<36}{read_ms:>10.2f}{read_queries:>10}")
+    print(f"{'append 100 messages':<36}{append_ms:>10.2f}{append_queries:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+        )
+    )
@@ -0,0 +1,122 @@
+"""
+미들웨어 요청당 오버헤드 마이크로 벤치마크
+
+BaseHTTPMiddleware 방식(이전 구현)과 순수 ASGI 방식(현재 구현)을 같은 앱에 씌워
+일반 JSON 응답과 SSE 스트리밍 응답 각각의 요청당 처리 시간을 비교한다.
+네트워크/서버 없이 ASGI 앱을 직접 호출하므로 미들웨어 자체 비용만 측정된다.
+
+실행: cd gateway && python -m benchmarks.bench_middleware [반복 횟수]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+import structlog
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.middleware import LoggingMiddleware
+
+# 로그 출력 비용은 측정에서 제외
+structlog.configure(logger_factory=structlog.ReturnLoggerFactory())
+logger = structlog.get_logger()
+
+SSE_CHUNKS = 64
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """비교 기준: 이전 BaseHTTPMiddleware 기반 로깅 미들웨어"""
+
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        logger.info("Request started", method=request.method, path=request.url.path)
+        response = await call_next(request)
+        logger.info(
+            "Request completed",
+            method=request.method,
+            path=request.url.path,
+            status_code=response.status_code,
+            process_time=f"{time.time() - start_time:.3f}s",
+        )
+        return response
+
+
+async def json_endpoint(request):
+    return JSONResponse({"status": "ok"})
+
+
+async def sse_endpoint(request):
+    async def events():
+        for index in range(SSE_CHUNKS):
+            yield f"data: {{\"index\": {index}}}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def build_app(middleware_class=None):
+    app = Starlette(routes=[Route("/json", json_endpoint), Route("/sse", sse_endpoint)])
+    return middleware_class(app) if middleware_class else app
+
+
+async def call(app, path: str):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # 연결 유지 (disconnect 없음)
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app, path: str, iterations: int) -> float:
+    for _ in range(min(200, iterations)):
+        await call(app, path)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call(app, path)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations: int):
+    variants = [
+        ("no middleware", build_app()),
+        ("BaseHTTPMiddleware", build_app(LegacyLoggingMiddleware)),
+        ("pure ASGI", build_app(LoggingMiddleware)),
+    ]
+    print(f"iterations={iterations}, sse_chunks={SSE_CHUNKS}")
+    print(f"{'variant':<22}{'json (us/req)':>16}{'sse (us/req)':>16}")
+    for name, app in variants:
+        json_us = await measure(app, "/json", iterations)
+        sse_us = await measure(app, "/sse", iterations)
+        print(f"{name:<22}{json_us:>16.1f}{sse_us:>16.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
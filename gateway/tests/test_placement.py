@@ -0,0 +1,106 @@
+"""가짜 GPU 목록으로 멀티 모델 배치 계획(plan_placement) 결정 확인"""
+
+import pytest
+
+from app.schemas.model import ModelProfile
+from app.services.placement import GpuDevice, plan_placement
+
+GPU_24GB_MB = 24576
+
+
+def _gpus(*memory_mb: int) -> list[GpuDevice]:
+    return [GpuDevice(index=index, name=f"gpu{index}", memory_total_mb=memory) for index, memory in enumerate(memory_mb)]
+
+
+def _profile(
+    utilization: float,
+    tensor_parallel_size: int = 1,
+    min_vram_gb: float = 0,
+) -> ModelProfile:
+    return ModelProfile(
+        name="test",
+        model_id=f"test/model-{utilization}-{tensor_parallel_size}",
+        description="",
+        gpu_memory_utilization=utilization,
+        tensor_parallel_size=tensor_parallel_size,
+        hardware_requirements={"min_vram_gb": min_vram_gb} if min_vram_gb else None,
+    )
+
+
+def _placed(plan) -> dict[str, tuple[list[int], float]]:
+    return {
+        decision.profile_id: (decision.gpu_indices, decision.gpu_memory_utilization)
+        for decision in plan.placements
+    }
+
+
+def test_places_largest_first_with_best_fit():
+    profiles = {"small": _profile(0.3), "large": _profile(0.6), "medium": _profile(0.5)}
+
+    plan = plan_placement(profiles, _gpus(GPU_24GB_MB, GPU_24GB_MB), ["small", "large", "medium"])
+
+    # 요청 순서와 관계없이 큰 프로파일부터 배치
+    assert [decision.profile_id for decision in plan.placements] == ["large", "medium", "small"]
+    # small은 남는 자리가 더 적은 gpu0(0.6 사용 중)에 들어가 gpu1에 큰 빈자리를 남긴다
+    assert _placed(plan) == {"large": ([0], 0.6), "medium": ([1], 0.5), "small": ([0], 0.3)}
+    assert plan.unplaced == {}
+    assert plan.gpu_allocation == {0: pytest.approx(0.9), 1: pytest.approx(0.5)}
+
+
+def test_lowers_utilization_in_steps_until_it_fits():
+    profiles = {"chat": _profile(0.85, min_vram_gb=8)}
+
+    plan = plan_placement(profiles, _gpus(GPU_24GB_MB), ["chat"], reserved={0: 0.5}, headroom=0.05)
+
+    # 남은 0.45까지 0.05씩 줄여서 배치 (8GB 최소 요구량은 만족)
+    indices, utilization = _placed(plan)["chat"]
+    assert indices == [0]
+    assert utilization == pytest.approx(0.45)
+    assert utilization * GPU_24GB_MB >= 8 * 1024
+    assert plan.gpu_allocation[0] == pytest.approx(0.95)
+
+
+def test_does_not_lower_utilization_below_min_vram():
+    profiles = {"chat": _profile(0.85, min_vram_gb=16)}
+
+    plan = plan_placement(profiles, _gpus(GPU_24GB_MB), ["chat"], reserved={0: 0.5})
+
+    # 남은 0.45(약 10.8GB)로는 16GB를 못 채우므로 배치하지 않는다
+    assert plan.placements == []
+    assert "chat" in plan.unplaced
+    assert plan.gpu_allocation[0] == pytest.approx(0.5)
+
+
+def test_places_tensor_parallel_profile_on_enough_free_gpus():
+    profiles = {"tp2": _profile(0.9, tensor_parallel_size=2)}
+
+    plan = plan_placement(profiles, _gpus(*[GPU_24GB_MB] * 4), ["tp2"], reserved={1: 0.5})
+
+    # gpu1은 자리가 모자라므로 빈 GPU 두 개에 같은 비율로 올라간다
+    indices, utilization = _placed(plan)["tp2"]
+    assert indices == [0, 2]
+    assert utilization == pytest.approx(0.9)
+    assert plan.placements[0].cuda_visible_devices == "0,2"
+    assert plan.gpu_allocation == {
+        0: pytest.approx(0.9), 1: pytest.approx(0.5), 2: pytest.approx(0.9), 3: pytest.approx(0.0),
+    }
+
+
+def test_rejects_tensor_parallel_wider_than_inventory():
+    profiles = {"tp4": _profile(0.9, tensor_parallel_size=4)}
+
+    plan = plan_placement(profiles, _gpus(GPU_24GB_MB, GPU_24GB_MB), ["tp4"])
+
+    assert plan.placements == []
+    assert plan.unplaced == {"tp4": "GPU 4개 필요 (전체 2개)"}
+
+
+def test_reports_profile_that_cannot_fit():
+    profiles = {"huge": _profile(0.9, min_vram_gb=40), "small": _profile(0.3)}
+
+    plan = plan_placement(profiles, _gpus(GPU_24GB_MB), ["huge", "small", "missing"])
+
+    # 다른 프로파일 배치는 계속 진행
+    assert _placed(plan) == {"small": ([0], 0.3)}
+    assert set(plan.unplaced) == {"huge", "missing"}
+    assert plan.unplaced["missing"] == "알 수 없는 프로파일"
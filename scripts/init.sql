@@ -35,10 +35,12 @@ CREATE TABLE IF NOT EXISTS messages (
 );
 
 -- 요청 로그 테이블 (성능 모니터링용)
+-- created_at 기준 일 단위 RANGE 파티션 (request_logs_pYYYYMMDD). 게이트웨이가 며칠 앞서 파티션을
+-- 만들고 보존 기간이 지난 파티션을 DROP한다. 배치 INSERT가 한 행 때문에 실패하지 않도록 FK는 두지 않는다.
 CREATE TABLE IF NOT EXISTS request_logs (
-    id BIGSERIAL PRIMARY KEY,
-    user_id BIGINT REFERENCES users(id) ON DELETE SET NULL,
-    conversation_id BIGINT REFERENCES conversations(id) ON DELETE SET NULL,
+    id BIGSERIAL,
+    user_id BIGINT,
+    conversation_id BIGINT,
     model VARCHAR(100),
     input_tokens INTEGER DEFAULT 0,
     output_tokens INTEGER DEFAULT 0,
@@ -46,7 +48,23 @@ CREATE TABLE IF NOT EXISTS request_logs (
     latency_ms INTEGER,
     status_code INTEGER,
     error_message TEXT,
-    created_at TIMESTAMPTZ DEFAULT now()
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- 해당 일자 파티션이 아직 없을 때 행을 받는 기본 파티션 (평소에는 비어 있어야 함)
+CREATE TABLE IF NOT EXISTS request_logs_default PARTITION OF request_logs DEFAULT;
+
+-- 사용자 × 모델 × 일(UTC) 토큰 사용량 - 게이트웨이가 Redis 카운터를 주기적으로 모아 가산 (UPSERT)
+CREATE TABLE IF NOT EXISTS usage_daily (
+    day DATE NOT NULL,
+    user_id BIGINT NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    prompt_tokens BIGINT NOT NULL DEFAULT 0,
+    completion_tokens BIGINT NOT NULL DEFAULT 0,
+    requests INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (day, user_id, model)
 );
 
 -- 사용자 세션 테이블
@@ -62,10 +80,17 @@ CREATE TABLE IF NOT EXISTS user_sessions (
 -- 인덱스 생성
 CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations(user_id);
 CREATE INDEX IF NOT EXISTS idx_conversations_created_at ON conversations(created_at DESC);
+-- 대화 목록 키셋 페이지네이션 (user_id, updated_at, id)
+CREATE INDEX IF NOT EXISTS idx_conversations_user_updated ON conversations(user_id, updated_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_messages_conversation_id ON messages(conversation_id);
+-- 대화별 최근 메시지 페이지 조회
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_id_id ON messages(conversation_id, id DESC);
 CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages(created_at);
 CREATE INDEX IF NOT EXISTS idx_request_logs_user_id ON request_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_request_logs_created_at ON request_logs(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_request_logs_model_created_at ON request_logs(model, created_at);
+-- 사용자별 최근 사용량 조회 (기본 키는 day가 앞이라 사용자 조건에 쓰이지 않음)
+CREATE INDEX IF NOT EXISTS idx_usage_daily_user_day ON usage_daily(user_id, day DESC);
 CREATE INDEX IF NOT EXISTS idx_user_sessions_token_hash ON user_sessions(token_hash);
 CREATE INDEX IF NOT EXISTS idx_user_sessions_expires_at ON user_sessions(expires_at);
 
@@ -87,6 +112,15 @@ VALUES (
     'user'
 ) ON CONFLICT (email) DO NOTHING;
 
+-- 기본 개발 사용자 생성 (게이트웨이 개발 사용자 ID 1-3과 맞춤)
+INSERT INTO users (email, hashed_password, full_name, role) 
+VALUES (
+    'dev@example.com',
+    '$2b$12$0St8O1zQ5jZ1nN9M3xT0Cg8aA7lV1wY5dO4pE6fG8hI9jJ0kL2mN3o',
+    'Developer',
+    'user'
+) ON CONFLICT (email) DO NOTHING;
+
 -- 업데이트 트리거 함수
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -0,0 +1,51 @@
+-- request_logs 파티션 전환 (일 단위 RANGE 파티션 도입 전 init.sql로 만든 데이터베이스용)
+-- init.sql은 컨테이너 최초 기동 때만 실행되므로 기존 데이터베이스에는 이 스크립트를 한 번 직접 실행한다.
+--   docker compose exec -T postgres psql -U <user> -d <db> < scripts/migrate_request_logs_partitions.sql
+-- 기존 테이블(users/conversations FK 포함)은 request_logs_legacy로 남기므로 확인 후 직접 DROP한다.
+-- 옮긴 행은 request_logs_default에 들어가며, 게이트웨이의 파티션 관리가 오늘 이후 날짜는 일 파티션으로
+-- 옮기고 보존 기간(REQUEST_LOG_RETENTION_DAYS)이 지난 행은 지운다.
+
+BEGIN;
+
+ALTER TABLE request_logs RENAME TO request_logs_legacy;
+ALTER SEQUENCE IF EXISTS request_logs_id_seq RENAME TO request_logs_legacy_id_seq;
+ALTER INDEX IF EXISTS request_logs_pkey RENAME TO request_logs_legacy_pkey;
+ALTER INDEX IF EXISTS idx_request_logs_user_id RENAME TO idx_request_logs_legacy_user_id;
+ALTER INDEX IF EXISTS idx_request_logs_created_at RENAME TO idx_request_logs_legacy_created_at;
+ALTER INDEX IF EXISTS idx_request_logs_model_created_at RENAME TO idx_request_logs_legacy_model_created_at;
+
+-- init.sql과 같은 정의
+CREATE TABLE request_logs (
+    id BIGSERIAL,
+    user_id BIGINT,
+    conversation_id BIGINT,
+    model VARCHAR(100),
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    total_tokens INTEGER DEFAULT 0,
+    latency_ms INTEGER,
+    status_code INTEGER,
+    error_message TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE request_logs_default PARTITION OF request_logs DEFAULT;
+
+CREATE INDEX idx_request_logs_user_id ON request_logs(user_id);
+CREATE INDEX idx_request_logs_created_at ON request_logs(created_at DESC);
+CREATE INDEX idx_request_logs_model_created_at ON request_logs(model, created_at);
+
+INSERT INTO request_logs (
+    id, user_id, conversation_id, model, input_tokens, output_tokens, total_tokens,
+    latency_ms, status_code, error_message, created_at
+)
+SELECT
+    id, user_id, conversation_id, model, input_tokens, output_tokens, total_tokens,
+    latency_ms, status_code, error_message, created_at
+FROM request_logs_legacy
+WHERE created_at IS NOT NULL;
+
+SELECT setval(pg_get_serial_sequence('request_logs', 'id'), COALESCE((SELECT max(id) FROM request_logs), 0) + 1, false);
+
+COMMIT;